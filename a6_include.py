@@ -103,11 +103,17 @@ class SLNode:
     Singly Linked List node for use in a hash map
     """
 
-    def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
-        """Initialize node given a key and value."""
+    def __init__(self, key: str, value: object, next: "SLNode" = None,
+                 hash_code: int = None) -> None:
+        """
+        Initialize node given a key and value.
+        hash_code caches the full hash of the key, so the table can be
+        rehashed without calling the hash function again.
+        """
         self.key = key
         self.value = value
         self.next = next
+        self.hash_code = hash_code
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
@@ -168,9 +174,9 @@ class LinkedList:
         """Return an iterator for the list, starting at the head."""
         return LinkedListIterator(self._head)
 
-    def insert(self, key: str, value: object) -> None:
+    def insert(self, key: str, value: object, hash_code: int = None) -> None:
         """Insert new node at front of the list."""
-        self._head = SLNode(key, value, self._head)
+        self._head = SLNode(key, value, self._head, hash_code)
         self._size += 1
 
     def remove(self, key: str) -> bool:
@@ -210,10 +216,14 @@ class LinkedList:
 
 class HashEntry:
 
-    def __init__(self, key: str, value: object) -> None:
-        """Initialize an entry for use in a hash map."""
+    def __init__(self, key: str, value: object, hash_code: int = None) -> None:
+        """
+        Initialize an entry for use in a hash map.
+        hash_code caches the full hash of the key.
+        """
         self.key = key
         self.value = value
+        self.hash_code = hash_code
 
         # Set this value to True when you "delete" a HashEntry
         self.is_tombstone = False
@@ -0,0 +1,113 @@
+# Description: Event-loop lag while a large map grows under the async facade
+# A monitor task sleeps for 1 ms at a time and records how late it wakes up,
+# while the map is loaded with load_from and then resized to double capacity.
+# The same load and resize done with blocking calls is shown for reference.
+# Exits with status 1 if the worst lag of an async run exceeds the bound.
+#
+# Besides its slices, an async resize of the open addressing map blocks once,
+# when it allocates the new bucket array in one piece (tens of milliseconds
+# for millions of buckets); the chaining map allocates its new table in slices.
+#
+# The garbage collector is paused during each run: a full collection over
+# millions of nodes stalls the loop on its own, whatever the map does.
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_async_lag [--entries 1000000] [--bound 0.1]
+#                                          [--slice 0.002]
+
+import argparse
+import asyncio
+import gc
+import sys
+import time
+
+import hash_map_oa
+import hash_map_sc
+from benchmarks.common import builtin_hash
+from hash_map_async import AsyncHashMap
+
+# how long the monitor task sleeps between checks, in seconds
+TICK = 0.001
+
+
+async def monitor(lags: list) -> None:
+    """Records how late each TICK sleep wakes up, until cancelled."""
+    clock = time.perf_counter
+    while True:
+        start = clock()
+        await asyncio.sleep(TICK)
+        lags.append(max(0.0, clock() - start - TICK))
+
+
+async def source(keys: list):
+    for key in keys:
+        yield key, key
+
+
+async def grow(map_class, keys: list, blocking: bool, slice_seconds: float) -> tuple:
+    """
+    Loads the keys into a new map and doubles its capacity while the monitor runs.
+    Returns the total seconds, the recorded lags, and the longest slice of the facade.
+    """
+    lags = []
+    task = asyncio.create_task(monitor(lags))
+    await asyncio.sleep(2 * TICK)
+
+    m = map_class(11, builtin_hash)
+    start = time.perf_counter()
+    if blocking:
+        m.put_many([(key, key) for key in keys])
+        m.resize_table(2 * m.get_capacity())
+        max_slice = None
+    else:
+        am = AsyncHashMap(m, slice_seconds)
+        await am.load_from(source(keys))
+        await am.resize(2 * m.get_capacity())
+        max_slice = am.get_max_slice()
+    seconds = time.perf_counter() - start
+
+    await asyncio.sleep(2 * TICK)
+    task.cancel()
+    assert m.get_size() == len(keys)
+    return seconds, lags, max_slice
+
+
+def run(entries: int, bound: float, slice_seconds: float) -> bool:
+    keys = ['key' + str(i) for i in range(entries)]
+    print(f"{entries} entries, {slice_seconds * 1000:g} ms slices, lag bound {bound * 1000:g} ms")
+    print(f"{'map':>4} {'mode':>9} {'seconds':>8} {'p99 lag ms':>11} {'max lag ms':>11} "
+          f"{'max slice ms':>13}")
+
+    ok = True
+    for name, map_class in (('sc', hash_map_sc.HashMap), ('oa', hash_map_oa.HashMap)):
+        for blocking in (False, True):
+            gc.collect()
+            gc.disable()
+            try:
+                seconds, lags, max_slice = asyncio.run(grow(map_class, keys, blocking,
+                                                            slice_seconds))
+            finally:
+                gc.enable()
+
+            lags.sort()
+            p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+            slice_ms = '' if max_slice is None else f"{max_slice * 1000:>13.2f}"
+            print(f"{name:>4} {'blocking' if blocking else 'async':>9} {seconds:>8.2f} "
+                  f"{p99 * 1000:>11.2f} {lags[-1] * 1000:>11.2f} {slice_ms}".rstrip())
+            if not blocking and lags[-1] > bound:
+                ok = False
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Event-loop lag of the async map facade")
+    parser.add_argument('--entries', type=int, default=1000000,
+                        help='entries loaded into the map')
+    parser.add_argument('--bound', type=float, default=0.1,
+                        help='largest acceptable event-loop lag of an async run, in seconds')
+    parser.add_argument('--slice', type=float, default=0.002,
+                        help='time a slice of the facade may block the loop, in seconds')
+    args = parser.parse_args()
+    if not run(args.entries, args.bound, args.slice):
+        print(f"\nevent-loop lag exceeded {args.bound * 1000:g} ms")
+        sys.exit(1)
@@ -0,0 +1,44 @@
+# Description: Scalar vs batch hashing of the two sample hash functions
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_batch_hash [--keys 1000000]
+
+import argparse
+import random
+import time
+
+import hash_functions
+from a6_include import hash_function_1, hash_function_2
+
+
+def timed(func, *args):
+    """Returns (result, seconds) for a single call of func(*args)."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def run(count: int) -> None:
+    rng = random.Random(261)
+    keys = ['user:' + str(rng.randrange(10 ** 9)) + ':' + str(i) for i in range(count)]
+    backend = 'numpy' if hash_functions.np is not None else 'pure python fallback'
+    print(f"{count} keys, batch backend: {backend}")
+    # warm up NumPy so its one-time setup is not charged to the first function
+    hash_functions.hash_function_1_batch(keys[:1000])
+
+    print(f"{'function':>16} {'scalar s':>10} {'batch s':>10} {'speedup':>8} {'equal':>6}")
+
+    for scalar, batch in ((hash_function_1, hash_functions.hash_function_1_batch),
+                          (hash_function_2, hash_functions.hash_function_2_batch)):
+        expected, scalar_time = timed(lambda: [scalar(key) for key in keys])
+        result, batch_time = timed(batch, keys)
+        print(f"{scalar.__name__:>16} {scalar_time:>10.3f} {batch_time:>10.3f} "
+              f"{scalar_time / batch_time:>7.1f}x {str(result == expected):>6}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch hashing benchmark")
+    parser.add_argument('--keys', type=int, default=1000000,
+                        help='number of keys hashed')
+    args = parser.parse_args()
+    run(args.keys)
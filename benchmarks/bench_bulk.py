@@ -0,0 +1,77 @@
+# Description: put / get / remove loops vs put_many / get_many / remove_many
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_bulk [--pairs 1000000] [--hash builtin]
+
+import argparse
+import random
+import time
+
+import hash_map_oa
+import hash_map_sc
+from a6_include import hash_function_1, hash_function_2
+from benchmarks.common import builtin_hash
+
+
+HASH_FUNCTIONS = {
+    'builtin': builtin_hash,
+    'hash_function_1': hash_function_1,
+    'hash_function_2': hash_function_2,
+}
+
+
+def timed(func) -> float:
+    """Returns the seconds taken by func()."""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def loop_workload(map_class, function, pairs: list, keys: list) -> tuple:
+    m = map_class(11, function)
+
+    def put_all():
+        for key, value in pairs:
+            m.put(key, value)
+
+    def get_all():
+        for key in keys:
+            m.get(key)
+
+    def remove_all():
+        for key in keys:
+            m.remove(key)
+
+    return timed(put_all), timed(get_all), timed(remove_all)
+
+
+def batch_workload(map_class, function, pairs: list, keys: list) -> tuple:
+    m = map_class(11, function)
+    return (timed(lambda: m.put_many(pairs)),
+            timed(lambda: m.get_many(keys)),
+            timed(lambda: m.remove_many(keys)))
+
+
+def run(count: int, hash_name: str) -> None:
+    rng = random.Random(261)
+    pairs = [('user:' + str(rng.randrange(10 ** 9)) + ':' + str(i), i) for i in range(count)]
+    keys = [key for key, _ in pairs]
+    rng.shuffle(keys)
+    function = HASH_FUNCTIONS[hash_name]
+
+    print(f"{count} pairs, hash: {hash_name}")
+    print(f"{'map':>12} {'mode':>6} {'put/s':>12} {'get/s':>12} {'remove/s':>12}")
+    for name, map_class in (('SC', hash_map_sc.HashMap), ('OA', hash_map_oa.HashMap)):
+        for mode, workload in (('loop', loop_workload), ('batch', batch_workload)):
+            times = workload(map_class, function, pairs, keys)
+            print(f"{name:>12} {mode:>6} " + ' '.join(f"{count / t:>12.0f}" for t in times))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HashMap batch API benchmark")
+    parser.add_argument('--pairs', type=int, default=1000000,
+                        help='number of key/value pairs in the batch')
+    parser.add_argument('--hash', choices=sorted(HASH_FUNCTIONS), default='builtin',
+                        help='hash function given to the maps')
+    args = parser.parse_args()
+    run(args.pairs, args.hash)
@@ -0,0 +1,106 @@
+# Description: Thread scaling of the lock-striped map against one global lock
+# Runs 1 to N threads doing a mix of gets and puts on a shared map, and reports
+# total throughput and the speedup over one thread for the ConcurrentHashMap,
+# with its default stripe locks and with read-write stripe locks, and for a
+# hash_map_sc.HashMap guarded by a single lock.
+#
+# With the GIL only one thread runs Python code at a time, so no map can
+# scale, and the read-write locks only add cost; the striped map shows its
+# scaling on free-threaded (no-GIL) builds.
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_concurrent [--threads 8] [--operations 50000]
+#                                           [--read-fraction 0.9]
+
+import argparse
+import random
+import sys
+import threading
+import time
+
+import hash_map_sc
+from benchmarks.common import builtin_hash
+from hash_map_concurrent import ConcurrentHashMap
+
+
+class LockedHashMap:
+    """hash_map_sc.HashMap with every call made under one global lock."""
+
+    def __init__(self) -> None:
+        self._map = hash_map_sc.HashMap(11, builtin_hash)
+        self._lock = threading.Lock()
+
+    def put(self, key: str, value: object) -> None:
+        with self._lock:
+            self._map.put(key, value)
+
+    def get(self, key: str) -> object:
+        with self._lock:
+            return self._map.get(key)
+
+
+MAPS = (
+    ('striped', lambda: ConcurrentHashMap(11, builtin_hash)),
+    ('rw striped', lambda: ConcurrentHashMap(11, builtin_hash, shared_reads=True)),
+    ('global lock', LockedHashMap),
+)
+
+
+def measure(factory, threads: int, operations: int, keys: list, read_fraction: float) -> float:
+    """
+    Fills a new map with the keys, then runs the threads against it, each doing the
+    given number of operations. Returns the total operations per second.
+    """
+    m = factory()
+    for key in keys:
+        m.put(key, 0)
+
+    def worker(seed: int) -> None:
+        rng = random.Random(seed)
+        ops = [(rng.random() < read_fraction, rng.choice(keys)) for _ in range(operations)]
+        barrier.wait()
+        for read, key in ops:
+            if read:
+                m.get(key)
+            else:
+                m.put(key, seed)
+
+    barrier = threading.Barrier(threads + 1)
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    return threads * operations / (time.perf_counter() - start)
+
+
+def run(max_threads: int, operations: int, read_fraction: float) -> None:
+    keys = ['key' + str(i) for i in range(100000)]
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f"{operations} operations per thread, {read_fraction:.0%} gets, "
+          f"GIL {'enabled' if gil else 'disabled'}")
+    print(f"{'map':>12} {'threads':>8} {'ops/s':>10} {'speedup':>8}")
+
+    thread_counts = sorted({1, 2, 4, max_threads} | set(range(8, max_threads + 1, 8)))
+    for name, factory in MAPS:
+        # a short untimed run first, so the first timed run does not include warm-up
+        measure(factory, 1, operations // 10, keys, read_fraction)
+        base = None
+        for threads in (n for n in thread_counts if n <= max_threads):
+            ops = measure(factory, threads, operations, keys, read_fraction)
+            base = base or ops
+            print(f"{name:>12} {threads:>8} {ops:>10.0f} {ops / base:>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent map thread scaling benchmark")
+    parser.add_argument('--threads', type=int, default=8,
+                        help='largest number of threads')
+    parser.add_argument('--operations', type=int, default=50000,
+                        help='operations per thread')
+    parser.add_argument('--read-fraction', type=float, default=0.9,
+                        help='fraction of the operations that are gets')
+    args = parser.parse_args()
+    run(args.threads, args.operations, args.read_fraction)
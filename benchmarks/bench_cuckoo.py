@@ -0,0 +1,86 @@
+# Description: Lookup latency percentiles of the cuckoo map against the Open Addressing map
+# Each get is timed on its own, so the tail (p99, p99.9, max) shows the effect of
+# long probe sequences. The second key set is numeric ids handed out in strides of
+# the open addressing table size, so with an identity hash they share a few home
+# buckets: quadratic probing builds long chains there, while cuckoo hashing mixes
+# the hash codes and still inspects at most 8 slots.
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_cuckoo [--entries 100000]
+
+import argparse
+import random
+import time
+
+import hash_map_cuckoo
+import hash_map_oa
+from benchmarks.common import builtin_hash
+
+
+def identity_hash(key: str) -> int:
+    """Hash of a numeric id: the id itself."""
+    return int(key)
+
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+def latencies(m, keys: list) -> list:
+    """Returns the sorted time of each get, in nanoseconds."""
+    clock = time.perf_counter_ns
+    get = m.get
+    times = []
+    for key in keys:
+        start = clock()
+        get(key)
+        times.append(clock() - start)
+    times.sort()
+    return times
+
+
+def run(entries: int) -> None:
+    rng = random.Random(14)
+
+    # both maps reserve room for every key, so the open addressing capacity is known up front
+    m = hash_map_oa.HashMap(11, identity_hash)
+    m.reserve(entries)
+    stride = m.get_capacity()
+
+    key_sets = (
+        ('random keys, builtin hash', builtin_hash,
+         ['user' + str(rng.randrange(10 ** 9)) + str(i) for i in range(entries)]),
+        ('strided ids, identity hash', identity_hash,
+         [str(i * stride + i % 1000) for i in range(entries)]),
+    )
+    maps = (
+        ('oa quadratic', hash_map_oa.HashMap),
+        ('cuckoo', hash_map_cuckoo.HashMap),
+    )
+
+    for title, function, keys in key_sets:
+        lookups = keys[:]
+        rng.shuffle(lookups)
+        print(f"\n{title}, {entries} entries (get latency in ns)")
+        print(f"{'map':>13} {'load':>5} {'max probe':>10} "
+              + ''.join(f"{'p' + str(p):>8}" for p in PERCENTILES) + f"{'max':>9}")
+        for name, map_class in maps:
+            m = map_class(11, function)
+            m.reserve(entries)
+            for i, key in enumerate(keys):
+                m.put(key, i)
+            max_probes = max(m._probe_count(key) for key in keys)
+
+            # a short warm-up pass, then one timed pass over every key
+            latencies(m, lookups[:1000])
+            times = latencies(m, lookups)
+            row = ''.join(f"{times[min(len(times) - 1, int(len(times) * p / 100))]:>8}"
+                          for p in PERCENTILES)
+            print(f"{name:>13} {m.table_load():>5.2f} {max_probes:>10}{row}{times[-1]:>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cuckoo vs open addressing lookup latency")
+    parser.add_argument('--entries', type=int, default=100000,
+                        help='number of keys inserted into each map')
+    args = parser.parse_args()
+    run(args.entries)
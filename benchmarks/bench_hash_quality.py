@@ -0,0 +1,120 @@
+# Description: Quality and throughput report for the hash functions
+# For the two sample functions and the seeded FNV-1a, SipHash-2-4 and XXH64
+# functions, reports the chi-square of the bucket distribution for several key
+# sets (prime modulus and low bits), the avalanche of single-bit key changes,
+# and hashing throughput for short and long keys.
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_hash_quality [--keys 100000]
+
+import argparse
+import random
+import string
+import time
+from itertools import islice, permutations
+
+from a6_include import hash_function_1, hash_function_2
+from benchmarks.common import builtin_hash
+from hash_functions import HASH_MASK, fnv1a_hash, seeded, siphash24, xxhash64
+
+
+FUNCTIONS = (
+    ('hash_function_1', hash_function_1),
+    ('hash_function_2', hash_function_2),
+    ('fnv1a', seeded(fnv1a_hash, 0x5EED)),
+    ('siphash24', seeded(siphash24, 0x5EED)),
+    ('xxhash64', seeded(xxhash64, 0x5EED)),
+    ('builtin hash', builtin_hash),
+)
+
+PRIME_BUCKETS = 1031
+POWER_OF_TWO_BUCKETS = 1024
+
+
+def key_sets(rng: random.Random, count: int) -> dict:
+    """Returns the key sets the distribution is measured on."""
+    words = [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 12)))
+             for _ in range(count)]
+    anagrams = list(islice((''.join(p) for p in permutations('abcdefghij')), count))
+    return {
+        'sequential': ['key' + str(i) for i in range(count)],
+        'words': words,
+        'anagrams': anagrams,
+    }
+
+
+def chi_square(hash_codes: list, buckets: int, low_bits: bool) -> float:
+    """
+    Returns the chi-square statistic of the bucket counts divided by its degrees of
+    freedom: about 1.0 for a uniform spread, far higher when keys pile up.
+    """
+    counts = [0] * buckets
+    for hash_code in hash_codes:
+        counts[hash_code & (buckets - 1) if low_bits else hash_code % buckets] += 1
+    expected = len(hash_codes) / buckets
+    return sum((count - expected) ** 2 for count in counts) / expected / (buckets - 1)
+
+
+def avalanche(function, rng: random.Random, samples: int) -> tuple:
+    """
+    Flips each of the low 7 bits of every character of random 8-character keys and
+    returns the mean fraction of the 64 output bits that change (0.5 is ideal) and
+    the largest deviation from 0.5 of any single output bit's flip rate.
+    """
+    flips = [0] * 64
+    trials = 0
+    for _ in range(samples):
+        key = ''.join(rng.choice(string.ascii_letters) for _ in range(8))
+        hash_code = function(key) & HASH_MASK
+        for i in range(len(key)):
+            for bit in range(7):
+                changed = key[:i] + chr(ord(key[i]) ^ (1 << bit)) + key[i + 1:]
+                diff = hash_code ^ (function(changed) & HASH_MASK)
+                for j in range(64):
+                    flips[j] += (diff >> j) & 1
+                trials += 1
+    rates = [flip / trials for flip in flips]
+    return sum(rates) / 64, max(abs(rate - 0.5) for rate in rates)
+
+
+def throughput(function, keys: list) -> float:
+    """Returns the keys hashed per second."""
+    start = time.perf_counter()
+    for key in keys:
+        function(key)
+    return len(keys) / (time.perf_counter() - start)
+
+
+def run(count: int) -> None:
+    rng = random.Random(18)
+    sets = key_sets(rng, count)
+    short_keys = sets['sequential']
+    long_keys = [''.join(rng.choice(string.ascii_letters) for _ in range(64))
+                 for _ in range(count // 4)]
+
+    print(f"{count} keys, chi-square / dof over {PRIME_BUCKETS} buckets (mod) "
+          f"and {POWER_OF_TWO_BUCKETS} buckets (low bits); 1.0 is uniform")
+    header = ''.join(f" {name + ' mod':>15} {name + ' low':>15}" for name in sets)
+    print(f"{'function':>15}{header}")
+    for name, function in FUNCTIONS:
+        row = ''
+        for keys in sets.values():
+            hash_codes = [function(key) for key in keys]
+            row += (f" {chi_square(hash_codes, PRIME_BUCKETS, False):>15.2f}"
+                    f" {chi_square(hash_codes, POWER_OF_TWO_BUCKETS, True):>15.2f}")
+        print(f"{name:>15}{row}")
+
+    print("\navalanche (mean output bits flipped, worst bit bias) and keys hashed per second")
+    print(f"{'function':>15} {'flipped':>8} {'bias':>6} {'short/s':>10} {'64 chars/s':>10}")
+    for name, function in FUNCTIONS:
+        mean, bias = avalanche(function, random.Random(1), 200)
+        print(f"{name:>15} {mean:>8.3f} {bias:>6.3f} {throughput(function, short_keys):>10.0f} "
+              f"{throughput(function, long_keys):>10.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hash function quality and throughput report")
+    parser.add_argument('--keys', type=int, default=100000,
+                        help='number of keys in each key set')
+    args = parser.parse_args()
+    run(args.keys)
@@ -0,0 +1,68 @@
+# Description: Stop-the-world vs incremental resizing while a map grows from empty
+# Times every put and reports total build time, p99.9 and worst put latency, and
+# the longest resize pause the map itself recorded (get_max_pause).
+#
+# Python's cyclic garbage collector also pauses while millions of objects are
+# being allocated; --no-gc turns it off so the numbers show the map alone.
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_incremental [--entries 1000000] [--no-gc]
+
+import argparse
+import gc
+import time
+
+import hash_map_oa
+import hash_map_sc
+from benchmarks.common import builtin_hash
+
+
+def grow(map_class, keys: list, **options) -> dict:
+    """Inserts every key into an empty map, timing each put."""
+    m = map_class(11, builtin_hash, **options)
+    clock = time.perf_counter
+    times = []
+
+    start = clock()
+    for i, key in enumerate(keys):
+        put_start = clock()
+        m.put(key, i)
+        times.append(clock() - put_start)
+    total = clock() - start
+
+    times.sort()
+    return {
+        'total': total,
+        'p999': times[int(len(times) * 0.999)],
+        'worst': times[-1],
+        'max_pause': m.get_max_pause(),
+    }
+
+
+def run(entries: int, rehash_step: int) -> None:
+    keys = ['key' + str(i) for i in range(entries)]
+
+    print(f"{entries} puts into an empty map (times in ms, build time in s), "
+          f"rehash_step {rehash_step}")
+    print(f"{'map':>6} {'resizing':>15} {'build':>7} {'p99.9 put':>10} {'worst put':>10} "
+          f"{'max pause':>10}")
+    for name, map_class in (('sc', hash_map_sc.HashMap), ('oa', hash_map_oa.HashMap)):
+        for mode, options in (('stop-the-world', {}),
+                              ('incremental', {'incremental': True, 'rehash_step': rehash_step})):
+            r = grow(map_class, keys, **options)
+            print(f"{name:>6} {mode:>15} {r['total']:>7.2f} {r['p999'] * 1000:>10.3f} "
+                  f"{r['worst'] * 1000:>10.2f} {r['max_pause'] * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental resize benchmark")
+    parser.add_argument('--entries', type=int, default=1000000,
+                        help='number of keys inserted into each map')
+    parser.add_argument('--rehash-step', type=int, default=16,
+                        help='buckets migrated per put in incremental mode')
+    parser.add_argument('--no-gc', action='store_true',
+                        help='disable the cyclic garbage collector while timing')
+    args = parser.parse_args()
+    if args.no_gc:
+        gc.disable()
+    run(args.entries, args.rehash_step)
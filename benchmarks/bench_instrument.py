@@ -0,0 +1,55 @@
+# Description: Cost of the opt-in instrumentation
+# Times put/get/remove loops before instrumentation is enabled, while it is
+# enabled, and after it is disabled again, which must run as fast as before.
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_instrument [--entries 200000]
+
+import argparse
+import time
+
+import hash_map_oa
+import hash_map_sc
+from benchmarks.common import builtin_hash
+from hash_map_instrument import instrument, uninstrument
+
+
+MODES = (('plain', lambda: None), ('instrumented', instrument), ('uninstrumented', uninstrument))
+
+
+def measure(module, keys: list) -> float:
+    """Returns the best of three runs of put, get and remove over the keys, in seconds."""
+    best = float('inf')
+    for _ in range(3):
+        m = module.HashMap(11, builtin_hash)
+        start = time.perf_counter()
+        for i, key in enumerate(keys):
+            m.put(key, i)
+        for key in keys:
+            m.get(key)
+        for key in keys:
+            m.remove(key)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(entries: int) -> None:
+    keys = ['key' + str(i) for i in range(entries)]
+    print(f"{entries} keys: put, get and remove each, best of 3")
+    print(f"{'map':>12} {'mode':>15} {'seconds':>8} {'ops/s':>9} {'vs plain':>8}")
+    for module in (hash_map_sc, hash_map_oa):
+        base = None
+        for name, setup in MODES:
+            setup()
+            seconds = measure(module, keys)
+            base = base or seconds
+            print(f"{module.__name__:>12} {name:>15} {seconds:>8.3f} "
+                  f"{3 * entries / seconds:>9.0f} {seconds / base:>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Instrumentation overhead benchmark")
+    parser.add_argument('--entries', type=int, default=200000,
+                        help='number of keys put, read and removed')
+    args = parser.parse_args()
+    run(args.entries)
@@ -0,0 +1,73 @@
+# Description: Memory and throughput comparison of the two Open Addressing layouts
+# hash_map_oa stores one HashEntry object per slot; hash_map_oa_soa stores
+# parallel arrays of cached hashes, keys and values plus an array('b') of slot states.
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_oa_layout [--entries 200000]
+
+import argparse
+import time
+import tracemalloc
+
+import hash_map_oa
+import hash_map_oa_soa
+from benchmarks.common import builtin_hash
+
+
+def build(map_class, keys: list):
+    """Returns a new map holding every key."""
+    m = map_class(11, builtin_hash)
+    for i, key in enumerate(keys):
+        m.put(key, i)
+    return m
+
+
+def measure(map_class, keys: list) -> dict:
+    """Builds a map from the keys and returns its memory use and throughput."""
+    # memory is traced on a separate build, since tracing slows allocation down
+    tracemalloc.start()
+    m = build(map_class, keys)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del m
+
+    start = time.perf_counter()
+    m = build(map_class, keys)
+    put_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for key in keys:
+        m.get(key)
+    get_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i, key in enumerate(keys):
+        m.put(key, -i)
+    update_time = time.perf_counter() - start
+
+    return {
+        'capacity': m.get_capacity(),
+        'bytes_per_entry': memory / len(keys),
+        'put_ops': len(keys) / put_time,
+        'get_ops': len(keys) / get_time,
+        'update_ops': len(keys) / update_time,
+    }
+
+
+def run(entries: int) -> None:
+    # keys are created before tracing starts so only the table itself is measured
+    keys = ['key' + str(i) for i in range(entries)]
+
+    print(f"{'layout':>10} {'capacity':>10} {'B/entry':>10} {'put/s':>12} {'get/s':>12} {'update/s':>12}")
+    for name, map_class in (('HashEntry', hash_map_oa.HashMap), ('SoA', hash_map_oa_soa.HashMap)):
+        r = measure(map_class, keys)
+        print(f"{name:>10} {r['capacity']:>10} {r['bytes_per_entry']:>10.1f} "
+              f"{r['put_ops']:>12.0f} {r['get_ops']:>12.0f} {r['update_ops']:>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OA HashMap layout comparison")
+    parser.add_argument('--entries', type=int, default=200000,
+                        help='number of distinct keys inserted into each map')
+    args = parser.parse_args()
+    run(args.entries)
@@ -0,0 +1,48 @@
+# Description: Lookup benchmark for the Open Addressing HashMap
+# Shows that get / contains_key cost stays flat as the table grows.
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_oa_lookup [--max-exp 6] [--samples 20000]
+
+import argparse
+import random
+import time
+
+from benchmarks.common import builtin_hash
+from hash_map_oa import HashMap
+
+
+def time_per_call(func, keys: list) -> float:
+    """Returns the average time in nanoseconds of func(key) over all keys."""
+    start = time.perf_counter()
+    for key in keys:
+        func(key)
+    return (time.perf_counter() - start) / len(keys) * 1e9
+
+
+def run(max_exp: int, samples: int) -> None:
+    rng = random.Random(261)
+    print(f"{'entries':>10} {'capacity':>10} {'hit ns':>10} {'miss ns':>10}")
+
+    for exp in range(3, max_exp + 1):
+        n = 10 ** exp
+        m = HashMap(11, builtin_hash)
+        for i in range(n):
+            m.put('key' + str(i), i)
+
+        hits = ['key' + str(rng.randrange(n)) for _ in range(samples)]
+        misses = ['miss' + str(rng.randrange(n)) for _ in range(samples)]
+
+        hit_ns = time_per_call(m.get, hits)
+        miss_ns = time_per_call(m.contains_key, misses)
+        print(f"{n:>10} {m.get_capacity():>10} {hit_ns:>10.0f} {miss_ns:>10.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OA HashMap lookup benchmark")
+    parser.add_argument('--max-exp', type=int, default=6,
+                        help='largest table holds 10**max_exp entries')
+    parser.add_argument('--samples', type=int, default=20000,
+                        help='number of lookups timed per table size')
+    args = parser.parse_args()
+    run(args.max_exp, args.samples)
@@ -0,0 +1,83 @@
+# Description: Cold-start build time of the parallel build by worker count
+# Builds both maps from the same pairs with from_iterable and with parallel_build
+# at 1 to N worker processes, and reports seconds, speedup over from_iterable,
+# and for open addressing the share of entries left to the fix-up pass.
+#
+# Hashing and layout run in the workers, but the nodes and entries are created
+# and stitched into the table by the calling process, which bounds the speedup.
+# Speedup needs as many free cores as workers (see os.cpu_count() in the header).
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_parallel_build [--workers 8] [--entries 1000000]
+
+import argparse
+import gc
+import os
+import time
+
+import hash_map_oa
+import hash_map_parallel
+import hash_map_sc
+from benchmarks.common import builtin_hash
+from hash_map_parallel import parallel_build
+
+
+def timed(build) -> tuple:
+    """Returns the seconds build() took, with the collector paused, and the map it built."""
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        m = build()
+        return time.perf_counter() - start, m
+    finally:
+        gc.enable()
+
+
+def overflow_share(pairs: list, workers: int) -> float:
+    """
+    Returns the fraction of entries whose probe sequence leaves their bucket range,
+    for an open addressing build split into the given number of ranges.
+    """
+    if workers == 1:
+        return 0.0
+    m = hash_map_oa.HashMap(1, builtin_hash)
+    m.reserve(len(pairs))
+    capacity = m._capacity
+    hash_map_parallel._build = pairs, m
+    try:
+        overflow = 0
+        ranges = hash_map_parallel._hash_slice(0, len(pairs), workers)
+        for p, (positions, hash_codes) in enumerate(ranges):
+            lo, hi = capacity * p // workers, capacity * (p + 1) // workers
+            overflow += len(hash_map_parallel._layout_oa(lo, hi, positions, hash_codes)[3])
+    finally:
+        hash_map_parallel._build = None
+    return overflow / len(pairs)
+
+
+def run(max_workers: int, entries: int) -> None:
+    pairs = [('key' + str(i), i) for i in range(entries)]
+    print(f"{entries} pairs, Python's hash, {os.cpu_count()} cores, seconds")
+    print(f"{'map':>4} {'build':>14} {'seconds':>8} {'speedup':>8} {'fix-up':>7}")
+
+    worker_counts = sorted(n for n in {1, 2, 4, max_workers} if n <= max_workers)
+    for map_type, map_class in (('sc', hash_map_sc.HashMap), ('oa', hash_map_oa.HashMap)):
+        base, expected = timed(lambda: map_class.from_iterable(pairs, builtin_hash))
+        print(f"{map_type:>4} {'from_iterable':>14} {base:>8.2f} {1:>8.2f}")
+        for workers in worker_counts:
+            seconds, m = timed(lambda: parallel_build(pairs, builtin_hash, map_type, workers))
+            assert m.get_size() == expected.get_size()
+            fixup = f"{overflow_share(pairs, workers):>7.3%}" if map_type == 'oa' else ''
+            print(f"{map_type:>4} {str(workers) + ' workers':>14} {seconds:>8.2f} "
+                  f"{base / seconds:>8.2f} {fixup}".rstrip())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel build benchmark")
+    parser.add_argument('--workers', type=int, default=8,
+                        help='largest number of worker processes')
+    parser.add_argument('--entries', type=int, default=1000000,
+                        help='pairs in the built map')
+    args = parser.parse_args()
+    run(args.workers, args.entries)
@@ -0,0 +1,62 @@
+# Description: Prime-modulus vs power-of-two (mix64 + mask) capacity mode
+# Compares put/get throughput and probe lengths of both maps for the sample
+# hash functions, whose additive hashes crowd into a narrow range of values.
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_pow2 [--keys 20000]
+
+import argparse
+import random
+import time
+
+import hash_map_oa
+import hash_map_sc
+from a6_include import hash_function_1, hash_function_2
+
+
+def measure(map_class, function, keys: list, power_of_two: bool) -> dict:
+    """Builds a map from the keys and returns its throughput and probe lengths."""
+    m = map_class(11, function, power_of_two=power_of_two)
+
+    start = time.perf_counter()
+    for i, key in enumerate(keys):
+        m.put(key, i)
+    put_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for key in keys:
+        m.get(key)
+    get_time = time.perf_counter() - start
+
+    probes = [m._probe_count(key) for key in keys]
+    return {
+        'capacity': m.get_capacity(),
+        'put_ops': len(keys) / put_time,
+        'get_ops': len(keys) / get_time,
+        'mean_probes': sum(probes) / len(probes),
+        'max_probes': max(probes),
+    }
+
+
+def run(count: int) -> None:
+    rng = random.Random(261)
+    keys = ['user' + str(rng.randrange(10 ** 8)) for _ in range(count)]
+
+    print(f"{count} keys")
+    print(f"{'map':>4} {'hash':>16} {'mode':>6} {'capacity':>9} {'put/s':>10} {'get/s':>10} "
+          f"{'mean probe':>11} {'max probe':>10}")
+    for name, map_class in (('SC', hash_map_sc.HashMap), ('OA', hash_map_oa.HashMap)):
+        for function in (hash_function_1, hash_function_2):
+            for mode, power_of_two in (('prime', False), ('pow2', True)):
+                r = measure(map_class, function, keys, power_of_two)
+                print(f"{name:>4} {function.__name__:>16} {mode:>6} {r['capacity']:>9} "
+                      f"{r['put_ops']:>10.0f} {r['get_ops']:>10.0f} "
+                      f"{r['mean_probes']:>11.2f} {r['max_probes']:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Power-of-two capacity mode benchmark")
+    parser.add_argument('--keys', type=int, default=20000,
+                        help='number of keys inserted into each map')
+    args = parser.parse_args()
+    run(args.keys)
@@ -0,0 +1,77 @@
+# Description: Probing strategy matrix for the Open Addressing HashMap
+# Average and max probe length plus put/get throughput for linear, quadratic
+# and double hashing at load factors from 0.3 to 0.9.
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_probing [--capacity 40000] [--hash builtin]
+
+import argparse
+import random
+import time
+
+from a6_include import hash_function_1, hash_function_2
+from benchmarks.common import builtin_hash
+from hash_map_oa import PROBING, HashMap
+
+
+HASH_FUNCTIONS = {
+    'builtin': builtin_hash,
+    'hash_function_1': hash_function_1,
+    'hash_function_2': hash_function_2,
+}
+
+LOAD_FACTORS = (0.3, 0.5, 0.7, 0.8, 0.9)
+
+
+def measure(function, probing: str, capacity: int, load: float, keys: list) -> dict:
+    """
+    Fills a table of the given capacity to the given load and returns its probe
+    lengths and throughput. The table's own growth threshold is set above the
+    target load, so it only grows if quadratic probing cannot find a free bucket.
+    """
+    m = HashMap(capacity, function, probing=probing, load_factor=0.95)
+    keys = keys[:int(load * m.get_capacity())]
+
+    start = time.perf_counter()
+    for i, key in enumerate(keys):
+        m.put(key, i)
+    put_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for key in keys:
+        m.get(key)
+    get_time = time.perf_counter() - start
+
+    probes = [m._probe_count(key) for key in keys]
+    return {
+        'load': m.table_load(),
+        'mean_probes': sum(probes) / len(probes),
+        'max_probes': max(probes),
+        'put_ops': len(keys) / put_time,
+        'get_ops': len(keys) / get_time,
+    }
+
+
+def run(capacity: int, hash_name: str) -> None:
+    rng = random.Random(261)
+    keys = ['user' + str(rng.randrange(10 ** 9)) + str(i) for i in range(capacity)]
+    function = HASH_FUNCTIONS[hash_name]
+
+    print(f"capacity {capacity}, hash: {hash_name}")
+    print(f"{'probing':>10} {'target':>7} {'load':>6} {'mean probe':>11} {'max probe':>10} "
+          f"{'put/s':>10} {'get/s':>10}")
+    for probing in PROBING:
+        for load in LOAD_FACTORS:
+            r = measure(function, probing, capacity, load, keys)
+            print(f"{probing:>10} {load:>7.2f} {r['load']:>6.2f} {r['mean_probes']:>11.2f} "
+                  f"{r['max_probes']:>10} {r['put_ops']:>10.0f} {r['get_ops']:>10.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OA probing strategy benchmark")
+    parser.add_argument('--capacity', type=int, default=40000,
+                        help='table capacity (rounded up to a prime)')
+    parser.add_argument('--hash', choices=sorted(HASH_FUNCTIONS), default='builtin',
+                        help='hash function given to the map')
+    args = parser.parse_args()
+    run(args.capacity, args.hash)
@@ -0,0 +1,102 @@
+# Description: Robin Hood map against the quadratic probing Open Addressing map
+# Builds both maps from the same keys and reports capacity, bytes per entry,
+# probe length mean / max / variance and put/get/miss/remove throughput.
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_robin_hood [--entries 180000]
+
+import argparse
+import random
+import time
+import tracemalloc
+
+import hash_map_oa
+import hash_map_rh
+from benchmarks.common import builtin_hash
+
+
+MAPS = (
+    ('oa quadratic 0.5', lambda: hash_map_oa.HashMap(11, builtin_hash)),
+    ('robin hood 0.85', lambda: hash_map_rh.HashMap(11, builtin_hash, load_factor=0.85)),
+    ('robin hood 0.9', lambda: hash_map_rh.HashMap(11, builtin_hash)),
+    ('robin hood 0.95', lambda: hash_map_rh.HashMap(11, builtin_hash, load_factor=0.95)),
+)
+
+
+def build(factory, keys: list):
+    """Returns a new map holding every key."""
+    m = factory()
+    for i, key in enumerate(keys):
+        m.put(key, i)
+    return m
+
+
+def measure(factory, keys: list, misses: list) -> dict:
+    """Builds a map from the keys and returns its memory use, probe lengths and throughput."""
+    tracemalloc.start()
+    m = build(factory, keys)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del m
+
+    start = time.perf_counter()
+    m = build(factory, keys)
+    put_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for key in keys:
+        m.get(key)
+    get_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for key in misses:
+        m.contains_key(key)
+    miss_time = time.perf_counter() - start
+
+    probes = [m._probe_count(key) for key in keys]
+    mean = sum(probes) / len(probes)
+    variance = sum((p - mean) ** 2 for p in probes) / len(probes)
+    load = m.table_load()
+    capacity = m.get_capacity()
+
+    start = time.perf_counter()
+    for key in keys:
+        m.remove(key)
+    remove_time = time.perf_counter() - start
+
+    return {
+        'capacity': capacity,
+        'load': load,
+        'bytes_per_entry': memory / len(keys),
+        'mean_probes': mean,
+        'max_probes': max(probes),
+        'variance': variance,
+        'put_ops': len(keys) / put_time,
+        'get_ops': len(keys) / get_time,
+        'miss_ops': len(misses) / miss_time,
+        'remove_ops': len(keys) / remove_time,
+    }
+
+
+def run(entries: int) -> None:
+    rng = random.Random(13)
+    keys = ['user' + str(rng.randrange(10 ** 9)) + str(i) for i in range(entries)]
+    misses = ['miss' + str(i) for i in range(entries)]
+
+    print(f"{entries} entries")
+    print(f"{'map':>17} {'capacity':>9} {'load':>5} {'B/entry':>8} {'mean':>5} {'max':>4} "
+          f"{'var':>6} {'put/s':>9} {'get/s':>9} {'miss/s':>9} {'remove/s':>9}")
+    for name, factory in MAPS:
+        r = measure(factory, keys, misses)
+        print(f"{name:>17} {r['capacity']:>9} {r['load']:>5.2f} {r['bytes_per_entry']:>8.1f} "
+              f"{r['mean_probes']:>5.2f} {r['max_probes']:>4} {r['variance']:>6.2f} "
+              f"{r['put_ops']:>9.0f} {r['get_ops']:>9.0f} {r['miss_ops']:>9.0f} "
+              f"{r['remove_ops']:>9.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Robin Hood vs open addressing benchmark")
+    parser.add_argument('--entries', type=int, default=180000,
+                        help='number of keys inserted into each map')
+    args = parser.parse_args()
+    run(args.entries)
@@ -0,0 +1,71 @@
+# Description: Build and lookup throughput of the sharded map by worker count
+# Builds a ShardedHashMap with put_many and looks every key up with get_many,
+# for 1 to N worker processes, and reports keys per second and the speedup
+# over one worker. A single-process HashMap doing the same batch calls is
+# shown for reference.
+#
+# The facade hashes, partitions and pickles every batch in the calling process,
+# so that part does not scale; the work inside the shards does. Speedup needs
+# as many free cores as workers (see os.cpu_count() in the header line).
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_sharded [--workers 8] [--entries 500000]
+#                                        [--map sc] [--batch 100000]
+
+import argparse
+import os
+import time
+
+import hash_map_oa
+import hash_map_sc
+from a6_include import hash_function_2
+from hash_map_sharded import ShardedHashMap
+
+
+def timed(function, keys: list, batch: int) -> float:
+    """Calls function on consecutive slices of keys and returns keys per second."""
+    start = time.perf_counter()
+    for i in range(0, len(keys), batch):
+        function(keys[i:i + batch])
+    return len(keys) / (time.perf_counter() - start)
+
+
+def measure(m, keys: list, pairs: list, batch: int) -> tuple:
+    """Returns the build and lookup throughput of the map in keys per second."""
+    build = timed(m.put_many, pairs, batch)
+    lookup = timed(m.get_many, keys, batch)
+    return build, lookup
+
+
+def run(max_workers: int, entries: int, map_type: str, batch: int) -> None:
+    keys = ['key' + str(i) for i in range(entries)]
+    pairs = [(key, i) for i, key in enumerate(keys)]
+    print(f"{entries} keys, {map_type} shards, batches of {batch}, "
+          f"{os.cpu_count()} cores, keys/s")
+    print(f"{'workers':>8} {'build':>10} {'lookup':>10} {'build x':>8} {'lookup x':>9}")
+
+    local = (hash_map_sc.HashMap if map_type == 'sc' else hash_map_oa.HashMap)(11, hash_function_2)
+    build, lookup = measure(local, keys, pairs, batch)
+    print(f"{'local':>8} {build:>10.0f} {lookup:>10.0f}")
+
+    base = None
+    for workers in sorted(n for n in {1, 2, 4, max_workers} if n <= max_workers):
+        with ShardedHashMap(workers, hash_function_2, map_type=map_type) as m:
+            build, lookup = measure(m, keys, pairs, batch)
+        base = base or (build, lookup)
+        print(f"{workers:>8} {build:>10.0f} {lookup:>10.0f} "
+              f"{build / base[0]:>8.2f} {lookup / base[1]:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sharded map worker scaling benchmark")
+    parser.add_argument('--workers', type=int, default=8,
+                        help='largest number of worker processes')
+    parser.add_argument('--entries', type=int, default=500000,
+                        help='keys built and looked up')
+    parser.add_argument('--map', choices=('sc', 'oa'), default='sc',
+                        help='local map owned by each worker')
+    parser.add_argument('--batch', type=int, default=100000,
+                        help='keys per put_many / get_many call')
+    args = parser.parse_args()
+    run(args.workers, args.entries, args.map, args.batch)
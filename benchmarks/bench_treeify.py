@@ -0,0 +1,100 @@
+# Description: Sorted buckets against plain chains in the Separate Chaining map
+# hash_function_1 sums character codes, so every anagram of a word lands in the
+# same bucket. Builds the map from anagram-heavy key sets with and without
+# treeify and reports the longest lookup and put/get/miss/remove throughput.
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_treeify [--words 30] [--length 6]
+
+import argparse
+import random
+import string
+import time
+from itertools import permutations
+
+from a6_include import hash_function_1
+from hash_map_sc import HashMap
+
+
+MAPS = (
+    ('linked chains', lambda: HashMap(11, hash_function_1, treeify=False)),
+    ('sorted buckets', lambda: HashMap(11, hash_function_1)),
+)
+
+
+def anagram_keys(rng: random.Random, words: int, length: int) -> list:
+    """Returns every distinct permutation of the given number of random words, shuffled."""
+    keys = set()
+    for _ in range(words):
+        word = ''.join(rng.choice(string.ascii_lowercase) for _ in range(length))
+        keys.update(''.join(p) for p in permutations(word))
+    keys = sorted(keys)
+    rng.shuffle(keys)
+    return keys
+
+
+def measure(factory, keys: list, misses: list) -> dict:
+    """Builds a map from the keys and returns its longest lookup and throughput."""
+    m = factory()
+    start = time.perf_counter()
+    for i, key in enumerate(keys):
+        m.put(key, i)
+    put_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for key in keys:
+        m.get(key)
+    get_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for key in misses:
+        m.contains_key(key)
+    miss_time = time.perf_counter() - start
+
+    probes = [m._probe_count(key) for key in keys]
+
+    start = time.perf_counter()
+    for key in keys:
+        m.remove(key)
+    remove_time = time.perf_counter() - start
+
+    return {
+        'capacity': m.get_capacity(),
+        'mean_probes': sum(probes) / len(probes),
+        'max_probes': max(probes),
+        'put_ops': len(keys) / put_time,
+        'get_ops': len(keys) / get_time,
+        'miss_ops': len(misses) / miss_time,
+        'remove_ops': len(keys) / remove_time,
+    }
+
+
+def run(words: int, length: int) -> None:
+    rng = random.Random(17)
+    keys = anagram_keys(rng, words, length)
+
+    # raising one letter and lowering another keeps the character sum, so the
+    # misses land in the same long chains as the keys
+    key_set = set(keys)
+    misses = [chr(ord(key[0]) + 1) + key[1:-1] + chr(ord(key[-1]) - 1)
+              for key in keys if key[0] != 'z' and key[-1] != 'a']
+    misses = [key for key in misses if key not in key_set]
+
+    print(f"{len(keys)} keys, {len({hash_function_1(key) for key in keys})} distinct hash codes")
+    print(f"{'map':>15} {'capacity':>9} {'mean':>7} {'max':>5} "
+          f"{'put/s':>9} {'get/s':>9} {'miss/s':>9} {'remove/s':>9}")
+    for name, factory in MAPS:
+        r = measure(factory, keys, misses)
+        print(f"{name:>15} {r['capacity']:>9} {r['mean_probes']:>7.2f} {r['max_probes']:>5} "
+              f"{r['put_ops']:>9.0f} {r['get_ops']:>9.0f} {r['miss_ops']:>9.0f} "
+              f"{r['remove_ops']:>9.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Treeified buckets vs linked chains benchmark")
+    parser.add_argument('--words', type=int, default=30,
+                        help='number of random words whose permutations are inserted')
+    parser.add_argument('--length', type=int, default=6,
+                        help='letters per word')
+    args = parser.parse_args()
+    run(args.words, args.length)
@@ -0,0 +1,289 @@
+# Description: Workload benchmark harness for the SC and OA HashMaps and dict
+# Runs each map through a set of workloads and reports throughput and
+# per-operation latency percentiles:
+#   uniform  - gets of uniformly random keys from a filled map
+#   zipf     - gets with Zipf-skewed key popularity (a few hot keys)
+#   anagram  - puts and gets of anagram-heavy keys, hashed with hash_function_1
+#   churn    - delete-heavy mix of removes, puts of new keys and gets
+#   grow     - puts of new keys into an empty map
+# Results can be saved as JSON and compared with an earlier run; a throughput
+# drop or p99 rise beyond the threshold is reported as a regression.
+#
+# Each measurement is repeated: throughput is the best of the repeats, and each
+# latency percentile is the median of the repeats. The script re-runs itself with
+# PYTHONHASHSEED pinned, so Python's string hash, used by the maps and dict and
+# for the order of the generated keys, is the same from one run to the next.
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_workloads [--entries 100000] [--repeat 5]
+#                                          [--output run.json] [--compare baseline.json]
+#                                          [--threshold 0.1]
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import string
+import sys
+import time
+
+import hash_map_oa
+import hash_map_sc
+from a6_include import hash_function_1
+from benchmarks.common import builtin_hash
+
+PUT, GET, REMOVE = 0, 1, 2
+
+# latency percentiles reported, and the keys they are saved under
+PERCENTILES = (('p50', 0.5), ('p90', 0.9), ('p99', 0.99), ('p999', 0.999))
+
+WORKLOADS = ('uniform', 'zipf', 'anagram', 'churn', 'grow')
+MAPS = ('sc', 'oa', 'dict')
+
+# PYTHONHASHSEED the benchmark runs under
+HASH_SEED = '0'
+
+
+def make_map(name: str, function) -> tuple:
+    """
+    Returns put, get and remove functions over a new, empty map of the given kind.
+    dict always uses Python's own hash.
+    """
+    if name == 'dict':
+        d = {}
+        return d.__setitem__, d.get, lambda key: d.pop(key, None)
+
+    map_class = hash_map_sc.HashMap if name == 'sc' else hash_map_oa.HashMap
+    m = map_class(11, function)
+    return m.put, m.get, m.remove
+
+
+def random_keys(rng: random.Random, count: int) -> list:
+    """Returns count distinct random keys."""
+    keys = set()
+    while len(keys) < count:
+        keys.add(''.join(rng.choice(string.ascii_letters) for _ in range(10)))
+    return list(keys)
+
+
+def anagram_keys(rng: random.Random, count: int) -> list:
+    """
+    Returns count keys made of up to 24 permutations each of random 4 to 8 letter words.
+    Every permutation of a word has the same hash_function_1 code, and the character sums
+    of all such words fall in a range of a few hundred codes.
+    """
+    keys = set()
+    while len(keys) < count:
+        word = [rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 8))]
+        for _ in range(24):
+            rng.shuffle(word)
+            keys.add(''.join(word))
+    keys = sorted(keys)[:count]
+    rng.shuffle(keys)
+    return keys
+
+
+def workload(name: str, rng: random.Random, entries: int) -> tuple:
+    """
+    Returns the keys the map is filled with before timing, the timed operations
+    as (operation, key) pairs, and whether the maps use hash_function_1.
+    """
+    if name == 'uniform':
+        keys = random_keys(rng, entries)
+        return keys, [(GET, rng.choice(keys)) for _ in range(entries)], False
+
+    if name == 'zipf':
+        keys = random_keys(rng, entries)
+        cumulative, total = [], 0.0
+        for rank in range(1, entries + 1):
+            total += 1 / rank ** 1.1
+            cumulative.append(total)
+        chosen = rng.choices(keys, cum_weights=cumulative, k=entries)
+        return keys, [(GET, key) for key in chosen], False
+
+    if name == 'anagram':
+        keys = anagram_keys(rng, entries)
+        half = len(keys) // 2
+        ops = [(PUT, key) for key in keys[half:]] + [(GET, rng.choice(keys)) for _ in keys]
+        return keys[:half], ops, True
+
+    if name == 'churn':
+        keys = random_keys(rng, 2 * entries)
+        live, fresh = keys[:entries], keys[entries:]
+        ops = []
+        for _ in range(entries):
+            roll = rng.random()
+            if roll < 0.5 and live:
+                ops.append((REMOVE, live.pop(rng.randrange(len(live)))))
+            elif roll < 0.8 and fresh:
+                key = fresh.pop()
+                live.append(key)
+                ops.append((PUT, key))
+            else:
+                ops.append((GET, rng.choice(keys)))
+        return keys[:entries], ops, False
+
+    if name == 'grow':
+        return [], [(PUT, key) for key in random_keys(rng, entries)], False
+
+    raise ValueError('unknown workload ' + name)
+
+
+def run_ops(map_name: str, prefill: list, ops: list, anagram: bool, timed: bool) -> tuple:
+    """
+    Fills a new map with the prefill keys and runs the operations on it.
+    Returns the total seconds and, if timed, the latency of every operation in seconds.
+    """
+    put, get, remove = make_map(map_name, hash_function_1 if anagram else builtin_hash)
+    for key in prefill:
+        put(key, key)
+
+    clock = time.perf_counter
+    latencies = []
+    start = clock()
+    if timed:
+        for op, key in ops:
+            op_start = clock()
+            if op == GET:
+                get(key)
+            elif op == PUT:
+                put(key, key)
+            else:
+                remove(key)
+            latencies.append(clock() - op_start)
+    else:
+        for op, key in ops:
+            if op == GET:
+                get(key)
+            elif op == PUT:
+                put(key, key)
+            else:
+                remove(key)
+    return clock() - start, latencies
+
+
+def measure(map_name: str, prefill: list, ops: list, anagram: bool, repeat: int) -> dict:
+    """
+    Returns the throughput of the operations (ops per second, untimed loop) and the
+    latency percentiles in microseconds (from a second, per-operation timed run).
+    Both runs are repeated: the throughput is the best of the repeats, and each
+    percentile the median of the repeats. The garbage collector is paused while
+    each run is timed.
+    """
+    throughputs = []
+    percentiles = {label: [] for label, _ in PERCENTILES + (('max', 1.0),)}
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            seconds, _ = run_ops(map_name, prefill, ops, anagram, timed=False)
+            _, latencies = run_ops(map_name, prefill, ops, anagram, timed=True)
+        finally:
+            gc.enable()
+
+        throughputs.append(len(ops) / seconds)
+        latencies.sort()
+        for label, fraction in PERCENTILES + (('max', 1.0),):
+            index = min(len(latencies) - 1, int(len(latencies) * fraction))
+            percentiles[label].append(latencies[index])
+
+    result = {'ops_per_sec': max(throughputs)}
+    for label, values in percentiles.items():
+        result[label + '_us'] = statistics.median(values) * 1e6
+    return result
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Returns a line for every workload and map whose throughput fell, or whose p99
+    latency rose, by more than threshold (a fraction) against the baseline results.
+    """
+    regressions = []
+    for workload_name, maps in results.items():
+        for map_name, r in maps.items():
+            old = baseline.get(workload_name, {}).get(map_name)
+            if old is None:
+                continue
+            if r['ops_per_sec'] < old['ops_per_sec'] * (1 - threshold):
+                regressions.append(f"{workload_name}/{map_name}: throughput "
+                                   f"{old['ops_per_sec']:.0f} -> {r['ops_per_sec']:.0f} ops/s")
+            if r['p99_us'] > old['p99_us'] * (1 + threshold):
+                regressions.append(f"{workload_name}/{map_name}: p99 "
+                                   f"{old['p99_us']:.2f} -> {r['p99_us']:.2f} us")
+    return regressions
+
+
+def run(entries: int, workloads: list, maps: list, seed: int, repeat: int) -> dict:
+    print(f"{entries} entries per workload, best of {repeat} throughput, "
+          f"median of {repeat} latencies in microseconds")
+    print(f"{'workload':>8} {'map':>5} {'ops/s':>10} {'p50':>7} {'p90':>7} {'p99':>7} "
+          f"{'p99.9':>8} {'max':>9}")
+
+    results = {}
+    for workload_name in workloads:
+        prefill, ops, anagram = workload(workload_name, random.Random(seed), entries)
+        results[workload_name] = {}
+        for map_name in maps:
+            r = measure(map_name, prefill, ops, anagram, repeat)
+            results[workload_name][map_name] = r
+            print(f"{workload_name:>8} {map_name:>5} {r['ops_per_sec']:>10.0f} {r['p50_us']:>7.2f} "
+                  f"{r['p90_us']:>7.2f} {r['p99_us']:>7.2f} {r['p999_us']:>8.2f} "
+                  f"{r['max_us']:>9.1f}")
+    return results
+
+
+if __name__ == "__main__":
+    # Python's string hash is randomized per process unless PYTHONHASHSEED is set,
+    # and the seed can only be chosen before the interpreter starts
+    if os.environ.get('PYTHONHASHSEED') != HASH_SEED:
+        os.environ['PYTHONHASHSEED'] = HASH_SEED
+        os.execv(sys.executable, [sys.executable, '-m', __spec__.name] + sys.argv[1:])
+
+    parser = argparse.ArgumentParser(description="Workload benchmark for SC, OA and dict")
+    parser.add_argument('--entries', type=int, default=100000,
+                        help='keys in the map and operations per workload')
+    parser.add_argument('--workloads', nargs='+', choices=WORKLOADS, default=list(WORKLOADS),
+                        help='workloads to run')
+    parser.add_argument('--maps', nargs='+', choices=MAPS, default=list(MAPS),
+                        help='maps to run the workloads on')
+    parser.add_argument('--seed', type=int, default=21,
+                        help='seed of the generated keys and operations')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='times each workload is measured')
+    parser.add_argument('--output', help='save the results to this JSON file')
+    parser.add_argument('--compare', help='compare the results with this earlier JSON file')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='fractional throughput drop or p99 rise counted as a regression')
+    args = parser.parse_args()
+
+    results = run(args.entries, args.workloads, args.maps, args.seed, args.repeat)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'python': sys.version.split()[0],
+                'platform': platform.platform(),
+                'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'entries': args.entries,
+                'seed': args.seed,
+                'hash_seed': HASH_SEED,
+                'repeat': args.repeat,
+                'results': results,
+            }, f, indent=2)
+        print(f"\nresults saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('entries') != args.entries:
+            print(f"\nwarning: baseline ran with {baseline.get('entries')} entries")
+        regressions = compare(results, baseline['results'], args.threshold)
+        print(f"\n{len(regressions)} regressions against {args.compare} "
+              f"(threshold {args.threshold:.0%})")
+        for line in regressions:
+            print('  ' + line)
+        if regressions:
+            sys.exit(1)
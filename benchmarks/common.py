@@ -0,0 +1,15 @@
+# Description: Helpers shared by the benchmarks
+# Imported as benchmarks.common, so the benchmarks must be run from the
+# repository root with python -m benchmarks.<name>.
+
+from hash_functions import HASH_MASK
+
+
+def builtin_hash(key: str) -> int:
+    """
+    Python's string hash, masked to the unsigned 64-bit range of the repo's hash codes.
+    The sample hash functions only produce a few thousand distinct values for short
+    keys, which would turn any large table into one long cluster, so the benchmarks
+    use this hash to measure the maps rather than the hash function.
+    """
+    return hash(key) & HASH_MASK
@@ -0,0 +1,313 @@
+# Description: Hash functions, batch hashing and hash mixing for the HashMaps
+# Hashes a whole list of keys at once. When NumPy is installed the keys are
+# laid out as a padded UTF-32 code point matrix and hashed with row sums;
+# otherwise they are hashed one at a time with the scalar functions.
+# Also has seeded FNV-1a, SipHash-2-4 and XXH64 over the UTF-8 bytes of a key,
+# which any of the HashMaps take as their hash function.
+
+import secrets
+import struct
+
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# keys are hashed in chunks so the padded matrix stays a reasonable size
+BATCH_CHUNK = 65536
+
+# hash codes are mixed as unsigned 64-bit integers
+HASH_MASK = 0xFFFFFFFFFFFFFFFF
+
+# longest key for which the weighted row sum of hash_function_2 fits in int64
+MAX_VECTOR_KEY_LENGTH = 1 << 21
+
+# most code points in one padded matrix (64 MB of UTF-32); every row is padded to the
+# longest key, so a few long keys among short ones would otherwise blow it up
+MAX_VECTOR_ELEMENTS = 1 << 24
+
+
+def mix64(hash_code: int) -> int:
+    """
+    Returns the hash code finalized with the 64-bit mixer of MurmurHash3.
+    Every input bit affects every output bit, so the low bits are usable as a
+    bucket index even when the input (like a character sum) is poorly spread.
+    """
+    hash_code &= HASH_MASK
+    hash_code ^= hash_code >> 33
+    hash_code = (hash_code * 0xFF51AFD7ED558CCD) & HASH_MASK
+    hash_code ^= hash_code >> 33
+    hash_code = (hash_code * 0xC4CEB9FE1A85EC53) & HASH_MASK
+    hash_code ^= hash_code >> 33
+    return hash_code
+
+
+def _rotl(value: int, bits: int) -> int:
+    """Returns the 64-bit value rotated left by the given number of bits."""
+    return ((value << bits) | (value >> (64 - bits))) & HASH_MASK
+
+
+FNV_OFFSET_BASIS = 0xCBF29CE484222325
+FNV_PRIME = 0x100000001B3
+
+
+def fnv1a_hash(key: str, seed: int = 0) -> int:
+    """
+    Returns the 64-bit FNV-1a hash of the UTF-8 bytes of the key.
+    The seed is mixed into the offset basis, so each seed gives an unrelated function.
+    """
+    hash_code = FNV_OFFSET_BASIS ^ mix64(seed) if seed else FNV_OFFSET_BASIS
+    for byte in key.encode('utf-8'):
+        hash_code = ((hash_code ^ byte) * FNV_PRIME) & HASH_MASK
+    return hash_code
+
+
+def _sip_rounds(v0: int, v1: int, v2: int, v3: int, rounds: int) -> tuple:
+    """Returns the SipHash state after the given number of SipRounds."""
+    for _ in range(rounds):
+        v0 = (v0 + v1) & HASH_MASK
+        v1 = _rotl(v1, 13) ^ v0
+        v0 = _rotl(v0, 32)
+        v2 = (v2 + v3) & HASH_MASK
+        v3 = _rotl(v3, 16) ^ v2
+        v0 = (v0 + v3) & HASH_MASK
+        v3 = _rotl(v3, 21) ^ v0
+        v2 = (v2 + v1) & HASH_MASK
+        v1 = _rotl(v1, 17) ^ v2
+        v2 = _rotl(v2, 32)
+    return v0, v1, v2, v3
+
+
+def siphash24(key: str, seed: int = 0) -> int:
+    """
+    Returns the SipHash-2-4 of the UTF-8 bytes of the key under a 128-bit secret seed.
+    Without knowing the seed, an attacker cannot pick keys that collide, so a map
+    using a random seed (see seeded) resists collision flooding.
+    """
+    data = key.encode('utf-8')
+    k0, k1 = seed & HASH_MASK, (seed >> 64) & HASH_MASK
+    v0 = k0 ^ 0x736F6D6570736575
+    v1 = k1 ^ 0x646F72616E646F6D
+    v2 = k0 ^ 0x6C7967656E657261
+    v3 = k1 ^ 0x7465646279746573
+
+    words = len(data) // 8
+    for m in struct.unpack_from('<%dQ' % words, data):
+        v3 ^= m
+        v0, v1, v2, v3 = _sip_rounds(v0, v1, v2, v3, 2)
+        v0 ^= m
+
+    # the last word holds the leftover bytes and the low byte of the length
+    m = ((len(data) & 0xFF) << 56) | int.from_bytes(data[words * 8:], 'little')
+    v3 ^= m
+    v0, v1, v2, v3 = _sip_rounds(v0, v1, v2, v3, 2)
+    v0 ^= m
+
+    v2 ^= 0xFF
+    v0, v1, v2, v3 = _sip_rounds(v0, v1, v2, v3, 4)
+    return v0 ^ v1 ^ v2 ^ v3
+
+
+XXH_PRIME_1 = 0x9E3779B185EBCA87
+XXH_PRIME_2 = 0xC2B2AE3D27D4EB4F
+XXH_PRIME_3 = 0x165667B19E3779F9
+XXH_PRIME_4 = 0x85EBCA77C2B2AE63
+XXH_PRIME_5 = 0x27D4EB2F165667C5
+
+
+def _xxh_round(acc: int, lane: int) -> int:
+    """Returns the accumulator after taking in one 8-byte lane."""
+    return (_rotl((acc + lane * XXH_PRIME_2) & HASH_MASK, 31) * XXH_PRIME_1) & HASH_MASK
+
+
+def xxhash64(key: str, seed: int = 0) -> int:
+    """
+    Returns the XXH64 hash of the UTF-8 bytes of the key.
+    The key is read 8 bytes at a time and mixed with multiplies and rotations,
+    so it takes far fewer steps per key than a loop over its characters.
+    """
+    data = key.encode('utf-8')
+    length = len(data)
+    seed &= HASH_MASK
+    offset = 0
+
+    if length >= 32:
+        v1 = (seed + XXH_PRIME_1 + XXH_PRIME_2) & HASH_MASK
+        v2 = (seed + XXH_PRIME_2) & HASH_MASK
+        v3 = seed
+        v4 = (seed - XXH_PRIME_1) & HASH_MASK
+        stripes = length // 32
+        lanes = struct.unpack_from('<%dQ' % (stripes * 4), data)
+        for i in range(0, stripes * 4, 4):
+            v1 = _xxh_round(v1, lanes[i])
+            v2 = _xxh_round(v2, lanes[i + 1])
+            v3 = _xxh_round(v3, lanes[i + 2])
+            v4 = _xxh_round(v4, lanes[i + 3])
+        offset = stripes * 32
+
+        hash_code = (_rotl(v1, 1) + _rotl(v2, 7) + _rotl(v3, 12) + _rotl(v4, 18)) & HASH_MASK
+        for v in (v1, v2, v3, v4):
+            hash_code ^= _xxh_round(0, v)
+            hash_code = (hash_code * XXH_PRIME_1 + XXH_PRIME_4) & HASH_MASK
+    else:
+        hash_code = (seed + XXH_PRIME_5) & HASH_MASK
+
+    hash_code = (hash_code + length) & HASH_MASK
+
+    words = (length - offset) // 8
+    for lane in struct.unpack_from('<%dQ' % words, data, offset):
+        hash_code ^= _xxh_round(0, lane)
+        hash_code = (_rotl(hash_code, 27) * XXH_PRIME_1 + XXH_PRIME_4) & HASH_MASK
+    offset += words * 8
+
+    if length - offset >= 4:
+        lane = struct.unpack_from('<I', data, offset)[0]
+        hash_code ^= (lane * XXH_PRIME_1) & HASH_MASK
+        hash_code = (_rotl(hash_code, 23) * XXH_PRIME_2 + XXH_PRIME_3) & HASH_MASK
+        offset += 4
+
+    for byte in data[offset:]:
+        hash_code ^= (byte * XXH_PRIME_5) & HASH_MASK
+        hash_code = (_rotl(hash_code, 11) * XXH_PRIME_1) & HASH_MASK
+
+    hash_code ^= hash_code >> 33
+    hash_code = (hash_code * XXH_PRIME_2) & HASH_MASK
+    hash_code ^= hash_code >> 29
+    hash_code = (hash_code * XXH_PRIME_3) & HASH_MASK
+    hash_code ^= hash_code >> 32
+    return hash_code
+
+
+def seeded(function, seed: int = None):
+    """
+    Returns a one-argument hash function that calls function(key, seed), for use
+    as the hash function of a HashMap. Without a seed, a random 128-bit seed is drawn,
+    so the bucket of each key differs from process to process.
+    """
+    if seed is None:
+        seed = secrets.randbits(128)
+    return lambda key: function(key, seed)
+
+
+def as_list(keys) -> list:
+    """
+    Returns the keys as a list. Accepts a DynamicArray or any iterable.
+    """
+    if isinstance(keys, DynamicArray):
+        return [keys.get_at_index(i) for i in range(keys.length())]
+    if isinstance(keys, list):
+        return keys
+    return list(keys)
+
+
+def _code_point_matrix(keys: list):
+    """
+    Returns the keys as an (n, longest key) matrix of code points, padded with zeros,
+    or None if the chunk cannot be hashed exactly in int64 or the matrix would hold
+    more than MAX_VECTOR_ELEMENTS code points.
+    Padding code points are 0, so they add nothing to either hash.
+    """
+    width = max(map(len, keys), default=0)
+    if width == 0 or width > MAX_VECTOR_KEY_LENGTH or width * len(keys) > MAX_VECTOR_ELEMENTS:
+        return None
+    matrix = np.array(keys, dtype=str)
+    width = matrix.dtype.itemsize // 4
+    return matrix.view(np.uint32).reshape(len(keys), width)
+
+
+def _hash_chunk(chunk: list, scalar_function, vector_function) -> list:
+    """
+    Hashes one chunk with vector_function. If the padded matrix would be too large,
+    the keys too long for it are hashed with scalar_function and the rest as a matrix.
+    """
+    matrix = _code_point_matrix(chunk)
+    if matrix is not None:
+        return vector_function(matrix).tolist()
+
+    limit = min(MAX_VECTOR_KEY_LENGTH, MAX_VECTOR_ELEMENTS // len(chunk))
+    short = [i for i, key in enumerate(chunk) if len(key) <= limit]
+    if not short or len(short) == len(chunk):
+        return [scalar_function(key) for key in chunk]
+
+    hashes = [scalar_function(key) if len(key) > limit else None for key in chunk]
+    short_hashes = _hash_chunk([chunk[i] for i in short], scalar_function, vector_function)
+    for i, hash_code in zip(short, short_hashes):
+        hashes[i] = hash_code
+    return hashes
+
+
+def _batch(keys, scalar_function, vector_function) -> list:
+    """
+    Hashes the keys chunk by chunk with vector_function, falling back to
+    scalar_function for keys NumPy cannot hash exactly or cheaply.
+    """
+    keys = as_list(keys)
+    if np is None:
+        return [scalar_function(key) for key in keys]
+
+    hashes = []
+    for start in range(0, len(keys), BATCH_CHUNK):
+        hashes.extend(_hash_chunk(keys[start:start + BATCH_CHUNK], scalar_function,
+                                  vector_function))
+    return hashes
+
+
+def hash_function_1_batch(keys) -> list:
+    """
+    Returns a list with hash_function_1(key) for every key, in input order.
+    The results match the scalar function bit for bit.
+    """
+    return _batch(keys, hash_function_1,
+                  lambda matrix: matrix.sum(axis=1, dtype=np.int64))
+
+
+def hash_function_2_batch(keys) -> list:
+    """
+    Returns a list with hash_function_2(key) for every key, in input order.
+    The results match the scalar function bit for bit.
+    """
+    return _batch(keys, hash_function_2,
+                  lambda matrix: np.einsum('ij,j->i', matrix,
+                                           np.arange(1, matrix.shape[1] + 1, dtype=np.int64)))
+
+
+def hash_batch(function, keys):
+    """
+    Returns function(key) for every key, in input order.
+    The sample hash functions are computed in one batch and returned as a list.
+    Any other hash function is returned as a lazy iterator that calls it once
+    per key, so no intermediate list is built.
+    """
+    if function is hash_function_1:
+        return hash_function_1_batch(keys)
+    if function is hash_function_2:
+        return hash_function_2_batch(keys)
+    return map(function, as_list(keys))
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nBatch hashing example 1")
+    print("-----------------------")
+    keys = ['', 'a', 'key1', 'anagram', 'nagaram', 'ключ', '鍵' * 3, 'x\x00', 'z' * 40]
+    print(hash_function_1_batch(keys))
+    print(hash_function_2_batch(keys))
+    print(hash_function_1_batch(keys) == [hash_function_1(key) for key in keys])
+    print(hash_function_2_batch(keys) == [hash_function_2(key) for key in keys])
+
+    print("\nBatch hashing example 2")
+    print("-----------------------")
+    da = DynamicArray(['str' + str(i) for i in range(5)])
+    print(hash_batch(hash_function_2, da))
+    print(list(hash_batch(len, da)))
+
+    print("\nSeeded hash functions example 1")
+    print("-------------------------------")
+    for key in ['', 'a', 'anagram', 'nagaram', 'ключ', 'z' * 40]:
+        print(repr(key), hex(fnv1a_hash(key)), hex(siphash24(key)), hex(xxhash64(key)))
+    print(fnv1a_hash('a', 1) != fnv1a_hash('a'), xxhash64('a', 1) != xxhash64('a'))
+    print(seeded(siphash24, 42)('key') == siphash24('key', 42))
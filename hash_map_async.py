@@ -0,0 +1,217 @@
+# Description: asyncio facade over the SC and OA HashMaps
+# Bulk loads and resizes are cut into slices, and the facade yields to the event
+# loop between slices, so other tasks keep running while a large map grows.
+# A slice inserts pairs, or rehashes buckets, a few at a time until it has
+# blocked the loop for slice_seconds, so a slice overruns its time by at most
+# one small step however the cost per pair or per bucket changes.
+
+import asyncio
+import time
+
+from a6_include import hash_function_1
+from hash_functions import as_list
+import hash_map_oa
+import hash_map_sc
+
+# default time, in seconds, a single slice may block the event loop
+SLICE_SECONDS = 0.002
+
+# pairs inserted, or buckets rehashed, between two checks of the clock within a slice
+SLICE_STEP = 128
+
+
+class AsyncHashMap:
+    def __init__(self, hash_map, slice_seconds: float = SLICE_SECONDS) -> None:
+        """
+        Initialize the facade over a hash_map_sc or hash_map_oa HashMap. put_many, load_from
+        and resize insert pairs or migrate buckets in slices that each block the event loop
+        for about slice_seconds, and yield to the loop between slices. A resize runs as an
+        incremental rehash, whether or not the map was created in incremental mode: that
+        covers growing, the open addressing map's same-capacity rehash that clears
+        tombstones, and shrinking after remove. get and contains_key are called directly
+        on the map. The facade only uses the map's public methods: resize_needed tells it
+        when a put would resize, and start_resize and rehash carry the resize out.
+        """
+        if slice_seconds <= 0:
+            raise ValueError('slice_seconds must be positive')
+
+        self._map = hash_map
+        self._slice_seconds = slice_seconds
+
+        # longest time, in seconds, a single slice blocked the event loop
+        self._max_slice = 0.0
+
+    def get_map(self):
+        """
+        Return the wrapped hash map
+        """
+        return self._map
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._map.get_size()
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._map.get_capacity()
+
+    def get_max_slice(self) -> float:
+        """
+        Returns the longest time, in seconds, that a single slice of put_many, load_from
+        or resize blocked the event loop
+        """
+        return self._max_slice
+
+    # ------------------------------------------------------------------ #
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key, or None if the key is not in the map.
+        """
+        return self._map.get(key)
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if given key is in the hash map, otherwise returns False.
+        """
+        return self._map.contains_key(key)
+
+    async def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map. If the map has
+        a shrink_load and the remove shrinks the table, the shrink runs as an async resize.
+        """
+        # the map only starts the shrink, which is then drained here
+        self._map.remove(key, incremental=True)
+        if self._map.is_rehashing():
+            await self._drain()
+
+    async def put(self, key: str, value: object) -> None:
+        """
+        Updates the key/value pair in the hash map. If the put would resize the table,
+        the table is first resized with an async resize.
+        """
+        await self._make_room(1)
+        self._map.put(key, value)
+
+    async def put_many(self, pairs) -> None:
+        """
+        Updates the hash map with every (key, value) pair, in order, in slices, yielding
+        to the event loop between slices. When the next pairs would grow the table, or make
+        the open addressing map rehash in place to clear tombstones, the slice ends and
+        the table is resized with an async resize. pairs may be any iterable
+        of tuples or a DynamicArray of tuples.
+        """
+        pairs = as_list(pairs)
+        clock = time.perf_counter
+        i = 0
+        while i < len(pairs):
+            await self._make_room(min(SLICE_STEP, len(pairs) - i))
+
+            start = clock()
+            while i < len(pairs) and clock() - start < self._slice_seconds:
+                chunk = pairs[i:i + SLICE_STEP]
+                if self._map.is_rehashing() or self._map.resize_needed(len(chunk)) is not None:
+                    break
+                self._map.put_many(chunk)
+                i += len(chunk)
+            self._max_slice = max(self._max_slice, clock() - start)
+            await asyncio.sleep(0)
+
+    async def load_from(self, source) -> None:
+        """
+        Puts every (key, value) pair of the async iterable into the hash map, in order.
+        Pairs are collected and inserted SLICE_STEP at a time, as put_many does.
+        """
+        batch = []
+        async for pair in source:
+            batch.append(pair)
+            if len(batch) >= SLICE_STEP:
+                await self.put_many(batch)
+                batch = []
+        if batch:
+            await self.put_many(batch)
+
+    async def _make_room(self, n: int) -> None:
+        """
+        Makes sure the map can take n more pairs without a stop-the-world resize: finishes
+        a rehash in progress, then grows or compacts the table with an async resize.
+        """
+        if self._map.is_rehashing():
+            await self._drain()
+
+        capacity = self._map.resize_needed(n)
+        if capacity is not None:
+            await self.resize(capacity)
+
+    async def resize(self, new_capacity: int) -> None:
+        """
+        Changes the capacity of the internal hash table as resize_table does, with an
+        incremental rehash carried forward a slice of buckets at a time, yielding to the
+        event loop between slices. The map answers gets, puts and removes from other tasks
+        while the rehash is in progress. A rehash already in progress is finished first.
+        The open addressing map allocates its new bucket array in one piece when the
+        rehash starts; the chaining map allocates it in slices too.
+        """
+        if new_capacity < 1:
+            return
+
+        m = self._map
+        if m.is_rehashing():
+            await self._drain()
+
+        start = time.perf_counter()
+        m.start_resize(new_capacity)
+        self._max_slice = max(self._max_slice, time.perf_counter() - start)
+        await asyncio.sleep(0)
+        await self._drain()
+
+    async def _drain(self) -> None:
+        """
+        Carries the incremental rehash in progress to the end, a slice at a time
+        """
+        m = self._map
+        clock = time.perf_counter
+        active = True
+        while active:
+            start = clock()
+            while active and clock() - start < self._slice_seconds:
+                active = m.rehash(SLICE_STEP)
+            self._max_slice = max(self._max_slice, clock() - start)
+            if active:
+                await asyncio.sleep(0)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    async def pairs(count: int):
+        for i in range(count):
+            yield 'key' + str(i), i
+
+    async def ticker(ticks: list) -> None:
+        while True:
+            ticks.append(None)
+            await asyncio.sleep(0)
+
+    async def example(map_class) -> None:
+        m = AsyncHashMap(map_class(11, hash_function_1))
+        ticks = []
+        task = asyncio.create_task(ticker(ticks))
+        await m.load_from(pairs(2000))
+        await m.put_many([('key' + str(i), -i) for i in range(1000, 3000)])
+        await m.put('extra', 'value')
+        await m.resize(m.get_capacity() * 4)
+        task.cancel()
+        print(m.get_size(), m.get_capacity(), m.get('key5'), m.get('key2500'), m.get('extra'),
+              m.get_map().get_keys_and_values().length(), len(ticks) > 10)
+
+    print("\nAsync - load example 1")
+    print("----------------------")
+    for map_class in (hash_map_sc.HashMap, hash_map_oa.HashMap):
+        asyncio.run(example(map_class))
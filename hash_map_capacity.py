@@ -0,0 +1,128 @@
+# Description: Capacity selection shared by the HashMaps
+# Growth follows a precomputed ladder of roughly doubling primes; any other
+# requested capacity is rounded up with a deterministic Miller-Rabin test.
+# Maps in power-of-two mode round capacities up to a power of two instead.
+
+from bisect import bisect_left
+
+# PRIME_LADDER[i + 1] is the next prime after 2 * PRIME_LADDER[i], up to 2^40.
+# Doubling a capacity on the ladder therefore gives the same prime that
+# next_prime(2 * capacity) would find, without testing any candidates.
+PRIME_LADDER = (
+    2, 5, 11, 23, 47, 97, 197, 397, 797, 1597, 3203, 6421, 12853, 25717,
+    51437, 102877, 205759, 411527, 823117, 1646237, 3292489, 6584983,
+    13169977, 26339969, 52679969, 105359939, 210719881, 421439783,
+    842879579, 1685759167, 3371518343, 6743036717, 13486073473,
+    26972146961, 53944293929, 107888587883, 215777175787, 431554351609,
+    863108703229, 1726217406467,
+)
+
+# Miller-Rabin with these bases is deterministic for every n < 3.3 * 10^24
+WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+
+def _on_ladder(n: int) -> bool:
+    """Return True if n is one of the ladder primes."""
+    i = bisect_left(PRIME_LADDER, n)
+    return i < len(PRIME_LADDER) and PRIME_LADDER[i] == n
+
+
+def is_prime(n: int) -> bool:
+    """
+    Determine if given integer is a prime number and return boolean
+    """
+    if n < 2:
+        return False
+
+    if _on_ladder(n):
+        return True
+
+    for p in WITNESSES:
+        if n % p == 0:
+            return n == p
+
+    # write n - 1 as d * 2^s with d odd
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    for a in WITNESSES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+
+    return True
+
+
+def next_prime(capacity: int) -> int:
+    """
+    Increment from given number to find the closest prime number.
+    Even numbers are rounded up first, so a capacity of 2 becomes 3;
+    resize_table keeps a requested capacity of 2 as is.
+    """
+    if capacity < 3:
+        return 3
+
+    if capacity % 2 == 0:
+        capacity += 1
+
+    while not is_prime(capacity):
+        capacity += 2
+
+    return capacity
+
+
+def double_capacity(capacity: int) -> int:
+    """
+    Returns the capacity a table grows to when it doubles: the next prime after
+    2 * capacity. Capacities on the ladder step to the next ladder prime.
+    """
+    i = bisect_left(PRIME_LADDER, capacity)
+    if i + 1 < len(PRIME_LADDER) and PRIME_LADDER[i] == capacity:
+        return PRIME_LADDER[i + 1]
+
+    return next_prime(capacity * 2)
+
+
+def next_power_of_two(capacity: int) -> int:
+    """
+    Returns the smallest power of two that is >= the given capacity
+    """
+    if capacity <= 1:
+        return 1
+
+    return 1 << (capacity - 1).bit_length()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nnext_prime example 1")
+    print("--------------------")
+    print([next_prime(n) for n in (0, 1, 2, 3, 4, 10, 12, 100, 1000)])
+
+    print("\ndouble_capacity example 1")
+    print("-------------------------")
+    capacity = 11
+    for _ in range(8):
+        capacity = double_capacity(capacity)
+        print(capacity, end=' ')
+    print()
+    print(double_capacity(53), next_prime(106))
+
+    print("\nis_prime example 1")
+    print("------------------")
+    print(all(is_prime(p) for p in PRIME_LADDER))
+    print(is_prime(2 ** 61 - 1), is_prime(2 ** 61 + 1), is_prime(561))
+
+    print("\nnext_power_of_two example 1")
+    print("---------------------------")
+    print([next_power_of_two(n) for n in (0, 1, 2, 3, 11, 64, 65)])
@@ -0,0 +1,443 @@
+# Description: Thread-safe Hash Map with lock striping
+# Uses the chaining layout of hash_map_sc: a Dynamic Array of Linked Lists.
+# The buckets are split into contiguous ranges (stripes), each guarded by its
+# own lock, so writers to different stripes never contend. A resize takes every
+# stripe, in order. All shared state is read and written under a lock, so the
+# map does not rely on the GIL and is also safe on free-threaded CPython builds.
+# There the stripe locks are read-write locks, so readers never block each
+# other; with the GIL readers cannot run in parallel anyway, so each stripe
+# gets a plain mutex, which is much cheaper to take.
+
+import sys
+import threading
+
+from a6_include import (DynamicArray, LinkedList,
+                        hash_function_1, hash_function_2)
+from hash_map_capacity import double_capacity, is_prime, next_prime
+
+# number of stripes (locks) the buckets are divided into
+STRIPES = 16
+
+
+class ReadWriteLock:
+    """
+    Lock that admits any number of readers at once, or a single writer.
+    Waiting writers go ahead of newly arriving readers, so a steady stream of
+    reads cannot starve them. The lock is not reentrant.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an unlocked lock."""
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    def acquire_read(self) -> None:
+        """Blocks until no writer holds or waits for the lock, then enters as a reader."""
+        with self._condition:
+            while self._writer or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self) -> None:
+        """Leaves as a reader, waking the writers once the last reader is out."""
+        with self._condition:
+            self._readers -= 1
+            if self._readers == 0:
+                self._condition.notify_all()
+
+    def acquire_write(self) -> None:
+        """Blocks until no reader or writer holds the lock, then holds it alone."""
+        with self._condition:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+
+    def release_write(self) -> None:
+        """Releases the lock held as a writer."""
+        with self._condition:
+            self._writer = False
+            self._condition.notify_all()
+
+
+class ExclusiveLock:
+    """
+    threading.Lock with the interface of ReadWriteLock: readers exclude each other
+    as well as writers. The lock methods are bound straight to the Lock's, so taking
+    the lock costs no Python call.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an unlocked lock."""
+        lock = threading.Lock()
+        self.acquire_read = self.acquire_write = lock.acquire
+        self.release_read = self.release_write = lock.release
+
+
+def gil_enabled() -> bool:
+    """Returns True if the interpreter runs with the GIL, as every build before 3.13 does."""
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return is_gil_enabled is None or is_gil_enabled()
+
+
+class ConcurrentHashMap:
+    def __init__(self, capacity: int = 11, function: callable = hash_function_1,
+                 stripes: int = STRIPES, shared_reads: bool = None) -> None:
+        """
+        Initialize new thread-safe HashMap that uses separate chaining for collision
+        resolution, with its buckets divided into the given number of lock stripes.
+        The table doubles when its load factor reaches 1.0, as in hash_map_sc.
+        With shared_reads, each stripe has a ReadWriteLock, so readers share it;
+        otherwise it has an ExclusiveLock. By default reads are shared only when the
+        GIL is disabled, since with the GIL they cannot run in parallel.
+        """
+        if stripes < 1:
+            raise ValueError('stripes must be at least 1')
+
+        if shared_reads is None:
+            shared_reads = not gil_enabled()
+
+        self._hash = function
+        lock_class = ReadWriteLock if shared_reads else ExclusiveLock
+        self._locks = tuple(lock_class() for _ in range(stripes))
+
+        # the bucket array and its capacity are replaced together, as one tuple,
+        # so a thread never sees the buckets of one table with the capacity of another
+        capacity = next_prime(capacity)
+        self._table = (self._new_buckets(capacity), capacity)
+
+        # number of nodes in the buckets of each stripe, updated under that stripe's lock
+        self._counts = [0] * stripes
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        self._acquire_all(read=True)
+        try:
+            buckets, capacity = self._table
+            out = ''
+            for i in range(capacity):
+                out += str(i) + ': ' + str(buckets.get_at_index(i)) + '\n'
+            return out
+        finally:
+            self._release_all(read=True)
+
+    @staticmethod
+    def _new_buckets(capacity: int) -> DynamicArray:
+        """Returns a bucket array of empty chains."""
+        buckets = DynamicArray()
+        for _ in range(capacity):
+            buckets.append(LinkedList())
+        return buckets
+
+    def _stripe(self, index: int, capacity: int) -> int:
+        """Returns the stripe of the bucket at the given index: stripes cover equal ranges."""
+        return index * len(self._locks) // capacity
+
+    def _acquire_all(self, read: bool) -> None:
+        """Takes every stripe lock, in stripe order, so two threads doing it cannot deadlock."""
+        for lock in self._locks:
+            if read:
+                lock.acquire_read()
+            else:
+                lock.acquire_write()
+
+    def _release_all(self, read: bool) -> None:
+        """Releases every stripe lock, in reverse order."""
+        for lock in reversed(self._locks):
+            if read:
+                lock.release_read()
+            else:
+                lock.release_write()
+
+    def _locked_chain(self, hash_code: int, write: bool) -> tuple:
+        """
+        Takes the lock of the stripe the hash code maps to and returns the chain, its
+        stripe and its lock. A resize can replace the table while a thread waits for the
+        lock, so the lookup is retried until the table is the same after locking.
+        """
+        while True:
+            table = self._table
+            buckets, capacity = table
+            index = hash_code % capacity
+            stripe = self._stripe(index, capacity)
+            lock = self._locks[stripe]
+            if write:
+                lock.acquire_write()
+            else:
+                lock.acquire_read()
+            if self._table is table:
+                return buckets.get_at_index(index), stripe, lock
+            if write:
+                lock.release_write()
+            else:
+                lock.release_read()
+
+    @staticmethod
+    def _find_node(chain: LinkedList, key: str, hash_code: int):
+        """
+        Returns the node of the given key in the chain, or None if the key is not in it.
+        """
+        for node in chain:
+            if node.hash_code == hash_code and node.key == key:
+                return node
+        return None
+
+    def get_size(self) -> int:
+        """
+        Return size of map. While other threads are writing, the result may already
+        be out of date when it is returned.
+        """
+        return sum(self._counts)
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._table[1]
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates the key/value pair in the hash map.
+        If the given key already exists in the hash map, then its associated value
+        is replaced with the new value. If the given key is not in the hash map, a
+        new key/value pair is added. Table is resized to double its current
+        capacity when the load factor reaches 1.0.
+        """
+        self._put(key, value, True)
+
+    def put_if_absent(self, key: str, value: object) -> object:
+        """
+        Adds the key/value pair only if the key is not in the hash map, as one atomic
+        step. Returns the value already stored for the key, or None if it was added.
+        """
+        return self._put(key, value, False)
+
+    def _put(self, key: str, value: object, replace: bool) -> object:
+        """
+        Adds the pair, or replaces the value of an existing key if replace is set.
+        Returns the value the key had before, or None if it was added.
+        """
+        hash_code = self._hash(key)
+        chain, stripe, lock = self._locked_chain(hash_code, write=True)
+        try:
+            node = self._find_node(chain, key, hash_code)
+            if node is not None:
+                previous = node.value
+                if replace:
+                    node.value = value
+                return previous
+            chain.insert(key, value, hash_code)
+            self._counts[stripe] += 1
+            capacity = self._table[1]
+        finally:
+            lock.release_write()
+
+        # the size is read outside the stripe locks, so the check is approximate;
+        # _grow checks the load again once it holds every stripe
+        if self.get_size() >= capacity:
+            self._grow(capacity)
+        return None
+
+    def _grow(self, capacity: int) -> None:
+        """
+        Doubles the table if it still has the given capacity and is at load factor 1.0
+        once every stripe is locked; another thread may have grown it in the meantime.
+        """
+        self._acquire_all(read=False)
+        try:
+            if self._table[1] == capacity and sum(self._counts) >= capacity:
+                self._rehash(double_capacity(capacity))
+        finally:
+            self._release_all(read=False)
+
+    def _rehash(self, new_capacity: int) -> None:
+        """
+        Moves every node into a new table of the given capacity, using the cached hash
+        codes, and recounts the nodes of each stripe. The caller holds every stripe lock.
+        """
+        buckets, capacity = self._table
+        new_buckets = self._new_buckets(new_capacity)
+        counts = [0] * len(self._locks)
+
+        for i in range(capacity):
+            for node in buckets.get_at_index(i):
+                index = node.hash_code % new_capacity
+                new_buckets.get_at_index(index).insert(node.key, node.value, node.hash_code)
+                counts[self._stripe(index, new_capacity)] += 1
+
+        self._table = (new_buckets, new_capacity)
+        self._counts = counts
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes the capacity of the internal hash table, rounded up to a prime number.
+        All stripes are locked while the nodes are moved. If new_capacity is less than 1,
+        the method does nothing.
+        """
+        if new_capacity < 1:
+            return
+        if not is_prime(new_capacity):
+            new_capacity = next_prime(new_capacity)
+
+        self._acquire_all(read=False)
+        try:
+            self._rehash(new_capacity)
+        finally:
+            self._release_all(read=False)
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with given key. If key is not in the hash map, return None.
+        """
+        hash_code = self._hash(key)
+        chain, _, lock = self._locked_chain(hash_code, write=False)
+        try:
+            node = self._find_node(chain, key, hash_code)
+            return None if node is None else node.value
+        finally:
+            lock.release_read()
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if given key is in the hash map, otherwise returns False.
+        An empty hash map does not contain any keys.
+        """
+        hash_code = self._hash(key)
+        chain, _, lock = self._locked_chain(hash_code, write=False)
+        try:
+            return self._find_node(chain, key, hash_code) is not None
+        finally:
+            lock.release_read()
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map. If key is not in the hash map,
+        the method does nothing (no exception needs to be raised).
+        """
+        hash_code = self._hash(key)
+        chain, stripe, lock = self._locked_chain(hash_code, write=True)
+        try:
+            if chain.remove(key):
+                self._counts[stripe] -= 1
+        finally:
+            lock.release_write()
+
+    def table_load(self) -> float:
+        """
+        Returns the current hash table load factor.
+        """
+        return self.get_size() / self.get_capacity()
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty buckets in the hash table, counted with every
+        stripe locked for reading.
+        """
+        self._acquire_all(read=True)
+        try:
+            buckets, capacity = self._table
+            return sum(1 for i in range(capacity) if buckets.get_at_index(i).length() == 0)
+        finally:
+            self._release_all(read=True)
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map. It does not change the underlying hash table capacity.
+        """
+        self._acquire_all(read=False)
+        try:
+            capacity = self._table[1]
+            self._table = (self._new_buckets(capacity), capacity)
+            self._counts = [0] * len(self._locks)
+        finally:
+            self._release_all(read=False)
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array where each index contains a tuple of a key/value pair stored
+        in the hash map: a consistent snapshot, taken with every stripe locked for reading.
+        """
+        da = DynamicArray()
+        self._acquire_all(read=True)
+        try:
+            buckets, capacity = self._table
+            for i in range(capacity):
+                for node in buckets.get_at_index(i):
+                    da.append((node.key, node.value))
+        finally:
+            self._release_all(read=True)
+        return da
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+    import random
+
+    print("\nConcurrent - put example 1")
+    print("--------------------------")
+    m = ConcurrentHashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nConcurrent - put_if_absent example 1")
+    print("------------------------------------")
+    m = ConcurrentHashMap(11, hash_function_2)
+    print(m.put_if_absent('key1', 10), m.put_if_absent('key1', 20), m.get('key1'))
+    m.remove('key1')
+    print(m.contains_key('key1'), m.get_size())
+
+    print("\nConcurrent - stress test 1")
+    print("--------------------------")
+    # every thread owns a range of keys and checks its own view of them as it goes,
+    # while all threads also overwrite a small set of shared keys; the table starts
+    # small, so puts from several threads trigger resizes under load; the test is run
+    # with exclusive stripe locks and with read-write stripe locks
+    threads, operations = 8, 20000
+    for shared_reads in (False, True):
+        m = ConcurrentHashMap(11, hash_function_2, stripes=4, shared_reads=shared_reads)
+        shared = ['shared' + str(i) for i in range(16)]
+        errors = []
+        expected = [None] * threads
+
+        def worker(number: int) -> None:
+            rng = random.Random(number)
+            own = {}
+            for step in range(operations):
+                key = 'w' + str(number) + '-' + str(rng.randrange(2000))
+                roll = rng.random()
+                if roll < 0.45:
+                    m.put(key, step)
+                    own[key] = step
+                elif roll < 0.7:
+                    m.remove(key)
+                    own.pop(key, None)
+                elif roll < 0.9:
+                    if m.get(key) != own.get(key):
+                        errors.append((number, key))
+                else:
+                    m.put(rng.choice(shared), number)
+            expected[number] = own
+
+        pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+
+        pairs = m.get_keys_and_values()
+        final = dict(pairs.get_at_index(i) for i in range(pairs.length()))
+        owned = {key: value for own in expected for key, value in own.items()}
+        print(len(errors), m.get_size() == len(owned) + len(shared),
+              all(final[key] == value for key, value in owned.items()),
+              all(final[key] in range(threads) for key in shared),
+              m.table_load() < 1.0)
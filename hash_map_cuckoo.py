@@ -0,0 +1,503 @@
+# Description: Hash Map Cuckoo Hashing Implementation
+# Uses two Dynamic Array tables of 4-slot buckets. Every key lives in one of its
+# two candidate buckets (one per table) or in a small stash, so a lookup inspects
+# at most 2 * 4 slots plus the stash, however unlucky the key set. Both buckets
+# depend on Python's own string hash, which is independent of the map's hash
+# function, so keys that share a hash code (like anagrams under hash_function_1)
+# still get different buckets in both tables. A compact array('Q') of tags per
+# table lets a lookup skip the slots of other keys without loading their entries.
+
+import random
+from array import array
+
+from a6_include import (DynamicArray, HashEntry,
+                        hash_function_1, hash_function_2)
+from hash_functions import HASH_MASK, mix64
+from hash_map_capacity import double_capacity, is_prime, next_prime
+from hash_map_views import ItemsView, KeysView, ValuesView
+
+# slots per bucket; with two choices of 4-slot buckets the tables fill past 90%
+SLOTS = 4
+
+# evictions tried before an insert gives up and puts the homeless entry in the stash
+MAX_KICKS = 100
+
+# entries the stash holds before the tables are rehashed with a new seed
+STASH_SIZE = 4
+
+# seeds tried by a rehash at one capacity before the tables are doubled
+REHASH_ATTEMPTS = 3
+
+# a rehash stops doubling the tables once they hold this many slots per entry
+MAX_SLOTS_PER_ENTRY = 16
+
+
+class CuckooEntry(HashEntry):
+    """
+    HashEntry that also caches the second, independent hash of its key,
+    so entries can be moved between their buckets without hashing the key again.
+    """
+
+    def __init__(self, key: str, value: object, hash_code: int, second_hash: int) -> None:
+        """Initialize an entry with both hash codes of its key."""
+        super().__init__(key, value, hash_code)
+        self.second_hash = second_hash
+
+
+class HashMapIterator:
+    """
+    Separate iterator class for the cuckoo HashMap.
+    Yields each entry of the first table, then the second table, then the stash,
+    and raises RuntimeError if the hash map gains or loses keys while it is being iterated.
+    """
+
+    def __init__(self, hash_map: "HashMap") -> None:
+        """Initialize the iterator at the first slot of the first table."""
+        self._map = hash_map
+        self._table = 0
+        self._index = 0
+        self._version = hash_map._version
+
+    def __iter__(self) -> "HashMapIterator":
+        """Return the iterator."""
+        return self
+
+    def __next__(self) -> HashEntry:
+        """Obtain the next entry and advance the iterator."""
+        if self._map._version != self._version:
+            raise RuntimeError('HashMap changed size during iteration')
+
+        # the stash is walked as a third table
+        arrays = self._map._tables + (self._map._stash,)
+        while self._table < len(arrays):
+            array = arrays[self._table]
+            while self._index < array.length():
+                entry = array.get_at_index(self._index)
+                self._index += 1
+                if entry is not None:
+                    return entry
+            self._table += 1
+            self._index = 0
+
+        raise StopIteration
+
+
+class HashMap:
+    def __init__(self, capacity: int, function, load_factor: float = 0.85) -> None:
+        """
+        Initialize new HashMap that uses cuckoo hashing for collision resolution.
+        capacity counts the slots of both tables; each table gets a prime number of
+        4-slot buckets. The tables double when their load factor reaches load_factor.
+        """
+        if not 0 < load_factor < 1:
+            raise ValueError('load_factor must be between 0 and 1')
+
+        self._hash_function = function
+        self._load_factor = load_factor
+
+        # the bucket indexes of a key combine its hash code and its second hash with the seed;
+        # a rehash picks a new seed, which moves every key to a new pair of buckets
+        self._seed = 0
+
+        # the eviction victims are picked at random, so cycles are unlikely to repeat
+        self._random = random.Random(0)
+
+        self._allocate(self._next_prime(-(-capacity // (2 * SLOTS))))
+        self._size = 0
+
+        # incremented whenever keys are added or removed, to detect mutation during iteration
+        self._version = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for t, table in enumerate(self._tables):
+            for i in range(table.length()):
+                out += str(t) + '.' + str(i) + ': ' + str(table[i]) + '\n'
+        for i in range(self._stash.length()):
+            out += 'stash: ' + str(self._stash[i]) + '\n'
+        return out
+
+    def _allocate(self, bucket_count: int) -> None:
+        """
+        Replaces both tables with empty tables of the given number of buckets,
+        and empties the stash
+        """
+        self._bucket_count = bucket_count
+        self._capacity = 2 * SLOTS * bucket_count
+        self._tables = (DynamicArray([None] * (SLOTS * bucket_count)),
+                        DynamicArray([None] * (SLOTS * bucket_count)))
+
+        # the tag of a slot is the second hash of its entry with the low bit set, or 0 if empty
+        self._tags = (array('Q', bytes(8 * SLOTS * bucket_count)),
+                      array('Q', bytes(8 * SLOTS * bucket_count)))
+        self._stash = DynamicArray()
+
+    def _next_prime(self, capacity: int) -> int:
+        """
+        Increment from given number to find the closest prime number
+        """
+        return next_prime(capacity)
+
+    @staticmethod
+    def _is_prime(capacity: int) -> bool:
+        """
+        Determine if given integer is a prime number and return boolean
+        """
+        return is_prime(capacity)
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map, in slots across both tables
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def _hashes(self, key: str) -> tuple:
+        """
+        Returns the hash code of the key under the map's hash function and its second hash.
+        The second hash is Python's string hash: SipHash keyed per process, computed in C
+        and cached by the string, and independent of the map's hash function.
+        """
+        return self._hash_function(key), hash(key) & HASH_MASK
+
+    def _first_slot(self, hash_code: int, second_hash: int) -> int:
+        """
+        Returns the index of the first slot of the key's bucket in the first table.
+        The high half of the second hash is mixed in, so keys that share a hash code get
+        different buckets, while a hash function equal to the second hash does not make
+        the first bucket follow the second one.
+        """
+        return (hash_code ^ self._seed ^ second_hash >> 32) % self._bucket_count * SLOTS
+
+    def _second_slot(self, second_hash: int) -> int:
+        """
+        Returns the index of the first slot of the key's bucket in the second table.
+        The second hash is already well spread, so it is only combined with the seed.
+        """
+        return (second_hash ^ self._seed) % self._bucket_count * SLOTS
+
+    def _find(self, key: str, hash_code: int, second_hash: int) -> tuple:
+        """
+        Returns (array, index) of the key's entry, where array is one of the tables
+        or the stash, or None if the key is not in the hash map.
+        Only the slots whose tag matches the second hash have their entry loaded.
+        """
+        tag = second_hash | 1
+        table, tags = self._tables[0], self._tags[0]
+        start = self._first_slot(hash_code, second_hash)
+        for index in range(start, start + SLOTS):
+            if tags[index] == tag and table.get_at_index(index).key == key:
+                return table, index
+
+        table, tags = self._tables[1], self._tags[1]
+        start = self._second_slot(second_hash)
+        for index in range(start, start + SLOTS):
+            if tags[index] == tag and table.get_at_index(index).key == key:
+                return table, index
+
+        for index in range(self._stash.length()):
+            entry = self._stash.get_at_index(index)
+            if entry.hash_code == hash_code and entry.key == key:
+                return self._stash, index
+
+        return None
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates the key/value pair in the hash map.
+        If the given key exists in the hash map, its associated value
+        is replaced with the new value in place.
+        If the given key is not in the hash map, new key/value pair is added.
+        Table is resized to double its current capacity when the method is called
+        and the current load factor of the table is >= 0.85 (or the configured load_factor)
+        """
+        if self.table_load() >= self._load_factor:
+            self.resize_table(2 * SLOTS * double_capacity(self._bucket_count))
+
+        hash_code, second_hash = self._hashes(key)
+        found = self._find(key, hash_code, second_hash)
+        if found is not None:
+            array, index = found
+            array.get_at_index(index).value = value
+            return
+
+        self._place(CuckooEntry(key, value, hash_code, second_hash))
+        self._size += 1
+        self._version += 1
+
+        if self._stash.length() > STASH_SIZE:
+            self._rehash()
+
+    def _place(self, entry: CuckooEntry) -> None:
+        """
+        Stores an entry whose key is not in the hash map. If both of its buckets are full,
+        a random resident of one of them is evicted and placed in turn, alternating tables.
+        After MAX_KICKS evictions the entry left without a slot goes to the stash.
+        """
+        table_index = 0
+        for _ in range(MAX_KICKS):
+            starts = (self._first_slot(entry.hash_code, entry.second_hash),
+                      self._second_slot(entry.second_hash))
+            for t in range(2):
+                tags = self._tags[t]
+                for index in range(starts[t], starts[t] + SLOTS):
+                    if tags[index] == 0:
+                        self._tables[t].set_at_index(index, entry)
+                        tags[index] = entry.second_hash | 1
+                        return
+
+            # both buckets are full: swap the entry with a random resident and move on with it
+            table = self._tables[table_index]
+            index = starts[table_index] + self._random.randrange(SLOTS)
+            entry, evicted = table.get_at_index(index), entry
+            table.set_at_index(index, evicted)
+            self._tags[table_index][index] = evicted.second_hash | 1
+            table_index = 1 - table_index
+
+        self._stash.append(entry)
+
+    def _rebuild(self, bucket_count: int) -> None:
+        """
+        Places every entry into new tables of the given number of buckets, trying
+        up to REHASH_ATTEMPTS new seeds, until the stash fits in STASH_SIZE. If no seed
+        fits it, the bucket count is doubled and the seeds are tried again, so the stash,
+        and with it the cost of a lookup, stays bounded. The tables stop doubling at
+        MAX_SLOTS_PER_ENTRY slots per entry (or the requested size, if larger): past that
+        RuntimeError is raised, with every entry still in the hash map.
+        """
+        entries = [entry for entry in self]
+        max_bucket_count = max(bucket_count, MAX_SLOTS_PER_ENTRY * len(entries) // (2 * SLOTS))
+
+        while True:
+            for _ in range(REHASH_ATTEMPTS):
+                self._seed = mix64(self._seed + 1)
+                self._allocate(bucket_count)
+                for entry in entries:
+                    self._place(entry)
+                if self._stash.length() <= STASH_SIZE:
+                    return
+            if bucket_count >= max_bucket_count:
+                raise RuntimeError('cuckoo tables cannot place the keys: too many share both hashes')
+            bucket_count = double_capacity(bucket_count)
+
+    def _rehash(self) -> None:
+        """
+        Moves every entry to new buckets, at the same capacity if a new seed is enough,
+        after the stash overflowed
+        """
+        self._rebuild(self._bucket_count)
+        self._version += 1
+
+    def table_load(self) -> float:
+        """
+        Returns the current hash table load factor
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty slots in the hash table
+        """
+        return self._capacity - self._size + self._stash.length()
+
+    def get_stash_count(self) -> int:
+        """
+        Returns the number of entries held in the stash
+        """
+        return self._stash.length()
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes the capacity of the internal hash table.
+        All existing key/value pairs remain in the new hash map. Entries are placed
+        using their cached hash codes, so no key is hashed again.
+        new_capacity must be > current number of elements in the hash map. If not, the method does nothing.
+        new_capacity is rounded up to two tables of a prime number of 4-slot buckets.
+        """
+        if new_capacity <= self._size:
+            return
+
+        bucket_count = -(-new_capacity // (2 * SLOTS))
+        if not self._is_prime(bucket_count):
+            bucket_count = self._next_prime(bucket_count)
+
+        while (self._size - 1) / (2 * SLOTS * bucket_count) >= self._load_factor:
+            bucket_count = double_capacity(bucket_count)
+
+        self._rebuild(bucket_count)
+        self._version += 1
+
+    def reserve(self, n: int) -> None:
+        """
+        Makes room for n more key/value pairs, so that inserting them does not resize the table.
+        Does nothing if the table is already large enough.
+        """
+        required = int((self._size + n - 1) / self._load_factor) + 1
+        if required > self._capacity:
+            self.resize_table(required)
+
+    def _probe_count(self, key: str) -> int:
+        """
+        Returns the number of slots a lookup of the given key inspects,
+        counting the slot where the search ends
+        """
+        found = self._find(key, *self._hashes(key))
+        if found is None:
+            return 2 * SLOTS + self._stash.length()
+
+        array, index = found
+        if array is self._stash:
+            return 2 * SLOTS + index + 1
+
+        entry = array.get_at_index(index)
+        if array is self._tables[0]:
+            return index - self._first_slot(entry.hash_code, entry.second_hash) + 1
+
+        return SLOTS + index - self._second_slot(entry.second_hash) + 1
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key. If the key is not in the hash
+        map, then the method returns None.
+        """
+        found = self._find(key, *self._hashes(key))
+        if found is None:
+            return None
+
+        array, index = found
+        return array.get_at_index(index).value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if given key is in the hash map, otherwise returns False.
+        An empty hash map does not contain any keys.
+        """
+        return self._find(key, *self._hashes(key)) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map.
+        If the key is not in the hash map, the method does nothing (no exceptions
+        is raised)
+        """
+        found = self._find(key, *self._hashes(key))
+        if found is None:
+            return
+
+        array, index = found
+        if array is self._stash:
+            # stash order does not matter: move the last entry into the freed place
+            array.swap(index, array.length() - 1)
+            array.pop()
+        else:
+            array.set_at_index(index, None)
+            self._tags[0 if array is self._tables[0] else 1][index] = 0
+        self._size -= 1
+        self._version += 1
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map. It does not change the underlying
+        hash table capacity.
+        """
+        self._allocate(self._bucket_count)
+        self._size = 0
+        self._version += 1
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array where each index contains a tuple of a key/value
+        pair stored in the hash map. The order of the keys in the dynamic array
+        does not matter.
+        """
+        arr = DynamicArray()
+
+        for item in self.items():
+            arr.append(item)
+
+        return arr
+
+    def keys(self) -> KeysView:
+        """
+        Returns a live view over the keys stored in the hash map.
+        """
+        return KeysView(self)
+
+    def values(self) -> ValuesView:
+        """
+        Returns a live view over the values stored in the hash map.
+        """
+        return ValuesView(self)
+
+    def items(self) -> ItemsView:
+        """
+        Returns a live view over the (key, value) pairs stored in the hash map.
+        """
+        return ItemsView(self)
+
+    def __iter__(self) -> HashMapIterator:
+        """
+        Returns a new iterator over the entries of the hash map.
+        """
+        return HashMapIterator(self)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nCuckoo - put example 1")
+    print("----------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity(),
+                  m.get_stash_count())
+
+    print("\nCuckoo - anagram keys example 1")
+    print("-------------------------------")
+    m = HashMap(11, hash_function_1)
+    for key in ('stop', 'pots', 'tops', 'opts', 'post', 'spot', 'abc', 'bca', 'cab'):
+        m.put(key, key.upper())
+    print(m.get_size(), m.get_capacity(), m.get_stash_count())
+    print(m.get('spot'), m.get('cab'), m.contains_key('psto'))
+    m.remove('spot')
+    m.remove('pots')
+    print(m.get_size(), m.get_stash_count(), m.get('tops'))
+
+    print("\nCuckoo - resize example 1")
+    print("-------------------------")
+    m = HashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 13)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    for capacity in range(111, 1000, 117):
+        m.resize_table(capacity)
+        result = True
+        for key in keys:
+            result &= m.contains_key(str(key))
+            result &= not m.contains_key(str(key + 1))
+        print(capacity, result, m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+
+    print("\nCuckoo - get_keys_and_values example 1")
+    print("--------------------------------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    # the slots depend on Python's per-process string hash, so the order is sorted here
+    pairs = m.get_keys_and_values()
+    print(sorted(pairs.get_at_index(i) for i in range(pairs.length())))
+    m.remove('3')
+    for item in sorted(m, key=lambda entry: entry.key):
+        print('K:', item.key, 'V:', item.value)
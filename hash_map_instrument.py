@@ -0,0 +1,370 @@
+# Description: Opt-in instrumentation for both HashMaps (SC & OA)
+# instrument() swaps counting versions of the lookup, insert, remove and resize
+# methods into the HashMap classes, and uninstrument() puts the plain methods
+# back. Nothing is checked on the plain path, so a process that never enables
+# instrumentation (or disables it again) runs exactly the original code.
+
+import time
+import weakref
+
+from a6_include import HashEntry
+import hash_map_oa
+import hash_map_sc
+
+# counting methods are installed on these classes
+CLASSES = (hash_map_sc.HashMap, hash_map_oa.HashMap)
+
+OPERATIONS = ('put', 'get', 'contains_key', 'remove')
+
+
+class Instrumentation:
+    """
+    Counters gathered from one hash map while instrumentation is enabled:
+    - operations: calls of put, get, contains_key and remove, by method name
+    - hash_calls: keys passed through the hash function, one at a time or in a batch
+      (put_many, get_many, remove_many); resizes reuse the cached hash codes
+    - key_comparisons: keys compared for equality, after their hash codes matched
+    - probes: buckets inspected (open addressing) or nodes stepped over (chaining)
+    - resizes and resize_time: resizes started and seconds spent resizing, counting
+      each step of an incremental rehash
+    """
+
+    def __init__(self) -> None:
+        """Initialize all counters to zero."""
+        self.operations = {name: 0 for name in OPERATIONS}
+        self.hash_calls = 0
+        self.key_comparisons = 0
+        self.probes = 0
+        self.resizes = 0
+        self.resize_time = 0.0
+
+        # the resize in progress: its capacity before it started and its time so far,
+        # and how many timed resize calls are running (a resize can start another)
+        self._resize_from = None
+        self._resize_seconds = 0.0
+        self._depth = 0
+
+    def as_dict(self) -> dict:
+        """Returns the counters as a dictionary."""
+        return {
+            'operations': dict(self.operations),
+            'hash_calls': self.hash_calls,
+            'key_comparisons': self.key_comparisons,
+            'probes': self.probes,
+            'resizes': self.resizes,
+            'resize_time': self.resize_time,
+        }
+
+
+# counters of every map used while instrumented, dropped along with the map
+_counters = weakref.WeakKeyDictionary()
+
+# the plain methods replaced on each class, while instrumentation is enabled
+_plain = {}
+
+# the plain hash function of every map whose hash calls are being counted
+_plain_hash = weakref.WeakKeyDictionary()
+
+# called as _hook(event, hash_map=..., old_capacity=..., new_capacity=..., size=...)
+_hook = None
+
+
+def instrument(hook: callable = None) -> None:
+    """
+    Enables instrumentation for every SC and OA hash map in the process.
+    The hook, if given, is called as hook(event, hash_map=..., old_capacity=...,
+    new_capacity=..., size=...) when a resize starts ('resize_start') and ends
+    ('resize_end'); the end event also gets the seconds the resize took.
+    Calling it again while enabled only replaces the hook.
+    """
+    global _hook
+    _hook = hook
+    if _plain:
+        return
+
+    installs = {hash_map_sc.HashMap: _sc_methods(), hash_map_oa.HashMap: _oa_methods()}
+    for cls in CLASSES:
+        methods = dict(_operation_methods(cls), **_resize_methods(cls), **installs[cls])
+        _plain[cls] = {name: vars(cls)[name] for name in methods}
+        for name, method in methods.items():
+            setattr(cls, name, method)
+
+
+def uninstrument() -> None:
+    """
+    Disables instrumentation: the plain methods are put back on the classes.
+    The counters gathered so far are kept.
+    """
+    global _hook
+    for cls, methods in _plain.items():
+        for name, method in methods.items():
+            setattr(cls, name, method)
+    _plain.clear()
+    for hash_map, function in list(_plain_hash.items()):
+        hash_map._hash = function
+    _plain_hash.clear()
+    _hook = None
+
+
+def is_instrumented() -> bool:
+    """Returns True if instrumentation is enabled."""
+    return bool(_plain)
+
+
+def get_counters(hash_map) -> Instrumentation:
+    """
+    Returns the counters of the given hash map, which are all zero if it has
+    not been used while instrumentation was enabled.
+    """
+    if hash_map not in _counters:
+        _counters[hash_map] = Instrumentation()
+    return _counters[hash_map]
+
+
+def reset_counters(hash_map) -> None:
+    """Sets the counters of the given hash map back to zero."""
+    _counters.pop(hash_map, None)
+
+
+def _count_hashes(hash_map) -> None:
+    """
+    Replaces the hash function the map calls for single keys with one that counts
+    its calls, until uninstrument() puts the plain function back. The wrapper only
+    holds a weak reference to the map, so the map can still be dropped.
+    """
+    if hash_map in _plain_hash:
+        return
+
+    function = hash_map._hash
+    ref = weakref.ref(hash_map)
+
+    def counted_hash(key: str) -> int:
+        get_counters(ref()).hash_calls += 1
+        return function(key)
+
+    _plain_hash[hash_map] = function
+    hash_map._hash = counted_hash
+
+
+def _operation_methods(cls) -> dict:
+    """
+    Returns put, get, contains_key and remove wrapped to count calls, and _hash_many
+    wrapped to count the keys hashed in a batch. The first operation on a map also
+    starts counting its single-key hash calls.
+    """
+    def counted(name: str, method):
+        def operation(self, *args, **kwargs):
+            _count_hashes(self)
+            get_counters(self).operations[name] += 1
+            return method(self, *args, **kwargs)
+        operation.__name__ = name
+        operation.__doc__ = method.__doc__
+        return operation
+
+    plain_hash_many = cls._hash_many
+
+    def _hash_many(self, keys: list):
+        get_counters(self).hash_calls += len(keys)
+        return plain_hash_many(self, keys)
+
+    methods = {name: counted(name, getattr(cls, name)) for name in OPERATIONS}
+    methods['_hash_many'] = _hash_many
+    return methods
+
+
+def _resize_methods(cls) -> dict:
+    """
+    Returns resize_table and the incremental rehash methods wrapped to count and time
+    resizes and to call the hook. A resize_table or rehash call made while another one
+    is running (such as the resize that quadratic probing falls back to when it misses
+    every empty bucket) is part of the outer call: it is timed by the outer call, and
+    only the outer call starts or ends a resize.
+    """
+    plain_resize_table, plain_start_rehash, plain_rehash = (
+        cls.resize_table, cls._start_rehash, cls.rehash)
+
+    def start(self, counters: Instrumentation, new_capacity: int) -> None:
+        counters.resizes += 1
+        counters._resize_from = self.get_capacity()
+        counters._resize_seconds = 0.0
+        if _hook is not None:
+            _hook('resize_start', hash_map=self, old_capacity=counters._resize_from,
+                  new_capacity=new_capacity, size=self.get_size())
+
+    def end(self, counters: Instrumentation) -> None:
+        old_capacity, counters._resize_from = counters._resize_from, None
+        if _hook is not None:
+            _hook('resize_end', hash_map=self, old_capacity=old_capacity,
+                  new_capacity=self.get_capacity(), size=self.get_size(),
+                  seconds=counters._resize_seconds)
+
+    def timed(self, counters: Instrumentation, method, *args):
+        counters._depth += 1
+        began = time.perf_counter()
+        try:
+            return method(self, *args)
+        finally:
+            counters._depth -= 1
+            if counters._depth == 0:
+                seconds = time.perf_counter() - began
+                counters.resize_time += seconds
+                counters._resize_seconds += seconds
+
+    def resize_table(self, new_capacity: int) -> None:
+        counters = get_counters(self)
+        outer = counters._depth == 0
+        if outer and counters._resize_from is None:
+            start(self, counters, new_capacity)
+        timed(self, counters, plain_resize_table, new_capacity)
+        if outer and counters._resize_from is not None:
+            end(self, counters)
+
+    def _start_rehash(self, new_capacity: int) -> None:
+        counters = get_counters(self)
+        if counters._depth == 0:
+            start(self, counters, new_capacity)
+        timed(self, counters, plain_start_rehash, new_capacity)
+
+    def rehash(self, n: int) -> bool:
+        counters = get_counters(self)
+        outer = counters._depth == 0
+        active = timed(self, counters, plain_rehash, n)
+        if outer and not active and counters._resize_from is not None:
+            end(self, counters)
+        return active
+
+    resize_table.__doc__ = plain_resize_table.__doc__
+    rehash.__doc__ = plain_rehash.__doc__
+    return {'resize_table': resize_table, '_start_rehash': _start_rehash, 'rehash': rehash}
+
+
+def _oa_methods() -> dict:
+    """Returns the counting probe loops of the open addressing HashMap."""
+    def probe(self, buckets, capacity: int, key: str, hash_code: int) -> int:
+        # the probe loop of HashMap._find_index, counting buckets and key comparisons
+        counters = get_counters(self)
+        probe_key = hash_code % capacity
+        step = self._probe_step(hash_code, capacity)
+        for _ in range(capacity):
+            counters.probes += 1
+            entry = buckets.get_at_index(probe_key)
+            if entry is None:
+                return None
+            if entry.hash_code == hash_code:
+                counters.key_comparisons += 1
+                if entry.key == key and not entry.is_tombstone:
+                    return probe_key
+            probe_key = (probe_key + step) % capacity
+            step += self._probe_growth
+        return None
+
+    def _find_index(self, key: str, hash_code: int) -> int:
+        return probe(self, self._buckets, self._capacity, key, hash_code)
+
+    def _find_old_entry(self, key: str, hash_code: int):
+        index = probe(self, self._old_buckets, self._old_capacity, key, hash_code)
+        return None if index is None else self._old_buckets.get_at_index(index)
+
+    def _insert(self, key: str, value: object, hash_code: int) -> None:
+        # HashMap._insert, counting buckets and key comparisons along its one probe walk
+        counters = get_counters(self)
+        capacity = self._capacity
+        probe_key = hash_code % capacity
+        step = self._probe_step(hash_code, capacity)
+        first_tombstone = None
+        for _ in range(capacity):
+            counters.probes += 1
+            entry = self._buckets.get_at_index(probe_key)
+            if entry is None:
+                break
+            if entry.is_tombstone:
+                if first_tombstone is None:
+                    first_tombstone = probe_key
+            elif entry.hash_code == hash_code:
+                counters.key_comparisons += 1
+                if entry.key == key:
+                    entry.value = value
+                    return
+            probe_key = (probe_key + step) % capacity
+            step += self._probe_growth
+        else:
+            if first_tombstone is None:
+                self.resize_table(self._double_capacity(capacity))
+                self._insert(key, value, hash_code)
+                return
+
+        if self._old_buckets is not None:
+            entry = self._find_old_entry(key, hash_code)
+            if entry is not None:
+                entry.value = value
+                return
+
+        if first_tombstone is not None:
+            probe_key = first_tombstone
+            self._tombstones -= 1
+
+        self._buckets.set_at_index(probe_key, HashEntry(key, value, hash_code))
+        self._size += 1
+        self._version += 1
+
+    return {'_find_index': _find_index, '_find_old_entry': _find_old_entry, '_insert': _insert}
+
+
+def _sc_methods() -> dict:
+    """Returns the counting chain walks of the separate chaining HashMap."""
+    plain_remove_hashed = hash_map_sc.HashMap._remove_hashed
+
+    def _find_node(self, chain, key: str, hash_code: int):
+        counters = get_counters(self)
+        if type(chain) is hash_map_sc.SortedBucket:
+            # a sorted bucket is binary searched, comparing about log2(n) + 1 keys
+            steps = chain.length().bit_length()
+            counters.probes += steps
+            counters.key_comparisons += steps
+            return chain.contains(key)
+
+        for node in chain:
+            counters.probes += 1
+            if node.hash_code == hash_code:
+                counters.key_comparisons += 1
+                if node.key == key:
+                    return node
+        return None
+
+    def _remove_hashed(self, key: str, hash_code: int) -> None:
+        # count the walk over the key's chain, then remove with the plain method
+        chain = self._buckets.get_at_index(hash_code % self._capacity)
+        if _find_node(self, chain, key, hash_code) is None and self._old_buckets is not None:
+            index = hash_code % self._old_capacity
+            if index >= self._rehash_index:
+                _find_node(self, self._old_buckets.get_at_index(index), key, hash_code)
+        plain_remove_hashed(self, key, hash_code)
+
+    return {'_find_node': _find_node, '_remove_hashed': _remove_hashed}
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+    from a6_include import hash_function_2
+
+    events = []
+    instrument(lambda event, hash_map, **info: events.append((event, info['new_capacity'])))
+    for module in (hash_map_sc, hash_map_oa):
+        print("\n" + module.__name__ + " - instrumentation example 1")
+        print("-------------------------------------------------")
+        events.clear()
+        m = module.HashMap(11, hash_function_2)
+        for i in range(100):
+            m.put('key' + str(i), i)
+        for i in range(0, 100, 2):
+            m.get('key' + str(i))
+            m.remove('key' + str(i))
+        result = get_counters(m).as_dict()
+        del result['resize_time']
+        print(result)
+        print(events)
+
+    uninstrument()
+    m.put('key0', 0)
+    print(is_instrumented(), get_counters(m).operations['put'], m.get_size())
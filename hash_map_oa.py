@@ -1,26 +1,146 @@
 # Description: Hash Map Open Addressing Implementation
-# Uses Dynamic Array data structure with quadratic probing
+# Uses Dynamic Array data structure with quadratic (default), linear or double hashing probing
 
-from a6_include import (DynamicArray, DynamicArrayException, HashEntry,
+import random
+import time
+
+from a6_include import (DynamicArray, HashEntry,
                         hash_function_1, hash_function_2)
+from hash_functions import as_list, hash_batch, mix64
+from hash_map_capacity import (double_capacity, is_prime, next_power_of_two,
+                               next_prime)
+from hash_map_stats import expected_collisions, histogram_max_mean, merge_histograms
+from hash_map_views import ItemsView, KeysView, ValuesView
+
+# probing strategies accepted by the HashMap constructor
+PROBING = ('linear', 'quadratic', 'double')
+
+# left in the old table of an incremental rehash in place of each migrated entry;
+# it is a tombstone, so probe sequences through its bucket stay intact
+_MIGRATED = HashEntry(None, None)
+_MIGRATED.is_tombstone = True
+
+
+class HashMapIterator:
+    """
+    Separate iterator class for the open addressing HashMap.
+    Yields each live HashEntry and raises RuntimeError if the hash map
+    gains or loses keys while it is being iterated.
+    During an incremental rehash the old table is walked before the new one.
+    """
+
+    def __init__(self, hash_map: "HashMap") -> None:
+        """Initialize the iterator at the first bucket of the hash map."""
+        self._map = hash_map
+        self._table = 0
+        self._index = 0
+        self._version = hash_map._version
+
+    def __iter__(self) -> "HashMapIterator":
+        """Return the iterator."""
+        return self
+
+    def __next__(self) -> HashEntry:
+        """Obtain the next live entry and advance the iterator."""
+        if self._map._version != self._version:
+            raise RuntimeError('HashMap changed size during iteration')
+
+        tables = self._map._tables()
+        while self._table < len(tables):
+            buckets = tables[self._table]
+            while self._index < buckets.length():
+                entry = buckets.get_at_index(self._index)
+                self._index += 1
+                if entry is not None and not entry.is_tombstone:
+                    return entry
+            self._table += 1
+            self._index = 0
+
+        raise StopIteration
 
 
 class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+    def __init__(self, capacity: int, function, power_of_two: bool = False,
+                 probing: str = 'quadratic', load_factor: float = 0.5,
+                 incremental: bool = False, rehash_step: int = 16,
+                 shrink_load: float = None, stats_hook=None) -> None:
         """
         Initialize new HashMap that uses
-        quadratic probing for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        quadratic probing for collision resolution, or the given probing
+        strategy: 'linear', 'quadratic' or 'double' (double hashing).
+        In power-of-two mode the capacity is a power of two, hash codes are
+        finalized with mix64 and quadratic probing visits triangular-number offsets.
+        The table doubles when its load factor reaches load_factor.
+        In incremental mode the table is resized without a stop-the-world rehash: each
+        put and remove moves rehash_step buckets from the old table to the new one.
+        With a shrink_load (below load_factor / 2), the table shrinks once remove drops the
+        load factor under it, and clear returns it to its initial capacity.
+        stats_hook, if given, is called as stats_hook(event, old_capacity=..., new_capacity=...,
+        size=...) whenever put grows the table ('grow') or rehashes it in place to clear
+        tombstones ('compact'), and whenever the table shrinks ('shrink').
         """
+        if probing not in PROBING:
+            raise ValueError('probing must be one of ' + ', '.join(PROBING))
+        if not 0 < load_factor < 1:
+            raise ValueError('load_factor must be between 0 and 1')
+        if shrink_load is not None and not 0 < shrink_load < load_factor / 2:
+            raise ValueError('shrink_load must be between 0 and load_factor / 2')
+
         self._buckets = DynamicArray()
+        self._power_of_two = power_of_two
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
+        # capacity must be a prime number (or a power of two in power-of-two mode)
+        if power_of_two:
+            self._capacity = next_power_of_two(capacity)
+        else:
+            self._capacity = self._next_prime(capacity)
         for _ in range(self._capacity):
             self._buckets.append(None)
 
         self._hash_function = function
+
+        # hash codes cached in the entries: the output of the hash function,
+        # finalized with mix64 in power-of-two mode so its low bits are well spread
+        if power_of_two:
+            self._hash = lambda key: mix64(function(key))
+        else:
+            self._hash = function
+
+        # each probe moves the index by step, and the step then grows by _probe_growth:
+        # linear and double hashing keep a fixed step, while the quadratic offset grows
+        # by 1, 3, 5, ... (j^2) for prime capacities and by 1, 2, 3, ... (j(j+1)/2)
+        # for powers of two, which visits every bucket
+        self._probing = probing
+        if probing == 'quadratic':
+            self._probe_growth = 1 if power_of_two else 2
+        else:
+            self._probe_growth = 0
+        self._load_factor = load_factor
+
         self._size = 0
+        self._tombstones = 0
+
+        # incremental rehash state: while a rehash is active, _buckets is the new table and
+        # the old table is drained from _rehash_index up, a few buckets per put or remove.
+        # _old_size counts the live entries still in the old table.
+        self._incremental = incremental
+        self._rehash_step = rehash_step
+        self._rehash_active = False
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._old_size = 0
+        self._rehash_index = 0
+
+        # longest time, in seconds, a single operation spent resizing the table
+        self._max_pause = 0.0
+
+        # shrink policy: the table never shrinks below the capacity it started with
+        self._min_capacity = self._capacity
+        self._shrink_load = shrink_load
+        self._stats_hook = stats_hook
+
+        # incremented whenever keys are added or removed, to detect mutation during iteration
+        self._version = 0
 
     def __str__(self) -> str:
         """
@@ -35,35 +155,15 @@ class HashMap:
     def _next_prime(self, capacity: int) -> int:
         """
         Increment from given number to find the closest prime number
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
-        if capacity % 2 == 0:
-            capacity += 1
-
-        while not self._is_prime(capacity):
-            capacity += 2
-
-        return capacity
+        return next_prime(capacity)
 
     @staticmethod
     def _is_prime(capacity: int) -> bool:
         """
         Determine if given integer is a prime number and return boolean
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
-        if capacity == 2 or capacity == 3:
-            return True
-
-        if capacity == 1 or capacity % 2 == 0:
-            return False
-
-        factor = 3
-        while factor ** 2 <= capacity:
-            if capacity % factor == 0:
-                return False
-            factor += 2
-
-        return True
+        return is_prime(capacity)
 
     def get_size(self) -> int:
         """
@@ -88,38 +188,106 @@ class HashMap:
         is replaced with the new value.
         If the given key is not in the hash map, new key/value pair is added.
         Table is resized to double its current capacity when the method is called
-        and the current load factor of the table is >= 0.5
+        and the current load factor of the table is >= 0.5 (or the configured load_factor)
+        In incremental mode the resize is started here and carried out by later calls.
         """
-        # If table load is greater than or equal to 0.5 then resize table
-        if self.table_load() >= 0.5:
-            self.resize_table(self._capacity * 2)
+        if self._rehash_active:
+            self.rehash(self._rehash_step)
+
+            # the new table must not pass the load factor before the old one is drained
+            if self.table_load() >= self._load_factor:
+                self._finish_rehash()
 
-        hash_key = self._hash_function(key) % self._capacity
+        if not self._rehash_active:
+            # If table load is greater than or equal to 0.5 then resize table
+            if self.table_load() >= self._load_factor:
+                self._resize('grow', self._double_capacity(self._capacity))
 
-        # if the bucket does not contain a key and value then simply insert the key value pair and increment size
-        if self._buckets.get_at_index(hash_key) is None:
-            self._buckets.set_at_index(hash_key, HashEntry(key, value))
-            self._size += 1
+            # If live entries plus tombstones fill 3/4 of the table, then rehash in place
+            # at the same capacity to clear the tombstones out of the probe sequences
+            elif (self._size + self._tombstones) / self._capacity >= self._compact_load():
+                self._resize('compact', self._capacity)
 
+        self._insert(key, value, self._hash(key))
+
+    def _resize(self, event: str, new_capacity: int, incremental: bool = None) -> None:
+        """
+        Resizes the table for put or remove: starts an incremental rehash in incremental
+        mode (or if incremental is True), otherwise resizes it at once. The event is
+        reported to the stats hook.
+        """
+        old_capacity = self._capacity
+        if self._incremental if incremental is None else incremental:
+            self._start_rehash(new_capacity)
         else:
-            j = 1
-            quad_key = hash_key
-            while self._buckets.get_at_index(quad_key):
-                # if the key is found in the hash, then replace without incrementing size and return
-                # if it was previously a tombstone then do increment size
-                if self._buckets.get_at_index(quad_key).key == key:
-                    if self._buckets.get_at_index(quad_key).is_tombstone:
-                        self._buckets.set_at_index(quad_key, HashEntry(key, value))
-                        self._size += 1
-                        self._buckets.get_at_index(quad_key).is_tombstone = False
-                    else:
-                        self._buckets.set_at_index(quad_key, HashEntry(key, value))
-                    return
-                quad_key = (hash_key + j**2) % self._capacity
-                j += 1
+            self.resize_table(new_capacity)
+
+        if self._stats_hook is not None:
+            self._stats_hook(event, old_capacity=old_capacity, new_capacity=self._capacity,
+                             size=self._size)
 
-            self._buckets.set_at_index(quad_key, HashEntry(key, value))
-            self._size += 1
+    def _maybe_shrink(self, incremental: bool = None) -> None:
+        """
+        Shrinks the table once its load factor drops below shrink_load. The new capacity
+        brings the load factor up to half the load factor, so the table is far from both
+        thresholds after a resize and does not thrash between them.
+        incremental overrides the map's mode for the shrink, if given.
+        """
+        if (self._rehash_active or self._capacity <= self._min_capacity
+                or self.table_load() >= self._shrink_load):
+            return
+
+        new_capacity = max(self._min_capacity, int(self._size / (self._load_factor / 2)) + 1)
+        if new_capacity < self._capacity:
+            self._resize('shrink', new_capacity, incremental)
+
+    def _insert(self, key: str, value: object, hash_code: int) -> None:
+        """
+        Adds or updates the key/value pair without checking the load factor.
+        The caller makes sure the table has room for one more entry.
+        """
+        probe_key = hash_code % self._capacity
+        step = self._probe_step(hash_code, self._capacity)
+        first_tombstone = None
+
+        # follow the probe sequence until the key or an empty bucket is found,
+        # remembering the first tombstone passed along the way
+        for _ in range(self._capacity):
+            entry = self._buckets.get_at_index(probe_key)
+            if entry is None:
+                break
+            if entry.is_tombstone:
+                if first_tombstone is None:
+                    first_tombstone = probe_key
+            elif entry.hash_code == hash_code and entry.key == key:
+                # if the key is found in the hash, then replace the value in place without incrementing size
+                entry.value = value
+                return
+            probe_key = (probe_key + step) % self._capacity
+            step += self._probe_growth
+        else:
+            # every bucket on the probe sequence holds a live entry, which can happen
+            # to quadratic probing above a 0.5 load factor: grow the table and retry
+            if first_tombstone is None:
+                self.resize_table(self._double_capacity(self._capacity))
+                self._insert(key, value, hash_code)
+                return
+
+        # a key that is not in the new table may still be in the old one
+        if self._old_buckets is not None:
+            entry = self._find_old_entry(key, hash_code)
+            if entry is not None:
+                entry.value = value
+                return
+
+        # reuse the first tombstone on the probe sequence, if there was one
+        if first_tombstone is not None:
+            probe_key = first_tombstone
+            self._tombstones -= 1
+
+        self._buckets.set_at_index(probe_key, HashEntry(key, value, hash_code))
+        self._size += 1
+        self._version += 1
 
     def table_load(self) -> float:
         """
@@ -131,46 +299,499 @@ class HashMap:
         """
         Returns the number of empty buckets in the hash table
         """
-        return self._capacity - self._size
+        return self._capacity - (self._size - self._old_size) - self._tombstones
+
+    def get_tombstone_count(self) -> int:
+        """
+        Returns the number of tombstones (removed entries) in the hash table
+        """
+        return self._tombstones
+
+    def stats(self, sample: int = None) -> dict:
+        """
+        Returns statistics of the table, gathered in one pass over the buckets:
+        - 'probe_lengths': histogram {probe length: number of live keys}, the buckets a
+          lookup of each live key inspects, with 'max_probe' and 'mean_probe'
+        - 'largest_cluster': the longest run of occupied buckets (live entries or tombstones)
+        - 'tombstones', 'tombstone_ratio' (tombstones per bucket) and 'empty_buckets'
+        - 'collisions': live keys whose home bucket is shared with an earlier key, and
+          'expected_collisions', the number a uniform hash function would give for the same
+          size and capacity
+        - 'size', 'capacity' and 'load'
+        Probe lengths under linear probing come from the distance to the home bucket; the
+        other strategies retrace each key's probe sequence, which averages a few steps.
+        While an incremental rehash is in progress, the old table is scanned too.
+        With a sample, only that many consecutive buckets of each table are scanned, from a
+        random starting bucket, and the counts describe that window; on a multi-million
+        bucket table a sample of 10^5 buckets takes a few hundredths of a second.
+        """
+        probe_lengths = {}
+        largest_cluster = tombstones = empty = collisions = 0
+        expected = 0.0
+
+        tables = ((self._buckets, self._capacity),)
+        if self._old_buckets is not None:
+            tables = ((self._old_buckets, self._old_capacity),) + tables
+
+        buckets_scanned = 0
+        for buckets, capacity in tables:
+            count = capacity if sample is None else min(sample, capacity)
+            start = 0 if count == capacity else random.randrange(capacity)
+            table = self._scan_table(buckets, capacity, start, count)
+            merge_histograms(probe_lengths, table['probe_lengths'])
+            largest_cluster = max(largest_cluster, table['largest_cluster'])
+            tombstones += table['tombstones']
+            empty += table['empty_buckets']
+            collisions += table['collisions']
+            expected += expected_collisions(table['live'], count)
+            buckets_scanned += count
+
+        max_probe, mean_probe = histogram_max_mean(probe_lengths)
+
+        return {
+            'size': self._size,
+            'capacity': self._capacity,
+            'load': self.table_load(),
+            'probe_lengths': dict(sorted(probe_lengths.items())),
+            'max_probe': max_probe,
+            'mean_probe': mean_probe,
+            'largest_cluster': largest_cluster,
+            'tombstones': tombstones,
+            'tombstone_ratio': tombstones / buckets_scanned,
+            'empty_buckets': empty,
+            'collisions': collisions,
+            'expected_collisions': expected,
+            'buckets_scanned': buckets_scanned,
+        }
+
+    def _scan_table(self, buckets: DynamicArray, capacity: int, start: int, count: int) -> dict:
+        """
+        Scans count buckets of one bucket array for stats(), from bucket start on, wrapping
+        around: the probe length histogram, largest cluster, tombstones, empty buckets,
+        live entries and home bucket collisions. Entries migrated out of the old table of
+        an incremental rehash are skipped.
+        """
+        probe_lengths = {}
+        homes = bytearray(capacity)
+        linear = self._probing == 'linear'
+        tombstones = empty = live = collisions = 0
+        cluster = largest_cluster = leading_cluster = 0
+
+        # the bound method is looked up once, as the loop runs once per bucket
+        get_at_index = buckets.get_at_index
+
+        for scanned in range(count):
+            i = (start + scanned) % capacity
+            entry = get_at_index(i)
+            if entry is None:
+                if cluster:
+                    if cluster == scanned:
+                        leading_cluster = cluster
+                    if cluster > largest_cluster:
+                        largest_cluster = cluster
+                    cluster = 0
+                empty += 1
+                continue
+
+            cluster += 1
+            if entry.is_tombstone:
+                if entry is not _MIGRATED:
+                    tombstones += 1
+                continue
+
+            live += 1
+            hash_code = entry.hash_code
+            home = hash_code % capacity
+            if homes[home]:
+                collisions += 1
+            homes[home] = 1
+
+            if linear:
+                probes = (i - home) % capacity + 1
+            else:
+                probes, probe_key = 1, home
+                step = self._probe_step(hash_code, capacity)
+                while probe_key != i:
+                    probe_key = (probe_key + step) % capacity
+                    step += self._probe_growth
+                    probes += 1
+            probe_lengths[probes] = probe_lengths.get(probes, 0) + 1
+
+        # a cluster running off the end of a full scan continues at its start
+        if count < capacity:
+            largest_cluster = max(largest_cluster, cluster)
+        elif empty:
+            largest_cluster = max(largest_cluster, cluster + leading_cluster)
+        else:
+            largest_cluster = capacity
+
+        return {
+            'probe_lengths': probe_lengths,
+            'largest_cluster': largest_cluster,
+            'tombstones': tombstones,
+            'empty_buckets': empty,
+            'live': live,
+            'collisions': collisions,
+        }
 
     def resize_table(self, new_capacity: int) -> None:
         """
         Changes the capacity of the internal hash table.
-        All existing key/value pairs remain in the new hash map and all hash table links are rehashed.
+        All existing key/value pairs remain in the new hash map and all hash table links are rehashed
+        from the cached hash codes of the entries, without calling the hash function again.
         new_capacity must be > current number of elements in the hash map. If not, the method does nothing.
-        Checks if new_capacity is a prime number. If not, it rounds up to the nearest prime number.
+        Checks if new_capacity is a prime number. If not, it rounds up to the nearest prime number
+        (or to the next power of two in power-of-two mode).
+        An incremental rehash in progress is finished as part of the resize.
         """
         if new_capacity <= self._size:
             return
 
-        if not self._is_prime(new_capacity):
+        start = time.perf_counter()
+
+        if self._power_of_two:
+            new_capacity = next_power_of_two(new_capacity)
+        elif not self._is_prime(new_capacity):
             new_capacity = self._next_prime(new_capacity)
 
-        new_table = HashMap(new_capacity, self._hash_function)
+        new_capacity = self._grow_capacity(new_capacity, self._size)
+
+        new_buckets = DynamicArray()
+        for _ in range(new_capacity):
+            new_buckets.append(None)
+
+        # Entries keep their cached hash codes, so only the bucket index is recomputed.
+        # Keys are unique, so each entry goes to the first empty bucket on its probe sequence.
+        # Tombstones are dropped.
+        for buckets in self._tables():
+            for i in range(buckets.length()):
+                item = buckets.get_at_index(i)
+                if item and not item.is_tombstone:
+                    probe_key = item.hash_code % new_capacity
+                    step = self._probe_step(item.hash_code, new_capacity)
+                    for _ in range(new_capacity):
+                        if new_buckets.get_at_index(probe_key) is None:
+                            new_buckets.set_at_index(probe_key, item)
+                            break
+                        probe_key = (probe_key + step) % new_capacity
+                        step += self._probe_growth
+                    else:
+                        # quadratic probing above a 0.5 load factor can miss every empty bucket;
+                        # the old table is untouched, so start over at double the capacity
+                        self.resize_table(self._double_capacity(new_capacity))
+                        return
 
-        # this is to prevent next_prime from going to 3, when it should stay at 2 (since 2 is prime)
-        if new_capacity == 2:
-            new_table._capacity = 2
+        # Reassigning new values to self
+        self._buckets = new_buckets
+        self._capacity = new_capacity
+        self._tombstones = 0
+        self._stop_rehash()
+        self._version += 1
+        self._max_pause = max(self._max_pause, time.perf_counter() - start)
+
+    def _tables(self) -> tuple:
+        """
+        Returns the bucket arrays holding entries: the old table and the new one while
+        an incremental rehash is migrating entries, otherwise just the table.
+        """
+        if self._old_buckets is None:
+            return (self._buckets,)
 
-        # be sure to not add size + 1 if rehashing tombstone values
-        for item in self:
-            if item:
-                new_table.put(item.key, item.value)
+        return self._old_buckets, self._buckets
 
-        # Reassigning new values to self
-        self._buckets = new_table._buckets
-        self._size = new_table._size
-        self._capacity = new_table.get_capacity()
+    def _start_rehash(self, new_capacity: int) -> None:
+        """
+        Starts an incremental rehash into a table of the given capacity (rounded as in
+        resize_table). The new table takes over at once; entries are moved into it by
+        later calls to rehash().
+        """
+        start = time.perf_counter()
+
+        if self._power_of_two:
+            new_capacity = next_power_of_two(new_capacity)
+        elif not self._is_prime(new_capacity):
+            new_capacity = self._next_prime(new_capacity)
+
+        self._old_buckets, self._old_capacity = self._buckets, self._capacity
+        self._old_size = self._size
+        self._capacity = self._grow_capacity(new_capacity, self._size)
+        self._buckets = DynamicArray([None] * self._capacity)
+        self._tombstones = 0
+        self._rehash_index = 0
+        self._rehash_active = True
+        self._max_pause = max(self._max_pause, time.perf_counter() - start)
+
+    def _stop_rehash(self) -> None:
+        """
+        Drops the incremental rehash state, once every entry is in self._buckets
+        """
+        self._rehash_active = False
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._old_size = 0
+        self._rehash_index = 0
+
+    def rehash(self, n: int) -> bool:
+        """
+        Carries an incremental rehash forward by n buckets of the old table and returns
+        True if it is still in progress. Each live entry in them is moved to the new table
+        and leaves a tombstone behind, so the probe sequences of the old table stay intact.
+        Does nothing and returns False if no rehash is in progress.
+        """
+        if not self._rehash_active:
+            return False
+
+        start = time.perf_counter()
+        old_buckets, buckets, capacity = self._old_buckets, self._buckets, self._capacity
+        end = min(self._rehash_index + n, self._old_capacity)
+
+        for i in range(self._rehash_index, end):
+            item = old_buckets.get_at_index(i)
+            if item is None or item is _MIGRATED:
+                continue
+            if item.is_tombstone:
+                # dropped here rather than all at once with the old table
+                old_buckets.set_at_index(i, _MIGRATED)
+                continue
+
+            # the key is in no other bucket of the new table, so it takes the first
+            # empty bucket or tombstone on its probe sequence
+            probe_key = item.hash_code % capacity
+            step = self._probe_step(item.hash_code, capacity)
+            for _ in range(capacity):
+                entry = buckets.get_at_index(probe_key)
+                if entry is None or entry.is_tombstone:
+                    break
+                probe_key = (probe_key + step) % capacity
+                step += self._probe_growth
+            else:
+                # quadratic probing above a 0.5 load factor can miss every free bucket:
+                # finish with a full resize at double the capacity
+                self.resize_table(self._double_capacity(capacity))
+                return False
+
+            if buckets.get_at_index(probe_key) is not None:
+                self._tombstones -= 1
+            buckets.set_at_index(probe_key, item)
+            old_buckets.set_at_index(i, _MIGRATED)
+            self._old_size -= 1
+
+        self._rehash_index = end
+        self._version += 1
+        if end == self._old_capacity:
+            self._stop_rehash()
+
+        self._max_pause = max(self._max_pause, time.perf_counter() - start)
+        return self._rehash_active
+
+    def _finish_rehash(self) -> None:
+        """
+        Completes an incremental rehash in progress in one go
+        """
+        self.rehash(self._old_capacity)
+
+    def start_resize(self, new_capacity: int) -> None:
+        """
+        Starts an incremental rehash into a table of the given capacity (rounded as in
+        resize_table), whether or not the map is in incremental mode; later calls to
+        rehash() carry it forward. A rehash already in progress is finished first.
+        """
+        if self._rehash_active:
+            self._finish_rehash()
+        self._start_rehash(new_capacity)
+
+    def is_rehashing(self) -> bool:
+        """
+        Returns True while an incremental rehash is in progress
+        """
+        return self._rehash_active
+
+    def resize_needed(self, n: int) -> int:
+        """
+        Returns the capacity put would resize the table to while n more key/value pairs
+        are inserted, or None if it would not resize: the grown capacity, or the same
+        capacity when live entries, tombstones and the new pairs would fill the share
+        of the table at which it is rehashed in place to clear the tombstones
+        """
+        new_capacity = self._grow_capacity(self._capacity, self._size + n)
+        if new_capacity != self._capacity:
+            return new_capacity
+
+        if (self._size + self._tombstones + n) / self._capacity >= self._compact_load():
+            return self._capacity
+
+        return None
+
+    def rehash_progress(self) -> float:
+        """
+        Returns the fraction of the old table migrated by the incremental rehash so far.
+        Returns 1.0 when no rehash is in progress.
+        """
+        if not self._rehash_active:
+            return 1.0
+
+        return self._rehash_index / self._old_capacity
+
+    def get_max_pause(self) -> float:
+        """
+        Returns the longest time, in seconds, that a single call spent resizing the
+        table: a whole resize_table, or the start or one step of an incremental rehash
+        """
+        return self._max_pause
+
+    def reserve(self, n: int) -> None:
+        """
+        Makes room for n more key/value pairs, so that inserting them does not resize the table.
+        The load factor must stay below 0.5 (or the configured load_factor) before the last
+        insert, so with the default policy the capacity must be at least 2 * (final size) - 1.
+        Tombstones count too: if live entries, tombstones and the n new pairs would fill the
+        share of the table at which put rehashes in place, the tombstones are cleared now.
+        Does nothing if the table is already large enough.
+        """
+        required = int((self._size + n - 1) / self._load_factor) + 1
+        if required > self._capacity:
+            self.resize_table(required)
+        elif (self._size + self._tombstones + n) / self._capacity >= self._compact_load():
+            self.resize_table(self._capacity)
+
+    @classmethod
+    def from_iterable(cls, pairs, function=hash_function_1, size_hint: int = None,
+                      **options) -> "HashMap":
+        """
+        Returns a new hash map holding the given (key, value) pairs, loaded without any resize.
+        The table is reserved for size_hint pairs. Without a size_hint, pairs is read into
+        a list first and its length is used. options are passed on to the constructor.
+        """
+        if size_hint is None:
+            pairs = as_list(pairs)
+            size_hint = len(pairs)
+
+        hash_map = cls(1, function, **options)
+        hash_map.reserve(size_hint)
+
+        if isinstance(pairs, (list, DynamicArray)):
+            hash_map.put_many(pairs)
+        else:
+            for key, value in pairs:
+                hash_map.put(key, value)
+
+        return hash_map
+
+    def _grow_capacity(self, capacity: int, count: int) -> int:
+        """
+        Returns the capacity a table starting at the given capacity ends at after
+        count pairs are inserted one at a time through put: it keeps doubling
+        (to the next prime) until the load factor stays below 0.5 (or the configured load_factor)
+        """
+        while (count - 1) / capacity >= self._load_factor:
+            capacity = self._double_capacity(capacity)
+
+        return capacity
+
+    def _compact_load(self) -> float:
+        """
+        Returns the fraction of buckets holding live entries or tombstones at which the
+        table is rehashed in place: halfway between the load factor and a full table
+        """
+        return (1 + self._load_factor) / 2
+
+    def _probe_step(self, hash_code: int, capacity: int) -> int:
+        """
+        Returns the first step of the probe sequence for the given hash code.
+        Double hashing derives the step from a second hash, mix64 of the cached hash code,
+        kept in 1 .. capacity - 1 for prime capacities and odd for powers of two, so the
+        sequence visits every bucket. The other strategies start with a step of 1.
+        """
+        if self._probing != 'double':
+            return 1
+
+        if self._power_of_two:
+            return (mix64(hash_code) | 1) % capacity
+
+        return 1 + mix64(hash_code) % (capacity - 1)
+
+    def _double_capacity(self, capacity: int) -> int:
+        """
+        Returns the capacity the table grows to when it doubles
+        """
+        if self._power_of_two:
+            return capacity * 2
+
+        return double_capacity(capacity)
+
+    def _find_index(self, key: str, hash_code: int) -> int:
+        """
+        Follows the probe sequence of the given key and returns the index
+        of its live entry, or None if the key is not in the hash map.
+        Tombstones are probed past; the search stops at the first empty bucket.
+        """
+        probe_key = hash_code % self._capacity
+        step = self._probe_step(hash_code, self._capacity)
+
+        # a probe sequence never needs more steps than there are buckets
+        for _ in range(self._capacity):
+            entry = self._buckets.get_at_index(probe_key)
+            if entry is None:
+                return None
+            if entry.hash_code == hash_code and entry.key == key and not entry.is_tombstone:
+                return probe_key
+            probe_key = (probe_key + step) % self._capacity
+            step += self._probe_growth
+
+        return None
+
+    def _find_old_entry(self, key: str, hash_code: int) -> HashEntry:
+        """
+        Follows the probe sequence of the given key in the old table of an incremental
+        rehash and returns its live entry, or None if the key is not there
+        """
+        buckets, capacity = self._old_buckets, self._old_capacity
+        probe_key = hash_code % capacity
+        step = self._probe_step(hash_code, capacity)
+
+        for _ in range(capacity):
+            entry = buckets.get_at_index(probe_key)
+            if entry is None:
+                return None
+            if entry.hash_code == hash_code and entry.key == key and not entry.is_tombstone:
+                return entry
+            probe_key = (probe_key + step) % capacity
+            step += self._probe_growth
+
+        return None
+
+    def _probe_count(self, key: str) -> int:
+        """
+        Returns the number of buckets a lookup of the given key inspects,
+        counting the bucket where the search ends
+        """
+        hash_code = self._hash(key)
+        probe_key = hash_code % self._capacity
+        step = self._probe_step(hash_code, self._capacity)
+
+        for count in range(1, self._capacity + 1):
+            entry = self._buckets.get_at_index(probe_key)
+            if entry is None or (entry.key == key and not entry.is_tombstone):
+                return count
+            probe_key = (probe_key + step) % self._capacity
+            step += self._probe_growth
+
+        return self._capacity
 
     def get(self, key: str) -> object:
         """
         Returns the value associated with the given key. If the key is not in the hash
         map, then the method returns None.
         """
-        for item in self:
-            if item:
-                if item.key == key and not item.is_tombstone:
-                    return item.value
+        hash_code = self._hash(key)
+        index = self._find_index(key, hash_code)
+        if index is not None:
+            return self._buckets.get_at_index(index).value
+
+        if self._old_buckets is not None:
+            entry = self._find_old_entry(key, hash_code)
+            if entry is not None:
+                return entry.value
 
         return None
 
@@ -179,71 +800,185 @@ class HashMap:
         Returns True if given key is in the hash map, otherwise returns False.
         An empty hash map does not contain any keys.
         """
-        for item in self:
-            if item:
-                if item.key == key and not item.is_tombstone:
-                    return True
-        return False
+        hash_code = self._hash(key)
+        if self._find_index(key, hash_code) is not None:
+            return True
 
-    def remove(self, key: str) -> None:
+        return self._old_buckets is not None and self._find_old_entry(key, hash_code) is not None
+
+    def remove(self, key: str, incremental: bool = None) -> None:
         """
         Removes the given key and its associated value from the hash map.
         If the key is not in the hash map, the method does nothing (no exceptions
         is raised)
+        If the remove shrinks the table, incremental=True starts the shrink as an incremental
+        rehash and incremental=False shrinks the table at once; by default the map's mode decides.
+        """
+        if self._rehash_active:
+            self.rehash(self._rehash_step)
+
+        hash_code = self._hash(key)
+        index = self._find_index(key, hash_code)
+        if index is not None:
+            self._remove_at(index)
+        elif self._old_buckets is not None:
+            # tombstones in the old table are dropped when the rehash finishes
+            entry = self._find_old_entry(key, hash_code)
+            if entry is not None:
+                entry.is_tombstone = True
+                self._size -= 1
+                self._old_size -= 1
+                self._version += 1
+
+        if self._shrink_load is not None:
+            self._maybe_shrink(incremental)
+
+    def _remove_at(self, index: int) -> None:
         """
-        for item in self:
-            if item:
-                if item.key == key and not item.is_tombstone:
-                    item.is_tombstone = True
-                    self._size -= 1
+        Turns the live entry at the given index into a tombstone
+        """
+        self._buckets.get_at_index(index).is_tombstone = True
+        self._size -= 1
+        self._tombstones += 1
+        self._version += 1
+
+    def _hash_many(self, keys: list):
+        """
+        Returns the hash codes of the keys, in order, computed in one batch
+        """
+        hash_codes = hash_batch(self._hash_function, keys)
+        if self._power_of_two:
+            return map(mix64, hash_codes)
+
+        return hash_codes
+
+    def put_many(self, pairs) -> None:
+        """
+        Updates the hash map with every (key, value) pair, in order, as a loop of put
+        calls would. pairs may be any iterable of tuples or a DynamicArray of tuples.
+        All keys are hashed in one batch, existing keys are updated in place, and the
+        table is resized at most once, up front, for the keys that are not yet in the map.
+        """
+        pairs = as_list(pairs)
+        hash_codes = self._hash_many([pair[0] for pair in pairs])
+
+        # a batch is not latency sensitive, so a rehash in progress is finished first
+        self._finish_rehash()
+
+        # update the keys already in the hash map and set the new pairs aside
+        new_pairs = []
+        for (key, value), hash_code in zip(pairs, hash_codes):
+            index = self._find_index(key, hash_code)
+            if index is None:
+                new_pairs.append((key, value, hash_code))
+            else:
+                self._buckets.get_at_index(index).value = value
+
+        if not new_pairs:
+            return
+
+        # a key repeated within the batch is counted more than once, so this is an upper bound
+        new_capacity = self.resize_needed(len(new_pairs))
+        if new_capacity is not None:
+            self.resize_table(new_capacity)
+
+        for key, value, hash_code in new_pairs:
+            self._insert(key, value, hash_code)
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Returns a dynamic array with the value of each given key, in input order.
+        Keys that are not in the hash map get None. All keys are hashed in one batch.
+        """
+        keys = as_list(keys)
+        values = []
+
+        for key, hash_code in zip(keys, self._hash_many(keys)):
+            index = self._find_index(key, hash_code)
+            if index is not None:
+                values.append(self._buckets.get_at_index(index).value)
+            elif self._old_buckets is not None:
+                entry = self._find_old_entry(key, hash_code)
+                values.append(None if entry is None else entry.value)
+            else:
+                values.append(None)
+
+        return DynamicArray(values)
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes every given key from the hash map. Keys that are not in the hash map
+        are skipped. All keys are hashed in one batch.
+        """
+        keys = as_list(keys)
+        self._finish_rehash()
+
+        for key, hash_code in zip(keys, self._hash_many(keys)):
+            index = self._find_index(key, hash_code)
+            if index is not None:
+                self._remove_at(index)
+
+        if self._shrink_load is not None:
+            self._maybe_shrink()
 
     def clear(self) -> None:
         """
         Clears the contents of the hash map. It does not change the underlying
-        hash table capacity.
+        hash table capacity, unless a shrink_load is set: then the table returns
+        to its initial capacity.
         """
+        if self._shrink_load is not None and self._capacity != self._min_capacity:
+            if self._stats_hook is not None:
+                self._stats_hook('shrink', old_capacity=self._capacity,
+                                 new_capacity=self._min_capacity, size=0)
+            self._capacity = self._min_capacity
+
         self._buckets = DynamicArray()
         for _ in range(self._capacity):
             self._buckets.append(None)
         self._size = 0
+        self._tombstones = 0
+        self._stop_rehash()
+        self._version += 1
 
     def get_keys_and_values(self) -> DynamicArray:
         """
         Returns a dynamic array where each index contains a tuple of a key/value
         pair stored in the hash map. The order of the keys in the dynamic array
-        does not matter.
+        does not matter. Use items() to stream the pairs without building a copy.
         """
         arr = DynamicArray()
 
-        for item in self:
-            if item and not item.is_tombstone:
-                arr.append((item.key, item.value))
+        for item in self.items():
+            arr.append(item)
 
         return arr
 
-    def __iter__(self):
+    def keys(self) -> KeysView:
         """
-        Enables the hash map to iterate across itself.
-        A variable is initialized to track the iterator's progress
-        through the hash map's contents.
+        Returns a live view over the keys stored in the hash map.
         """
-        self.index = 0
-        return self
+        return KeysView(self)
 
-    def __next__(self):
+    def values(self) -> ValuesView:
         """
-        This method returns item n the hash map, based on the current location of
-        the iterator.
+        Returns a live view over the values stored in the hash map.
         """
-        try:
-            value = None
-            while value is None or value.is_tombstone is True:
-                value = self._buckets.get_at_index(self.index)
-                self.index += 1
-        except DynamicArrayException:
-            raise StopIteration
+        return ValuesView(self)
 
-        return value
+    def items(self) -> ItemsView:
+        """
+        Returns a live view over the (key, value) pairs stored in the hash map.
+        """
+        return ItemsView(self)
+
+    def __iter__(self) -> HashMapIterator:
+        """
+        Returns a new iterator over the live entries of the hash map.
+        Each iterator tracks its own position, so several loops over the
+        same hash map do not interfere with each other.
+        """
+        return HashMapIterator(self)
 
 
 # ------------------- BASIC TESTING ---------------------------------------- #
@@ -0,0 +1,373 @@
+# Description: Hash Map Open Addressing Implementation (struct-of-arrays layout)
+# Uses parallel arrays of cached hashes, keys and values with quadratic probing.
+# Slot states are kept in a compact array('b') vector instead of one HashEntry
+# object per slot.
+
+from array import array
+
+from a6_include import (DynamicArray, HashEntry,
+                        hash_function_1, hash_function_2)
+from hash_functions import HASH_MASK
+from hash_map_capacity import double_capacity, is_prime, next_prime
+from hash_map_views import ItemsView, KeysView, ValuesView
+
+# slot states stored in the state vector
+EMPTY = 0
+LIVE = 1
+DELETED = 2
+
+
+class HashMapIterator:
+    """
+    Separate iterator class for the struct-of-arrays HashMap.
+    The table stores no entry objects, so a HashEntry is built on demand
+    for each live slot. Raises RuntimeError if the hash map gains or loses
+    keys while it is being iterated.
+    """
+
+    def __init__(self, hash_map: "HashMap") -> None:
+        """Initialize the iterator at the first slot of the hash map."""
+        self._map = hash_map
+        self._index = 0
+        self._version = hash_map._version
+
+    def __iter__(self) -> "HashMapIterator":
+        """Return the iterator."""
+        return self
+
+    def __next__(self) -> HashEntry:
+        """Obtain the next live entry and advance the iterator."""
+        if self._map._version != self._version:
+            raise RuntimeError('HashMap changed size during iteration')
+
+        states = self._map._states
+        while self._index < len(states):
+            index = self._index
+            self._index += 1
+            if states[index] == LIVE:
+                return HashEntry(self._map._keys.get_at_index(index),
+                                 self._map._values.get_at_index(index))
+
+        raise StopIteration
+
+
+class HashMap:
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Initialize new HashMap that uses quadratic probing for collision
+        resolution and stores its slots as parallel arrays
+        """
+        # capacity must be a prime number
+        self._capacity = self._next_prime(capacity)
+        self._allocate(self._capacity)
+
+        self._hash_function = function
+        self._size = 0
+        self._tombstones = 0
+
+        # incremented whenever keys are added or removed, to detect mutation during iteration
+        self._version = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            if self._states[i] == EMPTY:
+                slot = None
+            else:
+                slot = HashEntry(self._keys.get_at_index(i), self._values.get_at_index(i))
+                slot.is_tombstone = self._states[i] == DELETED
+            out += str(i) + ': ' + str(slot) + '\n'
+        return out
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Replaces the slot arrays with empty arrays of the given capacity
+        """
+        self._states = array('b', bytes(capacity))
+        # cached hashes are stored as unsigned 64-bit integers, masked with HASH_MASK
+        self._hashes = array('Q', bytes(8 * capacity))
+        self._keys = DynamicArray([None] * capacity)
+        self._values = DynamicArray([None] * capacity)
+
+    def _next_prime(self, capacity: int) -> int:
+        """
+        Increment from given number to find the closest prime number
+        """
+        return next_prime(capacity)
+
+    @staticmethod
+    def _is_prime(capacity: int) -> bool:
+        """
+        Determine if given integer is a prime number and return boolean
+        """
+        return is_prime(capacity)
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates the key/value pair in the hash map.
+        If the given key exists in the hash map, its associated value
+        is replaced with the new value in place.
+        If the given key is not in the hash map, new key/value pair is added.
+        Table is resized to double its current capacity when the method is called
+        and the current load factor of the table is >= 0.5
+        """
+        # If table load is greater than or equal to 0.5 then resize table
+        if self.table_load() >= 0.5:
+            self.resize_table(double_capacity(self._capacity))
+
+        # If live entries plus tombstones fill 3/4 of the table, then rehash in place
+        elif (self._size + self._tombstones) / self._capacity >= 0.75:
+            self.resize_table(self._capacity)
+
+        hash_code = self._hash_function(key) & HASH_MASK
+        states, hashes = self._states, self._hashes
+        hash_key = hash_code % self._capacity
+        quad_key = hash_key
+        first_tombstone = None
+
+        for j in range(1, self._capacity + 1):
+            state = states[quad_key]
+            if state == EMPTY:
+                break
+            if state == DELETED:
+                if first_tombstone is None:
+                    first_tombstone = quad_key
+            elif hashes[quad_key] == hash_code and self._keys.get_at_index(quad_key) == key:
+                self._values.set_at_index(quad_key, value)
+                return
+            quad_key = (hash_key + j * j) % self._capacity
+
+        # reuse the first tombstone on the probe sequence, if there was one
+        if first_tombstone is not None:
+            quad_key = first_tombstone
+            self._tombstones -= 1
+
+        states[quad_key] = LIVE
+        hashes[quad_key] = hash_code
+        self._keys.set_at_index(quad_key, key)
+        self._values.set_at_index(quad_key, value)
+        self._size += 1
+        self._version += 1
+
+    def table_load(self) -> float:
+        """
+        Returns the current hash table load factor
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty buckets in the hash table
+        """
+        return self._capacity - self._size - self._tombstones
+
+    def get_tombstone_count(self) -> int:
+        """
+        Returns the number of tombstones (removed entries) in the hash table
+        """
+        return self._tombstones
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes the capacity of the internal hash table.
+        All existing key/value pairs remain in the new hash map. Entries are placed
+        using their cached hashes, so no key is hashed again.
+        new_capacity must be > current number of elements in the hash map. If not, the method does nothing.
+        Checks if new_capacity is a prime number. If not, it rounds up to the nearest prime number.
+        """
+        if new_capacity <= self._size:
+            return
+
+        if not self._is_prime(new_capacity):
+            new_capacity = self._next_prime(new_capacity)
+
+        # keep doubling, as the put cascade of the HashEntry map does, until the
+        # entries fit under the 0.5 load factor
+        while self._size and (self._size - 1) / new_capacity >= 0.5:
+            new_capacity = double_capacity(new_capacity)
+
+        old_states, old_hashes = self._states, self._hashes
+        old_keys, old_values = self._keys, self._values
+        self._capacity = new_capacity
+        self._allocate(new_capacity)
+        states, hashes = self._states, self._hashes
+
+        for i in range(len(old_states)):
+            if old_states[i] != LIVE:
+                continue
+
+            # keys are unique, so the first empty slot on the probe sequence is the destination
+            hash_code = old_hashes[i]
+            hash_key = hash_code % new_capacity
+            quad_key = hash_key
+            j = 1
+            while states[quad_key] != EMPTY:
+                quad_key = (hash_key + j * j) % new_capacity
+                j += 1
+
+            states[quad_key] = LIVE
+            hashes[quad_key] = hash_code
+            self._keys.set_at_index(quad_key, old_keys.get_at_index(i))
+            self._values.set_at_index(quad_key, old_values.get_at_index(i))
+
+        self._tombstones = 0
+        self._version += 1
+
+    def _find_index(self, key: str) -> int:
+        """
+        Follows the quadratic probe sequence of the given key and returns the index
+        of its live slot, or None if the key is not in the hash map.
+        Cached hashes are compared before keys.
+        """
+        hash_code = self._hash_function(key) & HASH_MASK
+        states, hashes = self._states, self._hashes
+        hash_key = hash_code % self._capacity
+        quad_key = hash_key
+
+        for j in range(1, self._capacity + 1):
+            state = states[quad_key]
+            if state == EMPTY:
+                return None
+            if (state == LIVE and hashes[quad_key] == hash_code
+                    and self._keys.get_at_index(quad_key) == key):
+                return quad_key
+            quad_key = (hash_key + j * j) % self._capacity
+
+        return None
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key. If the key is not in the hash
+        map, then the method returns None.
+        """
+        index = self._find_index(key)
+        if index is None:
+            return None
+
+        return self._values.get_at_index(index)
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if given key is in the hash map, otherwise returns False.
+        An empty hash map does not contain any keys.
+        """
+        return self._find_index(key) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map.
+        If the key is not in the hash map, the method does nothing (no exceptions
+        is raised)
+        """
+        index = self._find_index(key)
+        if index is not None:
+            # drop the references so removed keys and values can be freed
+            self._states[index] = DELETED
+            self._keys.set_at_index(index, None)
+            self._values.set_at_index(index, None)
+            self._size -= 1
+            self._tombstones += 1
+            self._version += 1
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map. It does not change the underlying
+        hash table capacity.
+        """
+        self._allocate(self._capacity)
+        self._size = 0
+        self._tombstones = 0
+        self._version += 1
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array where each index contains a tuple of a key/value
+        pair stored in the hash map. The order of the keys in the dynamic array
+        does not matter.
+        """
+        arr = DynamicArray()
+
+        for item in self.items():
+            arr.append(item)
+
+        return arr
+
+    def keys(self) -> KeysView:
+        """
+        Returns a live view over the keys stored in the hash map.
+        """
+        return KeysView(self)
+
+    def values(self) -> ValuesView:
+        """
+        Returns a live view over the values stored in the hash map.
+        """
+        return ValuesView(self)
+
+    def items(self) -> ItemsView:
+        """
+        Returns a live view over the (key, value) pairs stored in the hash map.
+        """
+        return ItemsView(self)
+
+    def __iter__(self) -> HashMapIterator:
+        """
+        Returns a new iterator over the live entries of the hash map.
+        """
+        return HashMapIterator(self)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nSoA - put example 1")
+    print("-------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nSoA - remove and tombstones example 1")
+    print("-------------------------------------")
+    m = HashMap(10, hash_function_2)
+    for i in range(5):
+        m.put(str(i), str(i * 24))
+    m.remove('0')
+    m.remove('4')
+    print(m)
+    print(m.get_size(), m.get_tombstone_count(), m.empty_buckets())
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
+
+    print("\nSoA - resize example 1")
+    print("----------------------")
+    m = HashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 13)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    for capacity in range(111, 1000, 117):
+        m.resize_table(capacity)
+        result = True
+        for key in keys:
+            result &= m.contains_key(str(key))
+            result &= not m.contains_key(str(key + 1))
+        print(capacity, result, m.get_size(), m.get_capacity(), round(m.table_load(), 2))
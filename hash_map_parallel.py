@@ -0,0 +1,253 @@
+# Description: Parallel build of the SC and OA HashMaps from a batch of pairs
+# The table is sized for the whole batch up front, so every key's home bucket is
+# known once it is hashed. Worker processes hash the keys in slices and partition
+# them by home bucket range; each bucket range is then laid out by its own worker
+# and stitched into the bucket array of the final map.
+# For open addressing, a probe sequence that would leave its bucket range is not
+# followed by the worker: the entry is set aside and inserted by a fix-up pass
+# after stitching, which follows the full probe sequence over the whole table.
+
+import multiprocessing
+import os
+
+from a6_include import HashEntry, hash_function_2
+from hash_functions import as_list
+import hash_map_oa
+import hash_map_sc
+
+# map built, by map_type
+MAP_TYPES = {'sc': hash_map_sc.HashMap, 'oa': hash_map_oa.HashMap}
+
+# the pairs and the sized, empty map being built; set before the worker processes
+# are forked, so the workers inherit them instead of receiving them pickled
+_build = None
+
+
+def _hash_slice(start: int, stop: int, partitions: int) -> list:
+    """
+    Hashes the keys of pairs[start:stop] in one batch and returns, for each
+    partition, the positions of the pairs whose home bucket is in its range and
+    their hash codes, in input order.
+    """
+    pairs, hash_map = _build
+    capacity = hash_map._capacity
+    hash_codes = hash_map._hash_many([pairs[i][0] for i in range(start, stop)])
+
+    out = [([], []) for _ in range(partitions)]
+    for i, hash_code in zip(range(start, stop), hash_codes):
+        positions, codes = out[hash_code % capacity * partitions // capacity]
+        positions.append(i)
+        codes.append(hash_code)
+    return out
+
+
+def _layout_sc(positions: list, hash_codes: list) -> tuple:
+    """
+    Lays out the chains of one bucket range. Returns the bucket index, pair position
+    and hash code of every distinct key, grouped by bucket in insertion order, and the
+    indices of the chains long enough to be treeified. A repeated key keeps the place
+    of its first occurrence and takes the value of its last, as put would.
+    """
+    pairs, hash_map = _build
+    capacity = hash_map._capacity
+
+    chains = {}
+    seen = {}
+    for position, hash_code in zip(positions, hash_codes):
+        key = pairs[position][0]
+        if key in seen:
+            chain, i = seen[key]
+            chain[i] = (position, hash_code)
+        else:
+            chain = chains.setdefault(hash_code % capacity, [])
+            seen[key] = chain, len(chain)
+            chain.append((position, hash_code))
+
+    indices, out_positions, out_codes, long_chains = [], [], [], []
+    for index, chain in chains.items():
+        if len(chain) >= hash_map_sc.TREEIFY_THRESHOLD:
+            long_chains.append(index)
+        for position, hash_code in chain:
+            indices.append(index)
+            out_positions.append(position)
+            out_codes.append(hash_code)
+    return indices, out_positions, out_codes, long_chains
+
+
+def _layout_oa(lo: int, hi: int, positions: list, hash_codes: list) -> tuple:
+    """
+    Places the entries of the bucket range lo .. hi - 1, each in the first free bucket
+    of its probe sequence, and returns the bucket index, pair position and hash code of
+    every placed entry. An entry whose probe sequence leaves the range before reaching a
+    free bucket is returned separately, as a position and hash code, for the fix-up pass.
+    A repeated key takes the bucket of its first occurrence and the value of its last.
+    """
+    pairs, hash_map = _build
+    capacity = hash_map._capacity
+    growth = hash_map._probe_growth
+    slots = [-1] * (hi - lo)
+    slot_codes = [0] * (hi - lo)
+    overflow_positions, overflow_codes = [], []
+
+    for position, hash_code in zip(positions, hash_codes):
+        key = pairs[position][0]
+        probe_key = hash_code % capacity
+        step = hash_map._probe_step(hash_code, capacity)
+        for _ in range(hi - lo):
+            if not lo <= probe_key < hi:
+                break
+            slot = slots[probe_key - lo]
+            if slot == -1 or (slot_codes[probe_key - lo] == hash_code and pairs[slot][0] == key):
+                slots[probe_key - lo] = position
+                slot_codes[probe_key - lo] = hash_code
+                break
+            probe_key = (probe_key + step) % capacity
+            step += growth
+        else:
+            probe_key = None
+
+        if probe_key is None or not lo <= probe_key < hi:
+            overflow_positions.append(position)
+            overflow_codes.append(hash_code)
+
+    indices, out_positions, out_codes = [], [], []
+    for i, slot in enumerate(slots):
+        if slot != -1:
+            indices.append(lo + i)
+            out_positions.append(slot)
+            out_codes.append(slot_codes[i])
+    return indices, out_positions, out_codes, overflow_positions, overflow_codes
+
+
+def parallel_build(pairs, function=hash_function_2, map_type: str = 'sc',
+                   workers: int = None, **options):
+    """
+    Returns a new hash_map_sc or hash_map_oa HashMap (map_type 'sc' or 'oa') holding the
+    given (key, value) pairs, as from_iterable would, with the hashing and layout split
+    across worker processes (os.cpu_count() by default). options are passed on to the
+    constructor. Repeated keys keep the value of their last occurrence.
+    Worker processes are forked; where fork is not available, or with one worker, every
+    step runs in this process. Creating the nodes or entries and stitching them into the
+    table always runs in this process.
+    """
+    global _build
+
+    if map_type not in MAP_TYPES:
+        raise ValueError('map_type must be one of ' + ', '.join(MAP_TYPES))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError('workers must be at least 1')
+
+    pairs = as_list(pairs)
+    hash_map = MAP_TYPES[map_type](1, function, **options)
+    hash_map.reserve(len(pairs))
+    capacity = hash_map._capacity
+
+    slices = [(len(pairs) * n // workers, len(pairs) * (n + 1) // workers, workers)
+              for n in range(workers)]
+    bounds = [(capacity * p // workers, capacity * (p + 1) // workers) for p in range(workers)]
+
+    # the pool's processes are forked after _build is set, so they inherit it
+    _build = pairs, hash_map
+    pool = None
+    if workers > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        pool = multiprocessing.get_context('fork').Pool(workers)
+    try:
+        if pool is None:
+            partitioned = [_hash_slice(*args) for args in slices]
+        else:
+            partitioned = pool.starmap(_hash_slice, slices)
+
+        # gather each bucket range from every slice, keeping input order
+        ranges = []
+        for p in range(workers):
+            positions, hash_codes = [], []
+            for out in partitioned:
+                positions.extend(out[p][0])
+                hash_codes.extend(out[p][1])
+            ranges.append((positions, hash_codes))
+        del partitioned
+
+        if map_type == 'sc':
+            tasks = ranges
+            layout = _layout_sc
+        else:
+            tasks = [(lo, hi) + r for (lo, hi), r in zip(bounds, ranges)]
+            layout = _layout_oa
+        if pool is None:
+            layouts = [layout(*args) for args in tasks]
+        else:
+            layouts = pool.starmap(layout, tasks)
+    finally:
+        _build = None
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    _stitch(hash_map, pairs, layouts, map_type)
+    return hash_map
+
+
+def _stitch(hash_map, pairs: list, layouts: list, map_type: str) -> None:
+    """
+    Creates the nodes or entries laid out by the workers in the bucket array of the
+    hash map, then runs the open addressing fix-up pass.
+    """
+    buckets = hash_map._buckets
+    size = 0
+
+    if map_type == 'sc':
+        for indices, positions, hash_codes, long_chains in layouts:
+            for index, position, hash_code in zip(indices, positions, hash_codes):
+                key, value = pairs[position]
+                buckets.get_at_index(index).insert(key, value, hash_code)
+            size += len(indices)
+            if hash_map._treeify:
+                for index in long_chains:
+                    hash_map._treeify_bucket(buckets, index)
+        hash_map._size = size
+        hash_map._version += 1
+        return
+
+    for indices, positions, hash_codes, _, _ in layouts:
+        for index, position, hash_code in zip(indices, positions, hash_codes):
+            key, value = pairs[position]
+            buckets.set_at_index(index, HashEntry(key, value, hash_code))
+        size += len(indices)
+    hash_map._size = size
+    hash_map._version += 1
+
+    # entries whose probe sequence crossed a range border: the table is already sized
+    # for every pair, so _insert only walks the probe sequence over the stitched table
+    for _, _, _, positions, hash_codes in layouts:
+        for position, hash_code in zip(positions, hash_codes):
+            key, value = pairs[position]
+            hash_map._insert(key, value, hash_code)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nParallel build - example 1")
+    print("--------------------------")
+    pairs = [('key' + str(i), i) for i in range(20000)] + [('key7', 'last')]
+    for map_type in MAP_TYPES:
+        for workers in (1, 4):
+            m = parallel_build(pairs, hash_function_2, map_type, workers)
+            values = m.get_many(['key0', 'key7', 'key19999', 'missing'])
+            print(map_type, workers, m.get_size(), m.get_capacity(), values)
+
+    print("\nParallel build - example 2")
+    print("--------------------------")
+    keys = ['key' + str(i) for i in range(5000)]
+    for probing in hash_map_oa.PROBING:
+        for power_of_two in (False, True):
+            m = parallel_build([(key, key) for key in keys], hash_function_2, 'oa', 3,
+                               probing=probing, power_of_two=power_of_two)
+            expected = hash_map_oa.HashMap.from_iterable(
+                [(key, key) for key in keys], hash_function_2,
+                probing=probing, power_of_two=power_of_two)
+            print(probing, power_of_two, m.get_size(), m.get_capacity() == expected.get_capacity(),
+                  all(m.get(key) == key for key in keys))
@@ -0,0 +1,396 @@
+# Description: Hash Map Open Addressing Implementation with Robin Hood hashing
+# Uses Dynamic Array data structure with linear probing. An entry being inserted
+# takes the bucket of any resident that is closer to its own home bucket, and
+# removals shift the following entries back, so no tombstones are ever created.
+
+from a6_include import (DynamicArray, HashEntry,
+                        hash_function_1, hash_function_2)
+from hash_functions import mix64
+from hash_map_capacity import double_capacity, is_prime, next_prime
+from hash_map_oa import HashMapIterator
+from hash_map_views import ItemsView, KeysView, ValuesView
+
+
+class HashMap:
+    def __init__(self, capacity: int, function, load_factor: float = 0.9) -> None:
+        """
+        Initialize new HashMap that uses Robin Hood linear probing for collision resolution.
+        Probe lengths stay short and even, so the table only doubles when its
+        load factor reaches load_factor (0.9 by default).
+        """
+        if not 0 < load_factor < 1:
+            raise ValueError('load_factor must be between 0 and 1')
+
+        self._buckets = DynamicArray()
+
+        # capacity must be a prime number
+        self._capacity = self._next_prime(capacity)
+        for _ in range(self._capacity):
+            self._buckets.append(None)
+
+        self._hash_function = function
+
+        # linear probing turns runs of nearby hash codes, which the additive sample
+        # functions produce for similar keys, into long clusters; the cached hash codes
+        # are finalized with mix64 so neighbouring keys land far apart
+        self._hash = lambda key: mix64(function(key))
+
+        self._load_factor = load_factor
+        self._size = 0
+
+        # incremented whenever keys are added or removed, to detect mutation during iteration
+        self._version = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._buckets.length()):
+            out += str(i) + ': ' + str(self._buckets[i]) + '\n'
+        return out
+
+    def _next_prime(self, capacity: int) -> int:
+        """
+        Increment from given number to find the closest prime number
+        """
+        return next_prime(capacity)
+
+    @staticmethod
+    def _is_prime(capacity: int) -> bool:
+        """
+        Determine if given integer is a prime number and return boolean
+        """
+        return is_prime(capacity)
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates the key/value pair in the hash map.
+        If the given key exists in the hash map, its associated value
+        is replaced with the new value in place.
+        If the given key is not in the hash map, new key/value pair is added.
+        Table is resized to double its current capacity when the method is called
+        and the current load factor of the table is >= 0.9 (or the configured load_factor)
+        """
+        # a small table is also grown before its last empty bucket is taken, since
+        # the probe loops rely on finding an empty bucket
+        if self.table_load() >= self._load_factor or self._size + 1 >= self._capacity:
+            self.resize_table(double_capacity(self._capacity))
+
+        hash_code = self._hash(key)
+        capacity = self._capacity
+        index = hash_code % capacity
+        distance = 0
+
+        # walk the probe sequence while the residents are at least as far from home
+        # as the new key would be; past that point the key cannot be in the table
+        while True:
+            entry = self._buckets.get_at_index(index)
+            if entry is None:
+                break
+            if entry.hash_code == hash_code and entry.key == key:
+                entry.value = value
+                return
+            if (index - entry.hash_code % capacity) % capacity < distance:
+                break
+            index = (index + 1) % capacity
+            distance += 1
+
+        self._place(self._buckets, capacity, HashEntry(key, value, hash_code), index, distance)
+        self._size += 1
+        self._version += 1
+
+    @staticmethod
+    def _place(buckets: DynamicArray, capacity: int, entry: HashEntry,
+               index: int, distance: int) -> None:
+        """
+        Stores the entry at the given index, which is distance buckets from its home bucket.
+        A resident that is closer to its own home bucket is displaced and carried on
+        down the probe sequence, until an empty bucket takes the last displaced entry.
+        The table must have at least one empty bucket.
+        """
+        while True:
+            resident = buckets.get_at_index(index)
+            if resident is None:
+                buckets.set_at_index(index, entry)
+                return
+
+            resident_distance = (index - resident.hash_code % capacity) % capacity
+            if resident_distance < distance:
+                buckets.set_at_index(index, entry)
+                entry, distance = resident, resident_distance
+
+            index = (index + 1) % capacity
+            distance += 1
+
+    def table_load(self) -> float:
+        """
+        Returns the current hash table load factor
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty buckets in the hash table
+        """
+        return self._capacity - self._size
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes the capacity of the internal hash table.
+        All existing key/value pairs remain in the new hash map. Entries are placed
+        using their cached hash codes, so no key is hashed again.
+        new_capacity must be > current number of elements in the hash map. If not, the method does nothing.
+        Checks if new_capacity is a prime number. If not, it rounds up to the nearest prime number.
+        """
+        if new_capacity <= self._size:
+            return
+
+        if not self._is_prime(new_capacity):
+            new_capacity = self._next_prime(new_capacity)
+
+        new_capacity = self._grow_capacity(new_capacity, self._size)
+
+        new_buckets = DynamicArray()
+        for _ in range(new_capacity):
+            new_buckets.append(None)
+
+        for i in range(self._buckets.length()):
+            entry = self._buckets.get_at_index(i)
+            if entry is not None:
+                self._place(new_buckets, new_capacity, entry, entry.hash_code % new_capacity, 0)
+
+        self._buckets = new_buckets
+        self._capacity = new_capacity
+        self._version += 1
+
+    def _tables(self) -> tuple:
+        """
+        Returns the bucket arrays holding entries, for the shared iterator.
+        The Robin Hood map never rehashes incrementally, so this is just the table.
+        """
+        return (self._buckets,)
+
+    def reserve(self, n: int) -> None:
+        """
+        Makes room for n more key/value pairs, so that inserting them does not resize the table.
+        Does nothing if the table is already large enough.
+        """
+        required = int((self._size + n - 1) / self._load_factor) + 1
+        if required > self._capacity:
+            self.resize_table(required)
+
+    def _grow_capacity(self, capacity: int, count: int) -> int:
+        """
+        Returns the capacity a table starting at the given capacity ends at after
+        count pairs are inserted one at a time through put: it keeps doubling
+        (to the next prime) until the load factor stays below the configured load_factor
+        """
+        while (count - 1) / capacity >= self._load_factor:
+            capacity = double_capacity(capacity)
+
+        return capacity
+
+    def _find_index(self, key: str) -> int:
+        """
+        Follows the probe sequence of the given key and returns the index of its entry,
+        or None if the key is not in the hash map. The search stops at the first empty
+        bucket, or as soon as it has probed further than the resident entry did, since
+        insertion would have displaced that entry to make room for the key.
+        """
+        hash_code = self._hash(key)
+        capacity = self._capacity
+        index = hash_code % capacity
+        distance = 0
+
+        while True:
+            entry = self._buckets.get_at_index(index)
+            if entry is None:
+                return None
+            if entry.hash_code == hash_code and entry.key == key:
+                return index
+            if (index - entry.hash_code % capacity) % capacity < distance:
+                return None
+            index = (index + 1) % capacity
+            distance += 1
+
+    def _probe_count(self, key: str) -> int:
+        """
+        Returns the number of buckets a lookup of the given key inspects,
+        counting the bucket where the search ends
+        """
+        hash_code = self._hash(key)
+        capacity = self._capacity
+        index = hash_code % capacity
+        count = 1
+
+        while True:
+            entry = self._buckets.get_at_index(index)
+            if (entry is None or entry.key == key
+                    or (index - entry.hash_code % capacity) % capacity < count - 1):
+                return count
+            index = (index + 1) % capacity
+            count += 1
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key. If the key is not in the hash
+        map, then the method returns None.
+        """
+        index = self._find_index(key)
+        if index is None:
+            return None
+
+        return self._buckets.get_at_index(index).value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if given key is in the hash map, otherwise returns False.
+        An empty hash map does not contain any keys.
+        """
+        return self._find_index(key) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map.
+        If the key is not in the hash map, the method does nothing (no exceptions
+        is raised)
+        """
+        index = self._find_index(key)
+        if index is None:
+            return
+
+        # backward shift: move each following entry that is not in its home bucket
+        # back by one, until an empty bucket or an entry at its home bucket is reached
+        capacity = self._capacity
+        next_index = (index + 1) % capacity
+        while True:
+            entry = self._buckets.get_at_index(next_index)
+            if entry is None or entry.hash_code % capacity == next_index:
+                break
+            self._buckets.set_at_index(index, entry)
+            index = next_index
+            next_index = (next_index + 1) % capacity
+
+        self._buckets.set_at_index(index, None)
+        self._size -= 1
+        self._version += 1
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map. It does not change the underlying
+        hash table capacity.
+        """
+        self._buckets = DynamicArray()
+        for _ in range(self._capacity):
+            self._buckets.append(None)
+        self._size = 0
+        self._version += 1
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array where each index contains a tuple of a key/value
+        pair stored in the hash map. The order of the keys in the dynamic array
+        does not matter.
+        """
+        arr = DynamicArray()
+
+        for item in self.items():
+            arr.append(item)
+
+        return arr
+
+    def keys(self) -> KeysView:
+        """
+        Returns a live view over the keys stored in the hash map.
+        """
+        return KeysView(self)
+
+    def values(self) -> ValuesView:
+        """
+        Returns a live view over the values stored in the hash map.
+        """
+        return ValuesView(self)
+
+    def items(self) -> ItemsView:
+        """
+        Returns a live view over the (key, value) pairs stored in the hash map.
+        """
+        return ItemsView(self)
+
+    def __iter__(self) -> HashMapIterator:
+        """
+        Returns a new iterator over the entries of the hash map.
+        """
+        return HashMapIterator(self)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nRobin Hood - put example 1")
+    print("--------------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nRobin Hood - remove example 1")
+    print("-----------------------------")
+    m = HashMap(11, hash_function_1)
+    for i in range(9):
+        m.put('key' + str(i), i)
+    print(m)
+    m.remove('key3')
+    m.remove('key7')
+    print(m)
+    print(m.get_size(), m.empty_buckets(), m.contains_key('key3'), m.get('key8'))
+
+    print("\nRobin Hood - probe lengths example 1")
+    print("------------------------------------")
+    m = HashMap(11, hash_function_2)
+    keys = ['key' + str(i) for i in range(2000)]
+    for key in keys:
+        m.put(key, key)
+    probes = [m._probe_count(key) for key in keys]
+    print(m.get_size(), m.get_capacity(), round(m.table_load(), 2),
+          round(sum(probes) / len(probes), 2), max(probes))
+
+    print("\nRobin Hood - resize example 1")
+    print("-----------------------------")
+    m = HashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 13)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    for capacity in range(111, 1000, 117):
+        m.resize_table(capacity)
+        result = True
+        for key in keys:
+            result &= m.contains_key(str(key))
+            result &= not m.contains_key(str(key + 1))
+        print(capacity, result, m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+
+    print("\nRobin Hood - get_keys_and_values example 1")
+    print("------------------------------------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    print(m.get_keys_and_values())
+    m.resize_table(2)
+    print(m.get_keys_and_values())
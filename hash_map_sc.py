@@ -1,30 +1,201 @@
 # Description: Hash Map Chaining Implementation
 # Uses a Dynamic Array and Linked List as underlying Data Structure
 
+import random
+import time
+from bisect import bisect_left
 
-from a6_include import (DynamicArray, LinkedList,
+from a6_include import (DynamicArray, LinkedList, SLNode,
                         hash_function_1, hash_function_2)
+from hash_functions import as_list, hash_batch, mix64
+from hash_map_capacity import (double_capacity, is_prime, next_power_of_two,
+                               next_prime)
+from hash_map_stats import expected_collisions, histogram_max_mean
+from hash_map_views import ItemsView, KeysView, ValuesView
+
+# load factor a table is brought up to when it shrinks, halfway to the 1.0 growth threshold
+SHRINK_TARGET_LOAD = 0.5
+
+# a chain that reaches TREEIFY_THRESHOLD nodes becomes a SortedBucket, and a SortedBucket
+# that drops to UNTREEIFY_THRESHOLD nodes becomes a linked list again; the gap between
+# them keeps a bucket from converting back and forth on every insert and remove
+TREEIFY_THRESHOLD = 8
+UNTREEIFY_THRESHOLD = 6
+
+
+class SortedBucket:
+    """
+    Bucket for a long chain: the nodes are kept sorted by key and found with
+    binary search, so a lookup inspects O(log n) keys instead of the whole chain.
+    Supports the LinkedList methods the hash map uses: insert, remove, contains,
+    length and iteration over the nodes. Keys must be orderable, as strings are.
+    """
+
+    def __init__(self, chain=None) -> None:
+        """
+        Initialize the bucket with the nodes of the given chain, if any.
+        """
+        nodes = sorted(chain if chain is not None else [], key=lambda node: node.key)
+        self._keys = [node.key for node in nodes]
+        self._nodes = nodes
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return 'SORTED [' + ', '.join(str(node) for node in self._nodes) + ']'
+
+    def __iter__(self):
+        """Return an iterator over the nodes, in key order."""
+        return iter(self._nodes)
+
+    def insert(self, key: str, value: object, hash_code: int = None) -> None:
+        """Insert a new node for a key that is not in the bucket."""
+        index = bisect_left(self._keys, key)
+        self._keys.insert(index, key)
+        self._nodes.insert(index, SLNode(key, value, None, hash_code))
+
+    def remove(self, key: str) -> bool:
+        """
+        Remove the node with matching key.
+        Return True if removal was successful, False otherwise.
+        """
+        index = bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            del self._keys[index]
+            del self._nodes[index]
+            return True
+        return False
+
+    def contains(self, key: str) -> SLNode:
+        """Return node with matching key, or None if no match"""
+        index = bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            return self._nodes[index]
+        return None
+
+    def length(self) -> int:
+        """Return the number of nodes in the bucket."""
+        return len(self._nodes)
+
+
+class HashMapIterator:
+    """
+    Separate iterator class for the separate chaining HashMap.
+    Yields each SLNode bucket by bucket and raises RuntimeError if the
+    hash map gains or loses keys while it is being iterated.
+    During an incremental rehash the old table is walked before the new one.
+    """
+
+    def __init__(self, hash_map: "HashMap") -> None:
+        """Initialize the iterator before the first bucket of the hash map."""
+        self._map = hash_map
+        self._table = 0
+        self._index = 0
+        self._chain = None
+        self._version = hash_map._version
+
+    def __iter__(self) -> "HashMapIterator":
+        """Return the iterator."""
+        return self
+
+    def __next__(self) -> SLNode:
+        """Obtain the next node and advance the iterator."""
+        if self._map._version != self._version:
+            raise RuntimeError('HashMap changed size during iteration')
+
+        while True:
+            if self._chain is not None:
+                node = next(self._chain, None)
+                if node is not None:
+                    return node
+
+            tables = self._map._tables()
+            if self._table >= len(tables):
+                raise StopIteration
+            buckets = tables[self._table]
+            if self._index >= buckets.length():
+                self._table += 1
+                self._index = 0
+                continue
+
+            # buckets of the old table are dropped once they have been migrated
+            chain = buckets.get_at_index(self._index)
+            self._index += 1
+            if chain is not None:
+                self._chain = iter(chain)
 
 
 class HashMap:
     def __init__(self,
                  capacity: int = 11,
-                 function: callable = hash_function_1) -> None:
+                 function: callable = hash_function_1,
+                 power_of_two: bool = False,
+                 incremental: bool = False,
+                 rehash_step: int = 16,
+                 shrink_load: float = None,
+                 stats_hook: callable = None,
+                 treeify: bool = True) -> None:
         """
         Initialize new HashMap that uses
-        separate chaining for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        separate chaining for collision resolution.
+        In power-of-two mode the capacity is a power of two and hash codes
+        are finalized with mix64 before they are masked to a bucket index.
+        In incremental mode the table grows without a stop-the-world rehash: each
+        put and remove moves rehash_step buckets from the old table to the new one.
+        With a shrink_load (below 0.5), the table shrinks once remove drops the load factor
+        under it, and clear returns it to its initial capacity.
+        stats_hook, if given, is called as stats_hook(event, old_capacity=..., new_capacity=...,
+        size=...) whenever the table grows ('grow') or shrinks ('shrink').
+        With treeify, a chain that reaches TREEIFY_THRESHOLD nodes is replaced by a
+        SortedBucket searched with binary search.
         """
+        if shrink_load is not None and not 0 < shrink_load < SHRINK_TARGET_LOAD:
+            raise ValueError('shrink_load must be between 0 and ' + str(SHRINK_TARGET_LOAD))
+
         self._buckets = DynamicArray()
+        self._power_of_two = power_of_two
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
+        # capacity must be a prime number (or a power of two in power-of-two mode)
+        if power_of_two:
+            self._capacity = next_power_of_two(capacity)
+        else:
+            self._capacity = self._next_prime(capacity)
         for _ in range(self._capacity):
             self._buckets.append(LinkedList())
 
         self._hash_function = function
+
+        # hash codes cached in the nodes: the output of the hash function,
+        # finalized with mix64 in power-of-two mode so its low bits are well spread
+        if power_of_two:
+            self._hash = lambda key: mix64(function(key))
+        else:
+            self._hash = function
         self._size = 0
 
+        # incremental rehash state: while a rehash is active, the new table is first
+        # allocated (_pending), then takes over as _buckets while the old table is
+        # drained from _rehash_index up, a few buckets per put or remove
+        self._incremental = incremental
+        self._rehash_step = rehash_step
+        self._rehash_active = False
+        self._pending = None
+        self._pending_capacity = 0
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._rehash_index = 0
+
+        # longest time, in seconds, a single operation spent resizing the table
+        self._max_pause = 0.0
+
+        # shrink policy: the table never shrinks below the capacity it started with
+        self._min_capacity = self._capacity
+        self._shrink_load = shrink_load
+        self._stats_hook = stats_hook
+        self._treeify = treeify
+
+        # incremented whenever keys are added or removed, to detect mutation during iteration
+        self._version = 0
+
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
@@ -37,36 +208,16 @@ class HashMap:
 
     def _next_prime(self, capacity: int) -> int:
         """
-        Increment from given number and the find the closest prime number
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        Increment from given number to find the closest prime number
         """
-        if capacity % 2 == 0:
-            capacity += 1
-
-        while not self._is_prime(capacity):
-            capacity += 2
-
-        return capacity
+        return next_prime(capacity)
 
     @staticmethod
     def _is_prime(capacity: int) -> bool:
         """
         Determine if given integer is a prime number and return boolean
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
-        if capacity == 2 or capacity == 3:
-            return True
-
-        if capacity == 1 or capacity % 2 == 0:
-            return False
-
-        factor = 3
-        while factor ** 2 <= capacity:
-            if capacity % factor == 0:
-                return False
-            factor += 2
-
-        return True
+        return is_prime(capacity)
 
     def get_size(self) -> int:
         """
@@ -90,27 +241,67 @@ class HashMap:
         If the given key exists, then associated value is replaced by new value.
         If given key is not in the hash map, a new key/value pair must be added.
         The table is resized to double its current capacity when current load factor is >= 1.0.
+        In incremental mode the resize is started here and carried out by later calls.
         """
-        if self.table_load() >= 1.0:
-            self.resize_table(self._capacity * 2)
+        if self._rehash_active:
+            self.rehash(self._rehash_step)
+        elif self.table_load() >= 1.0:
+            self._resize('grow', self._double_capacity(self._capacity))
 
-        hash_key = self._hash_function(key) % self._capacity
-        chain_key = self._buckets.get_at_index(hash_key)
+        self._insert(key, value, self._hash(key))
 
-        # If the key in the hash map does not yet exist, then simply add the key to the corresponding bucket
-        # and its value, which will be a linked list node.
-        if chain_key.length() == 0:
-            chain_key.insert(key, value)
-            self._size += 1
+    def _resize(self, event: str, new_capacity: int, incremental: bool = None) -> None:
+        """
+        Resizes the table for put or remove: starts an incremental rehash in incremental
+        mode (or if incremental is True), otherwise resizes it at once. The event ('grow'
+        or 'shrink') is reported to the stats hook.
+        """
+        old_capacity = self._capacity
+        if self._incremental if incremental is None else incremental:
+            self._start_rehash(new_capacity)
         else:
-            # iterate through the linked list and check if the same key exists. If it does then do nothing
-            for item in chain_key:
-                if item.key == key:
-                    chain_key.remove(key)
-                    chain_key.insert(key, value)
-                    return
-            chain_key.insert(key, value)
+            self.resize_table(new_capacity)
+
+        if self._stats_hook is not None:
+            new_capacity = self._pending_capacity if self._pending is not None else self._capacity
+            self._stats_hook(event, old_capacity=old_capacity, new_capacity=new_capacity,
+                             size=self._size)
+
+    def _maybe_shrink(self, incremental: bool = None) -> None:
+        """
+        Shrinks the table once its load factor drops below shrink_load. The new capacity
+        brings the load factor up to SHRINK_TARGET_LOAD, so the table is far from both
+        thresholds after a resize and does not thrash between them.
+        incremental overrides the map's mode for the shrink, if given.
+        """
+        if (self._rehash_active or self._capacity <= self._min_capacity
+                or self.table_load() >= self._shrink_load):
+            return
+
+        new_capacity = max(self._min_capacity, int(self._size / SHRINK_TARGET_LOAD) + 1)
+        if new_capacity < self._capacity:
+            self._resize('shrink', new_capacity, incremental)
+
+    def _insert(self, key: str, value: object, hash_code: int) -> None:
+        """
+        Adds or updates the key/value pair without checking the load factor.
+        """
+        index = hash_code % self._capacity
+        chain_key = self._buckets.get_at_index(index)
+
+        # If the key already exists in its chain, then overwrite the node's value in place.
+        # Otherwise add a new linked list node for the key/value pair to the bucket.
+        node = self._find_node(chain_key, key, hash_code)
+        if node is None and self._old_buckets is not None:
+            node = self._find_old_node(key, hash_code)
+        if node:
+            node.value = value
+        else:
+            chain_key.insert(key, value, hash_code)
             self._size += 1
+            self._version += 1
+            if self._treeify and chain_key.length() >= TREEIFY_THRESHOLD:
+                self._treeify_bucket(self._buckets, index)
 
     def empty_buckets(self) -> int:
         """
@@ -122,6 +313,65 @@ class HashMap:
                 c += 1
         return c
 
+    def stats(self, sample: int = None) -> dict:
+        """
+        Returns statistics of the table, gathered in one pass over the buckets that reads
+        only chain lengths, so it is cheap enough to run periodically on large maps:
+        - 'chain_lengths': histogram {chain length: number of buckets}, empty buckets included
+        - 'max_chain' and 'mean_chain': the longest chain and the mean length of non-empty chains
+        - 'empty_buckets' and 'sorted_buckets' (chains stored as a SortedBucket)
+        - 'collisions': keys sharing a bucket with an earlier key, and 'expected_collisions',
+          the number a uniform hash function would give for the same size and capacity
+        - 'size', 'capacity' and 'load'
+        While an incremental rehash is in progress, the old buckets not yet migrated are
+        counted too. With a sample, only that many consecutive buckets of each table are
+        scanned, from a random starting bucket, and the counts describe that window.
+        """
+        chain_lengths = {}
+        sorted_buckets = 0
+        collisions = 0
+        expected = 0.0
+        buckets_scanned = 0
+
+        for buckets in self._tables():
+            capacity = buckets.length()
+            count = capacity if sample is None else min(sample, capacity)
+            start = 0 if count == capacity else random.randrange(capacity)
+            nodes = occupied = 0
+            for scanned in range(count):
+                chain = buckets.get_at_index((start + scanned) % capacity)
+                if chain is None:
+                    continue
+                length = chain.length()
+                chain_lengths[length] = chain_lengths.get(length, 0) + 1
+                if length:
+                    nodes += length
+                    occupied += 1
+                    if type(chain) is SortedBucket:
+                        sorted_buckets += 1
+            collisions += nodes - occupied
+            expected += expected_collisions(nodes, count)
+            buckets_scanned += count
+
+        empty = chain_lengths.pop(0, 0)
+        max_chain, mean_chain = histogram_max_mean(chain_lengths)
+        if empty:
+            chain_lengths[0] = empty
+
+        return {
+            'size': self._size,
+            'capacity': self._capacity,
+            'load': self.table_load(),
+            'chain_lengths': dict(sorted(chain_lengths.items())),
+            'max_chain': max_chain,
+            'mean_chain': mean_chain,
+            'empty_buckets': empty,
+            'sorted_buckets': sorted_buckets,
+            'collisions': collisions,
+            'expected_collisions': expected,
+            'buckets_scanned': buckets_scanned,
+        }
+
     def table_load(self) -> float:
         """
         Returns the current hash table load factor.
@@ -132,109 +382,500 @@ class HashMap:
 
     def clear(self) -> None:
         """
-        Clears the contents of the hash map. It does not change the underlying hash table capacity.
+        Clears the contents of the hash map. It does not change the underlying hash table capacity,
+        unless a shrink_load is set: then the table returns to its initial capacity.
         """
+        if self._shrink_load is not None and self._capacity != self._min_capacity:
+            if self._stats_hook is not None:
+                self._stats_hook('shrink', old_capacity=self._capacity,
+                                 new_capacity=self._min_capacity, size=0)
+            self._capacity = self._min_capacity
+
         self._buckets = DynamicArray()
         self._size = 0
         for _ in range(self._capacity):
             self._buckets.append(LinkedList())
+        self._stop_rehash()
+        self._version += 1
 
     def resize_table(self, new_capacity: int) -> None:
         """
         Changes the capacity of the internal hash table.
-        All existing key/value pairs must remain in the new hash map, and all hash table links are rehashed.
+        All existing key/value pairs must remain in the new hash map, and all hash table links are rehashed
+        from the cached hash codes of the nodes, without calling the hash function again.
         It first checks that new_capacity is not less than 1. If it is, then it does nothing.
         If new_capacity >= 1, it makes sure that it is a prime number. If not, then it will round up to the
         next highest prime number.
+        An incremental rehash in progress is finished as part of the resize.
         """
         # First, check if new_capacity is less than 1. If it is then do nothing
         if new_capacity < 1:
             return
 
+        start = time.perf_counter()
+
         # A check for a new capacity with a prime number size
-        if not self._is_prime(new_capacity):
+        if self._power_of_two:
+            new_capacity = next_power_of_two(new_capacity)
+        elif not self._is_prime(new_capacity):
             new_capacity = self._next_prime(new_capacity)
 
-        # First, create a new Hashmap with the new capacity
-        new_table = HashMap(new_capacity, self._hash_function)
+        new_capacity = self._grow_capacity(new_capacity, self._size)
 
-        # this is to prevent next_prime from going to 3, when it should stay at 2 (since 2 is prime)
-        if new_capacity == 2:
-            new_table._capacity = 2
+        new_buckets = DynamicArray()
+        for _ in range(new_capacity):
+            new_buckets.append(LinkedList())
 
-        for i in range(self._capacity):
-            if self._buckets.get_at_index(i).length() > 0:
-                # chain_key = self._buckets.get_at_index(i).__iter__()
-                for item in self._buckets.get_at_index(i):
-                    new_table.put(item.key, item.value)
-                # for _ in range(self._buckets.get_at_index(i).length()):
-                #     node = chain_key.__next__()
-                #     new_table.put(node.key, node.value)
+        # Each node keeps its cached hash code, so only the bucket index is
+        # recomputed and no key goes through the hash function again.
+        # Under a prime modulus the nodes of any old chains can meet in one new
+        # bucket, so every chain is checked against the threshold as it grows.
+        for buckets in self._tables():
+            for i in range(buckets.length()):
+                chain = buckets.get_at_index(i)
+                if chain is None:
+                    continue
+                for node in chain:
+                    index = node.hash_code % new_capacity
+                    new_chain = new_buckets.get_at_index(index)
+                    new_chain.insert(node.key, node.value, node.hash_code)
+                    if (self._treeify and type(new_chain) is LinkedList
+                            and new_chain.length() >= TREEIFY_THRESHOLD):
+                        self._treeify_bucket(new_buckets, index)
 
         # Reassigning new values to self
-        self._buckets = new_table._buckets
-        self._size = new_table._size
-        self._capacity = new_table._capacity
+        self._buckets = new_buckets
+        self._capacity = new_capacity
+        self._stop_rehash()
+        self._version += 1
+        self._max_pause = max(self._max_pause, time.perf_counter() - start)
+
+    def _tables(self) -> tuple:
+        """
+        Returns the bucket arrays holding nodes: the old table and the new one while
+        an incremental rehash is migrating buckets, otherwise just the table.
+        """
+        if self._old_buckets is None:
+            return (self._buckets,)
+
+        return self._old_buckets, self._buckets
+
+    def _start_rehash(self, new_capacity: int) -> None:
+        """
+        Starts an incremental rehash into a table of the given capacity (rounded as in
+        resize_table). The new table is allocated and filled by later calls to rehash().
+        """
+        if self._power_of_two:
+            new_capacity = next_power_of_two(new_capacity)
+        elif not self._is_prime(new_capacity):
+            new_capacity = self._next_prime(new_capacity)
+
+        self._rehash_active = True
+        self._pending = DynamicArray()
+        self._pending_capacity = self._grow_capacity(new_capacity, self._size)
+
+    def _stop_rehash(self) -> None:
+        """
+        Drops the incremental rehash state, once every node is in self._buckets
+        """
+        self._rehash_active = False
+        self._pending = None
+        self._pending_capacity = 0
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._rehash_index = 0
+
+    def rehash(self, n: int) -> bool:
+        """
+        Carries an incremental rehash forward by n buckets and returns True if it is
+        still in progress. The new table is allocated 2 * n buckets at a time; once it
+        is complete, the nodes of n old buckets are moved into it per call.
+        Does nothing and returns False if no rehash is in progress.
+        """
+        if not self._rehash_active:
+            return False
+
+        start = time.perf_counter()
+
+        if self._pending is not None:
+            pending = self._pending
+            for _ in range(min(2 * n, self._pending_capacity - pending.length())):
+                pending.append(LinkedList())
+
+            # the new table is complete: it takes over and the old table starts draining
+            if pending.length() == self._pending_capacity:
+                self._old_buckets, self._old_capacity = self._buckets, self._capacity
+                self._buckets, self._capacity = pending, self._pending_capacity
+                self._pending = None
+                self._version += 1
+        else:
+            old_buckets, buckets, capacity = self._old_buckets, self._buckets, self._capacity
+            end = min(self._rehash_index + n, self._old_capacity)
+            for i in range(self._rehash_index, end):
+                for node in old_buckets.get_at_index(i):
+                    index = node.hash_code % capacity
+                    chain = buckets.get_at_index(index)
+                    chain.insert(node.key, node.value, node.hash_code)
+                    if (self._treeify and type(chain) is LinkedList
+                            and chain.length() >= TREEIFY_THRESHOLD):
+                        self._treeify_bucket(buckets, index)
+                old_buckets.set_at_index(i, None)
+            self._rehash_index = end
+            self._version += 1
+
+            if end == self._old_capacity:
+                self._stop_rehash()
+
+        self._max_pause = max(self._max_pause, time.perf_counter() - start)
+        return self._rehash_active
+
+    def _finish_rehash(self) -> None:
+        """
+        Completes an incremental rehash in progress in one go
+        """
+        while self.rehash(self._capacity + self._pending_capacity):
+            pass
+
+    def start_resize(self, new_capacity: int) -> None:
+        """
+        Starts an incremental rehash into a table of the given capacity (rounded as in
+        resize_table), whether or not the map is in incremental mode; later calls to
+        rehash() carry it forward. A rehash already in progress is finished first.
+        """
+        if self._rehash_active:
+            self._finish_rehash()
+        self._start_rehash(new_capacity)
+
+    def is_rehashing(self) -> bool:
+        """
+        Returns True while an incremental rehash is in progress
+        """
+        return self._rehash_active
+
+    def resize_needed(self, n: int) -> int:
+        """
+        Returns the capacity put would grow the table to while n more key/value pairs
+        are inserted, or None if it would not resize
+        """
+        new_capacity = self._grow_capacity(self._capacity, self._size + n)
+        if new_capacity != self._capacity:
+            return new_capacity
+
+        return None
+
+    def rehash_progress(self) -> float:
+        """
+        Returns the fraction of the incremental rehash done so far, counting the buckets
+        allocated in the new table and the old buckets migrated. Returns 1.0 when no
+        rehash is in progress.
+        """
+        if not self._rehash_active:
+            return 1.0
+
+        if self._pending is not None:
+            return self._pending.length() / (self._pending_capacity + self._capacity)
+
+        return (self._capacity + self._rehash_index) / (self._capacity + self._old_capacity)
+
+    def get_max_pause(self) -> float:
+        """
+        Returns the longest time, in seconds, that a single call spent resizing the
+        table: a whole resize_table, or one step of an incremental rehash
+        """
+        return self._max_pause
+
+    def reserve(self, n: int) -> None:
+        """
+        Makes room for n more key/value pairs, so that inserting them does not resize the table.
+        Under the 1.0 load factor policy the capacity must be at least the final size.
+        Does nothing if the table is already large enough.
+        """
+        required = self._size + n
+        if required > self._capacity:
+            self.resize_table(required)
+
+    @classmethod
+    def from_iterable(cls, pairs, function: callable = hash_function_1, size_hint: int = None,
+                      **options) -> "HashMap":
+        """
+        Returns a new hash map holding the given (key, value) pairs, loaded without any resize.
+        The table is reserved for size_hint pairs. Without a size_hint, pairs is read into a list
+        first and its length is used. options are passed on to the constructor.
+        """
+        if size_hint is None:
+            pairs = as_list(pairs)
+            size_hint = len(pairs)
+
+        hash_map = cls(1, function, **options)
+        hash_map.reserve(size_hint)
+
+        if isinstance(pairs, (list, DynamicArray)):
+            hash_map.put_many(pairs)
+        else:
+            for key, value in pairs:
+                hash_map.put(key, value)
+
+        return hash_map
+
+    def _grow_capacity(self, capacity: int, count: int) -> int:
+        """
+        Returns the capacity a table starting at the given capacity ends at after count pairs
+        are inserted one at a time through put: it keeps doubling (to the next prime) until
+        the load factor stays below 1.0.
+        """
+        while (count - 1) / capacity >= 1.0:
+            capacity = self._double_capacity(capacity)
+
+        return capacity
+
+    def _double_capacity(self, capacity: int) -> int:
+        """
+        Returns the capacity the table grows to when it doubles.
+        """
+        if self._power_of_two:
+            return capacity * 2
+
+        return double_capacity(capacity)
+
+    def _find_node(self, chain: LinkedList, key: str, hash_code: int) -> SLNode:
+        """
+        Returns the node of the given key in the chain, or None if the key is not in it.
+        Cached hash codes are compared before the keys themselves; a SortedBucket
+        is searched with binary search instead.
+        """
+        if type(chain) is SortedBucket:
+            return chain.contains(key)
+
+        for node in chain:
+            if node.hash_code == hash_code and node.key == key:
+                return node
+
+        return None
+
+    def _find_old_node(self, key: str, hash_code: int) -> SLNode:
+        """
+        Returns the node of the given key in the old table of an incremental rehash,
+        or None if the key is not there or its bucket has already been migrated.
+        """
+        index = hash_code % self._old_capacity
+        if index < self._rehash_index:
+            return None
+
+        return self._find_node(self._old_buckets.get_at_index(index), key, hash_code)
+
+    def _probe_count(self, key: str) -> int:
+        """
+        Returns the number of nodes a lookup of the given key inspects in its chain.
+        A binary search of a SortedBucket inspects at most log2(n) + 1 nodes.
+        """
+        chain = self._buckets.get_at_index(self._hash(key) % self._capacity)
+        if type(chain) is SortedBucket:
+            return chain.length().bit_length()
+
+        count = 0
+        for node in chain:
+            count += 1
+            if node.key == key:
+                break
+
+        return count
 
     def get(self, key: str):
         """
         Returns the value associated with given key. If key is not in the hash map, return None.
         """
         # This passes the key through a hash function and spits out the corresponding key in the buckets.
-        hash_key = self._hash_function(key) % self._capacity
+        hash_code = self._hash(key)
 
         # Storing the corresponding bucket into a variable to be used later.
-        chain_key = self._buckets.get_at_index(hash_key)
+        chain_key = self._buckets.get_at_index(hash_code % self._capacity)
 
-        if chain_key.length() == 0:
+        node = self._find_node(chain_key, key, hash_code)
+        if node is None and self._old_buckets is not None:
+            node = self._find_old_node(key, hash_code)
+        if node is None:
             return None
-        else:
-            for item in self._buckets.get_at_index(hash_key):
-                if item.key == key:
-                    return item.value
 
-        return None
+        return node.value
 
     def contains_key(self, key: str) -> bool:
         """
         Returns True if given key is in the hash map, otherwise returns False.
         An empty hash map does not contain any keys.
         """
+        hash_code = self._hash(key)
+        chain_key = self._buckets.get_at_index(hash_code % self._capacity)
+        if self._find_node(chain_key, key, hash_code) is not None:
+            return True
 
-        for i in range(self._capacity):
-            if self._buckets.get_at_index(i).length() > 0:
-                for item in self._buckets.get_at_index(i):
-                    if item.key == key:
-                        return True
-
-        return False
+        return self._old_buckets is not None and self._find_old_node(key, hash_code) is not None
 
-    def remove(self, key: str) -> None:
+    def remove(self, key: str, incremental: bool = None) -> None:
         """
         Removes the given key and its associated value from the hash map. If key is not in the hash map,
         the method does nothing (no exception needs to be raised).
+        If the remove shrinks the table, incremental=True starts the shrink as an incremental
+        rehash and incremental=False shrinks the table at once; by default the map's mode decides.
         """
-        for i in range(self._capacity):
-            if self._buckets.get_at_index(i).length() > 0:
-                for item in self._buckets.get_at_index(i):
-                    if item.key == key:
-                        self._buckets.get_at_index(i).remove(key)
-                        self._size -= 1
+        if self._rehash_active:
+            self.rehash(self._rehash_step)
+
+        self._remove_hashed(key, self._hash(key))
+
+        if self._shrink_load is not None:
+            self._maybe_shrink(incremental)
+
+    def _remove_hashed(self, key: str, hash_code: int) -> None:
+        """
+        Removes the key from the chain its hash code maps to, if it is there.
+        """
+        index = hash_code % self._capacity
+        chain = self._buckets.get_at_index(index)
+        removed = chain.remove(key)
+
+        # a sorted bucket that has shrunk back to a short chain is cheaper to scan as a list
+        if removed and type(chain) is SortedBucket and chain.length() <= UNTREEIFY_THRESHOLD:
+            self._untreeify_bucket(self._buckets, index)
+
+        # a key that is not in the new table may still be in an old bucket that has not been migrated
+        if not removed and self._old_buckets is not None:
+            index = hash_code % self._old_capacity
+            if index >= self._rehash_index:
+                removed = self._old_buckets.get_at_index(index).remove(key)
+
+        if removed:
+            self._size -= 1
+            self._version += 1
+
+    @staticmethod
+    def _treeify_bucket(buckets: DynamicArray, index: int) -> None:
+        """
+        Replaces the linked list at the given index with a SortedBucket of its nodes.
+        """
+        chain = buckets.get_at_index(index)
+        if type(chain) is LinkedList:
+            buckets.set_at_index(index, SortedBucket(chain))
+
+    @staticmethod
+    def _untreeify_bucket(buckets: DynamicArray, index: int) -> None:
+        """
+        Replaces the SortedBucket at the given index with a linked list of its nodes.
+        """
+        chain = LinkedList()
+        for node in buckets.get_at_index(index):
+            chain.insert(node.key, node.value, node.hash_code)
+        buckets.set_at_index(index, chain)
+
+    def _hash_many(self, keys: list):
+        """
+        Returns the hash codes of the keys, in order, computed in one batch.
+        """
+        hash_codes = hash_batch(self._hash_function, keys)
+        if self._power_of_two:
+            return map(mix64, hash_codes)
+
+        return hash_codes
+
+    def put_many(self, pairs) -> None:
+        """
+        Updates the hash map with every (key, value) pair, in order, as a loop of put calls would.
+        pairs may be any iterable of tuples or a DynamicArray of tuples.
+        All keys are hashed in one batch, existing keys are updated in place, and the table is
+        resized at most once, up front, for the keys that are not yet in the hash map.
+        """
+        pairs = as_list(pairs)
+        hash_codes = self._hash_many([pair[0] for pair in pairs])
+
+        # a batch is not latency sensitive, so a rehash in progress is finished first
+        self._finish_rehash()
+
+        # update the keys already in the hash map and set the new pairs aside
+        new_pairs = []
+        for (key, value), hash_code in zip(pairs, hash_codes):
+            chain_key = self._buckets.get_at_index(hash_code % self._capacity)
+            node = self._find_node(chain_key, key, hash_code)
+            if node:
+                node.value = value
+            else:
+                new_pairs.append((key, value, hash_code))
+
+        # a key repeated within the batch is counted more than once, so this is an upper bound
+        new_capacity = self.resize_needed(len(new_pairs))
+        if new_capacity is not None:
+            self.resize_table(new_capacity)
+
+        for key, value, hash_code in new_pairs:
+            self._insert(key, value, hash_code)
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Returns a dynamic array with the value of each given key, in input order.
+        Keys that are not in the hash map get None. All keys are hashed in one batch.
+        """
+        keys = as_list(keys)
+        values = []
+
+        for key, hash_code in zip(keys, self._hash_many(keys)):
+            chain_key = self._buckets.get_at_index(hash_code % self._capacity)
+            node = self._find_node(chain_key, key, hash_code)
+            if node is None and self._old_buckets is not None:
+                node = self._find_old_node(key, hash_code)
+            values.append(None if node is None else node.value)
+
+        return DynamicArray(values)
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes every given key from the hash map. Keys that are not in the hash map are skipped.
+        All keys are hashed in one batch.
+        """
+        keys = as_list(keys)
+
+        for key, hash_code in zip(keys, self._hash_many(keys)):
+            self._remove_hashed(key, hash_code)
+
+        if self._shrink_load is not None:
+            self._maybe_shrink()
 
     def get_keys_and_values(self) -> DynamicArray:
         """
         Returns a dynamic array where each index contains a tuple of a key/value pair stored in the hash map.
         The order of the keys in the dynamic array does not matter.
+        Use items() to stream the pairs without building a copy.
         """
         da = DynamicArray()
 
-        for i in range(self._capacity):
-            if self._buckets.get_at_index(i).length() > 0:
-                for item in self._buckets.get_at_index(i):
-                    da.append((item.key, item.value))
+        for item in self.items():
+            da.append(item)
 
         return da
 
+    def keys(self) -> KeysView:
+        """
+        Returns a live view over the keys stored in the hash map.
+        """
+        return KeysView(self)
+
+    def values(self) -> ValuesView:
+        """
+        Returns a live view over the values stored in the hash map.
+        """
+        return ValuesView(self)
+
+    def items(self) -> ItemsView:
+        """
+        Returns a live view over the (key, value) pairs stored in the hash map.
+        """
+        return ItemsView(self)
+
+    def __iter__(self) -> HashMapIterator:
+        """
+        Returns a new iterator over the nodes of the hash map, bucket by bucket.
+        Each iterator tracks its own position, so several loops over the
+        same hash map do not interfere with each other.
+        """
+        return HashMapIterator(self)
+
 
 def find_mode(da: DynamicArray) -> (DynamicArray, int):
     """
@@ -0,0 +1,367 @@
+# Description: Hash Map sharded across worker processes
+# Each key is routed by its hash code to one of N worker processes, and each
+# worker owns a local separate chaining or open addressing HashMap. Requests
+# are batched per shard: writes are buffered and sent together, and the batch
+# methods send one message per shard, so the cost of a round trip between
+# processes is shared by many keys. Work inside the shards runs in parallel.
+
+import multiprocessing
+
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+from hash_functions import as_list, hash_batch, mix64
+import hash_map_oa
+import hash_map_sc
+
+# local map used by each worker, by map_type
+MAP_TYPES = {'sc': hash_map_sc.HashMap, 'oa': hash_map_oa.HashMap}
+
+# buffered put/remove requests per shard that are sent as one message
+BATCH_SIZE = 1024
+
+_PUT, _REMOVE = 0, 1
+
+
+class BufferedWriteError(Exception):
+    """
+    Raised when buffered puts or removes failed in their shards. A failed write does not
+    stop the others: every other buffered write was still applied, in order.
+    errors lists (shard, position, key, error) for each failed write, where position is
+    the index of the write among the buffered writes sent to that shard in the batch.
+    """
+
+    def __init__(self, errors: list) -> None:
+        super().__init__(str(len(errors)) + ' buffered write(s) failed, first: '
+                         + repr(errors[0][3]))
+        self.errors = errors
+
+
+def _serve(conn, map_type: str, capacity: int, function, options: dict) -> None:
+    """
+    Worker process loop: owns one local HashMap and answers (command, argument)
+    messages on the connection until it receives 'close'. An exception raised by
+    a command is sent back to be raised in the caller.
+    """
+    m = MAP_TYPES[map_type](capacity, function, **options)
+
+    while True:
+        command, argument = conn.recv()
+        try:
+            if command == 'close':
+                break
+            if command == 'apply':
+                # buffered single-key writes, applied in the order they were made; a write
+                # that fails does not stop the rest, and its position and error are returned
+                result = []
+                for position, (op, key, value) in enumerate(argument):
+                    try:
+                        if op == _PUT:
+                            m.put(key, value)
+                        else:
+                            m.remove(key)
+                    except Exception as error:
+                        result.append((position, error))
+            elif command == 'put_many':
+                m.put_many(argument)
+                result = None
+            elif command == 'get_many':
+                values = m.get_many(argument)
+                result = [values.get_at_index(i) for i in range(values.length())]
+            elif command == 'contains_many':
+                result = [m.contains_key(key) for key in argument]
+            elif command == 'remove_many':
+                m.remove_many(argument)
+                result = None
+            elif command == 'size':
+                result = (m.get_size(), m.get_capacity(), m.empty_buckets())
+            elif command == 'items':
+                result = list(m.items())
+            elif command == 'clear':
+                m.clear()
+                result = None
+            else:
+                raise ValueError('unknown command ' + str(command))
+        except Exception as error:
+            conn.send(('error', error))
+        else:
+            conn.send(('ok', result))
+
+    conn.send(('ok', None))
+    conn.close()
+
+
+class ShardedHashMap:
+    def __init__(self, shards: int = 4, function: callable = hash_function_2,
+                 map_type: str = 'sc', capacity: int = 11, batch_size: int = BATCH_SIZE,
+                 start_method: str = None, **options) -> None:
+        """
+        Initialize new HashMap sharded across the given number of worker processes.
+        Each worker owns a local map_type ('sc' or 'oa') HashMap created with the given
+        capacity, hash function and options. Keys are routed by their hash code, mixed
+        with mix64, so shards get an even share even from the sample hash functions.
+        Single-key puts and removes are buffered per shard and sent batch_size at a time,
+        or before any read of that shard. The function must be picklable (a module level
+        function) when start_method is 'spawn' or 'forkserver'.
+        """
+        if map_type not in MAP_TYPES:
+            raise ValueError('map_type must be one of ' + ', '.join(MAP_TYPES))
+        if shards < 1:
+            raise ValueError('shards must be at least 1')
+
+        self._hash_function = function
+        self._batch_size = batch_size
+        self._shards = shards
+
+        context = multiprocessing.get_context(start_method)
+        self._connections = []
+        self._workers = []
+        for _ in range(shards):
+            parent, child = context.Pipe()
+            worker = context.Process(target=_serve,
+                                     args=(child, map_type, capacity, function, options),
+                                     daemon=True)
+            worker.start()
+            child.close()
+            self._connections.append(parent)
+            self._workers.append(worker)
+
+        # single-key writes not yet sent, per shard
+        self._pending = [[] for _ in range(shards)]
+
+    def __enter__(self) -> "ShardedHashMap":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _shard(self, key: str) -> int:
+        """Returns the shard that owns the given key."""
+        return mix64(self._hash_function(key)) % self._shards
+
+    def _partition(self, keys: list) -> list:
+        """
+        Returns, for each shard, the positions in keys of the keys it owns.
+        The keys are hashed in one batch.
+        """
+        shards = self._shards
+        positions = [[] for _ in range(shards)]
+        for i, hash_code in enumerate(hash_batch(self._hash_function, keys)):
+            positions[mix64(hash_code) % shards].append(i)
+        return positions
+
+    def _request(self, shards, command: str, arguments=None) -> list:
+        """
+        Sends the command to each of the given shards (with the matching argument, if any)
+        before waiting for any of them, so the shards work in parallel, and returns their
+        results in the same order. Every reply is received before the first error, if any,
+        is raised, so no reply is left in a pipe to be read by a later request.
+        """
+        shards = list(shards)
+        for n, shard in enumerate(shards):
+            self._connections[shard].send((command, None if arguments is None else arguments[n]))
+
+        replies = [self._connections[shard].recv() for shard in shards]
+        for status, result in replies:
+            if status == 'error':
+                raise result
+        return [result for _, result in replies]
+
+    def _flush(self, shards=None) -> None:
+        """
+        Sends the buffered writes of the given shards (all shards by default).
+        Every write is applied even if some fail; the failures are then raised together
+        as a BufferedWriteError.
+        """
+        if shards is None:
+            shards = range(self._shards)
+        shards = [shard for shard in shards if self._pending[shard]]
+        if not shards:
+            return
+
+        batches = [self._pending[shard] for shard in shards]
+        for shard in shards:
+            self._pending[shard] = []
+        results = self._request(shards, 'apply', batches)
+
+        errors = [(shard, position, batch[position][1], error)
+                  for shard, batch, failed in zip(shards, batches, results)
+                  for position, error in failed]
+        if errors:
+            raise BufferedWriteError(errors) from errors[0][3]
+
+    def close(self) -> None:
+        """
+        Sends the buffered writes, then stops the worker processes. The map cannot be
+        used afterwards. The workers are stopped even if buffered writes failed.
+        """
+        if not self._workers:
+            return
+        try:
+            self._flush()
+        finally:
+            self._request(range(self._shards), 'close')
+            for worker in self._workers:
+                worker.join()
+            for conn in self._connections:
+                conn.close()
+            self._workers = []
+
+    def get_shard_count(self) -> int:
+        """
+        Return the number of shards (worker processes)
+        """
+        return self._shards
+
+    def get_size(self) -> int:
+        """
+        Return size of map: the total size of the shards
+        """
+        self._flush()
+        return sum(size for size, _, _ in self._request(range(self._shards), 'size'))
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map: the total capacity of the shards
+        """
+        self._flush()
+        return sum(capacity for _, capacity, _ in self._request(range(self._shards), 'size'))
+
+    def table_load(self) -> float:
+        """
+        Returns the load factor over all shards: total size / total capacity
+        """
+        self._flush()
+        sizes = self._request(range(self._shards), 'size')
+        return sum(size for size, _, _ in sizes) / sum(capacity for _, capacity, _ in sizes)
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty buckets in all shards
+        """
+        self._flush()
+        return sum(empty for _, _, empty in self._request(range(self._shards), 'size'))
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates the key/value pair in the hash map. The write is buffered and sent to
+        its shard with the next batch; reads of that shard always see it. If it fails in
+        its shard, the call that sends the batch raises BufferedWriteError.
+        """
+        shard = self._shard(key)
+        self._pending[shard].append((_PUT, key, value))
+        if len(self._pending[shard]) >= self._batch_size:
+            self._flush((shard,))
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map. If the key
+        is not in the hash map, the method does nothing. The write is buffered like put.
+        """
+        shard = self._shard(key)
+        self._pending[shard].append((_REMOVE, key, None))
+        if len(self._pending[shard]) >= self._batch_size:
+            self._flush((shard,))
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key, or None if the key is not in
+        the hash map. Takes one round trip to the key's shard.
+        """
+        shard = self._shard(key)
+        self._flush((shard,))
+        return self._request((shard,), 'get_many', [[key]])[0][0]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if given key is in the hash map, otherwise returns False.
+        """
+        shard = self._shard(key)
+        self._flush((shard,))
+        return self._request((shard,), 'contains_many', [[key]])[0][0]
+
+    def put_many(self, pairs) -> None:
+        """
+        Updates the hash map with every (key, value) pair, in order, sending one batch to
+        each shard. pairs may be any iterable of tuples or a DynamicArray of tuples.
+        """
+        pairs = as_list(pairs)
+        self._flush()
+        positions = self._partition([pair[0] for pair in pairs])
+        shards = [shard for shard in range(self._shards) if positions[shard]]
+        self._request(shards, 'put_many',
+                      [[pairs[i] for i in positions[shard]] for shard in shards])
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Returns a dynamic array with the value of each given key, in input order.
+        Keys that are not in the hash map get None.
+        """
+        keys = as_list(keys)
+        self._flush()
+        positions = self._partition(keys)
+        shards = [shard for shard in range(self._shards) if positions[shard]]
+        results = self._request(shards, 'get_many',
+                                [[keys[i] for i in positions[shard]] for shard in shards])
+
+        values = [None] * len(keys)
+        for shard, shard_values in zip(shards, results):
+            for i, value in zip(positions[shard], shard_values):
+                values[i] = value
+        return DynamicArray(values)
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes every given key from the hash map, sending one batch to each shard.
+        Keys that are not in the hash map are skipped.
+        """
+        keys = as_list(keys)
+        self._flush()
+        positions = self._partition(keys)
+        shards = [shard for shard in range(self._shards) if positions[shard]]
+        self._request(shards, 'remove_many',
+                      [[keys[i] for i in positions[shard]] for shard in shards])
+
+    def clear(self) -> None:
+        """
+        Clears the contents of every shard. Buffered writes are dropped.
+        """
+        self._pending = [[] for _ in range(self._shards)]
+        self._request(range(self._shards), 'clear')
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array where each index contains a tuple of a key/value pair
+        stored in the hash map, gathered from every shard.
+        """
+        self._flush()
+        da = DynamicArray()
+        for items in self._request(range(self._shards), 'items'):
+            for item in items:
+                da.append(item)
+        return da
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nSharded - put example 1")
+    print("-----------------------")
+    with ShardedHashMap(4, hash_function_1) as m:
+        for i in range(150):
+            m.put('str' + str(i), i * 100)
+            if i % 25 == 24:
+                print(m.get_size(), m.get_shard_count(), round(m.table_load(), 2))
+
+    print("\nSharded - batch example 1")
+    print("-------------------------")
+    for map_type in MAP_TYPES:
+        with ShardedHashMap(3, hash_function_2, map_type=map_type) as m:
+            m.put_many([('key' + str(i), i) for i in range(1000)])
+            m.remove_many(['key' + str(i) for i in range(0, 1000, 2)])
+            values = m.get_many(['key' + str(i) for i in range(6)])
+            m.put('key0', 'back')
+            m.remove('key1')
+            print(map_type, values, m.get('key0'), m.contains_key('key1'), m.get_size(),
+                  m.get_keys_and_values().length())
@@ -0,0 +1,41 @@
+# Description: Table statistics shared by both HashMaps (SC & OA)
+# Helpers for the stats() reports: summaries of length histograms and the
+# number of collisions a uniform hash function would be expected to produce.
+
+import math
+
+
+def expected_collisions(keys: int, buckets: int) -> float:
+    """
+    Returns the expected number of keys that land in a bucket already taken by
+    another key when the given number of keys is hashed uniformly into the buckets:
+    keys minus the expected number of occupied buckets, buckets * (1 - (1 - 1/buckets)^keys).
+    """
+    if keys == 0 or buckets == 0:
+        return 0.0
+    if buckets == 1:
+        return float(keys - 1)
+
+    empty_fraction = math.exp(keys * math.log1p(-1 / buckets))
+    return keys - buckets * (1 - empty_fraction)
+
+
+def histogram_max_mean(histogram: dict) -> tuple:
+    """
+    Returns the largest length in a {length: count} histogram and the mean length,
+    weighted by count. Both are 0 for an empty histogram.
+    """
+    total = sum(histogram.values())
+    if total == 0:
+        return 0, 0.0
+
+    return max(histogram), sum(length * count for length, count in histogram.items()) / total
+
+
+def merge_histograms(target: dict, source: dict) -> dict:
+    """
+    Adds the counts of the source histogram into the target one and returns the target.
+    """
+    for length, count in source.items():
+        target[length] = target.get(length, 0) + count
+    return target
@@ -0,0 +1,58 @@
+# Description: Live keys / values / items views shared by both HashMaps (SC & OA)
+# A view holds no data of its own; it streams straight from the hash map's buckets.
+
+
+class HashMapView:
+    """
+    Base class for the views returned by HashMap.keys(), values() and items().
+    The view reflects the current contents of the hash map. Iterating a view
+    while the hash map gains or loses keys raises RuntimeError.
+    """
+
+    def __init__(self, hash_map) -> None:
+        """Initialize the view over the given hash map."""
+        self._map = hash_map
+
+    def __len__(self) -> int:
+        """Return the number of key/value pairs in the underlying hash map."""
+        return self._map.get_size()
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return type(self).__name__ + '[' + ', '.join(str(item) for item in self) + ']'
+
+
+class KeysView(HashMapView):
+    """View over the keys of a hash map."""
+
+    def __iter__(self):
+        """Yield each key stored in the hash map."""
+        for entry in self._map:
+            yield entry.key
+
+    def __contains__(self, key: str) -> bool:
+        """Return True if the key is in the hash map."""
+        return self._map.contains_key(key)
+
+
+class ValuesView(HashMapView):
+    """View over the values of a hash map."""
+
+    def __iter__(self):
+        """Yield each value stored in the hash map."""
+        for entry in self._map:
+            yield entry.value
+
+
+class ItemsView(HashMapView):
+    """View over the (key, value) pairs of a hash map."""
+
+    def __iter__(self):
+        """Yield a (key, value) tuple for each pair stored in the hash map."""
+        for entry in self._map:
+            yield entry.key, entry.value
+
+    def __contains__(self, item: tuple) -> bool:
+        """Return True if the (key, value) pair is stored in the hash map."""
+        key, value = item
+        return self._map.contains_key(key) and self._map.get(key) == value